@@ -1,4 +1,6 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response, stream_with_context, g
+from flask.json.provider import DefaultJSONProvider
+import click
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from exa_py import Exa
@@ -8,32 +10,181 @@ import os
 import json
 from flask_cors import CORS
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
 import re
 from difflib import SequenceMatcher
 import spacy
-from collections import Counter
-from sqlalchemy import text
+from collections import Counter, defaultdict, deque
+from sqlalchemy import text, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.dialects import postgresql, sqlite
+import sqlite3
 import hashlib
+import math
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import io
+import csv
 import logging
 import requests
 import time
+import threading
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import socket
+from types import SimpleNamespace
+import random
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import base64
+import zlib
+import gzip
 from google import genai
 from google.genai import types
+from sqlalchemy.orm import deferred, undefer, undefer_group
+from sqlalchemy.types import TypeDecorator
+from contextlib import contextmanager
+import contextvars
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    # Reads PROMETHEUS_MULTIPROC_DIR at import time, so it has to come from the process environment
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
 
 # Ensure instance directory exists
 instance_path = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'instance')
 os.makedirs(instance_path, exist_ok=True)
 
+load_dotenv()
+
 app = Flask(__name__)
-# Set up portable SQLite DB path
+# Set up portable SQLite DB path (used unless DATABASE_URL points at another database)
 basedir = os.path.abspath(os.path.dirname(__file__))
 db_path = os.path.join(basedir, 'instance', 'SIMS_Analytics.db')
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+DATABASE_URL = os.getenv('DATABASE_URL') or f'sqlite:///{db_path}'
+if DATABASE_URL.startswith('postgres://'):
+    # Heroku/Render style URLs are not accepted by SQLAlchemy 1.4+
+    DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql://', 1)
+IS_SQLITE = DATABASE_URL.startswith('sqlite')
+IS_POSTGRES = DATABASE_URL.startswith('postgresql')
+app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-print("Database URI:", app.config['SQLALCHEMY_DATABASE_URI'])
-print("Database absolute path:", os.path.abspath('instance/SIMS_Analytics.db'))
+
+# --- Connection Pool Tuning ---
+# Pool sizes are per process: with N web workers plus the scheduler/cron processes the
+# database sees up to N * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+
+# --- SQLite Connection Tuning ---
+# The web process, its scheduler thread and the cron `flask fetch-exa` process all
+# write to the same file, so run in WAL mode (readers never block behind writers)
+# and let writers wait for the lock instead of failing with "database is locked".
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '30000'))
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536'))            # 64 MB page cache per connection
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))     # 256 MB memory-mapped I/O
+SQLITE_WAL_AUTOCHECKPOINT = int(os.getenv('SQLITE_WAL_AUTOCHECKPOINT', '1000'))   # pages
+if IS_SQLITE:
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'connect_args': {
+            'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+            # Connections are handed between request threads and the scheduler thread by the pool
+            'check_same_thread': False,
+        },
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': 30,
+        'pool_pre_ping': True,
+    }
+else:
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': 30,
+        # Drop connections before server-side idle timeouts / PgBouncer recycle them
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': True,
+    }
+
+# --- Compressed Text Columns ---
+# Large text columns are stored as a 1-byte codec marker + compressed payload on SQLite.
+# PostgreSQL already TOAST-compresses large values and needs plain text for the trigram
+# search indexes, so values are stored as-is there.
+TEXT_COMPRESSION = os.getenv('TEXT_COMPRESSION', 'zlib').lower()   # zlib | zstd | none
+TEXT_COMPRESSION_LEVEL = int(os.getenv('TEXT_COMPRESSION_LEVEL', '6'))
+if TEXT_COMPRESSION == 'zstd' and zstandard is None:
+    logging.getLogger(__name__).warning("TEXT_COMPRESSION=zstd but the zstandard package is not installed - using zlib")
+    TEXT_COMPRESSION = 'zlib'
+
+def compress_text(value):
+    if value is None or value == '':
+        return value
+    data = value.encode('utf-8')
+    if TEXT_COMPRESSION == 'zstd':
+        return b'S' + zstandard.ZstdCompressor(level=TEXT_COMPRESSION_LEVEL).compress(data)
+    if TEXT_COMPRESSION == 'zlib':
+        return b'Z' + zlib.compress(data, TEXT_COMPRESSION_LEVEL)
+    return value
+
+def decompress_text(value):
+    """
+    Inverse of compress_text(). Plain str values (rows written before compression) pass through.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    marker, payload = value[:1], value[1:]
+    if marker == b'Z':
+        return zlib.decompress(payload).decode('utf-8')
+    if marker == b'S':
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed column value found but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload).decode('utf-8')
+    return value.decode('utf-8')
+
+@event.listens_for(Engine, 'connect')
+def configure_sqlite_connection(dbapi_connection, connection_record):
+    """
+    Apply WAL journaling and performance pragmas to every new SQLite connection
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute(f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute(f'PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}')
+    cursor.execute(f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute(f'PRAGMA wal_autocheckpoint={SQLITE_WAL_AUTOCHECKPOINT}')
+    cursor.close()
+    # Lets SQL predicates (search, stats) see through CompressedText columns
+    dbapi_connection.create_function('text_decompress', 1, decompress_text, deterministic=True)
+
+print("Database URI:", make_url(DATABASE_URL).render_as_string(hide_password=True))
+if IS_SQLITE:
+    print("Database absolute path:", os.path.abspath('instance/SIMS_Analytics.db'))
 db = SQLAlchemy(app)
 migrate = Migrate(app, db)
 # --- Global Source Lists ---
@@ -108,8 +259,443 @@ INTL_SOURCES = set([
     'tass.com', 'sputniknews.com', 'globaltimes.cn'
 ])
 # --- Logging Setup ---
-logging.basicConfig(level=logging.INFO)
+# LOG_LEVEL=DEBUG turns on raw response / URL dumps. Per-item lines on the ingestion and
+# validation hot paths are sampled (LOG_SAMPLE_RATE) and otherwise only counted; the
+# counts are emitted once per run by log_run_summary(). Each run (ingestion, worker,
+# reanalysis, batch job, archival) counts into its own Counter (counting_run), so runs in
+# other threads don't mix or reset each other's counts; the process-wide totals are the
+# sims_events_total metric.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '0.1'))
+LOG_MAX_FIELD_LEN = int(os.getenv('LOG_MAX_FIELD_LEN', '200'))
+logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO))
 logger = logging.getLogger(__name__)
+_run_counters = contextvars.ContextVar('run_counters', default=None)
+
+def _log_value(value):
+    value = str(value)
+    if len(value) > LOG_MAX_FIELD_LEN:
+        value = value[:LOG_MAX_FIELD_LEN] + '...'
+    if not value or any(ch.isspace() for ch in value) or '=' in value or '"' in value:
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+def log_kv(level, event, **fields):
+    """
+    Emit a structured `event key=value ...` line. Fields are only formatted if the level is enabled.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, '%s %s', event, ' '.join(f'{k}={_log_value(v)}' for k, v in fields.items()))
+
+def log_sampled(level, event, **fields):
+    """
+    log_kv() for per-item hot-path lines: only a LOG_SAMPLE_RATE fraction is emitted
+    """
+    if logger.isEnabledFor(level) and random.random() < LOG_SAMPLE_RATE:
+        log_kv(level, event, **fields)
+
+@contextmanager
+def counting_run():
+    """
+    Give the enclosed run its own event counters (also usable as a decorator); yields the Counter
+    """
+    counters = Counter()
+    token = _run_counters.set(counters)
+    try:
+        yield counters
+    finally:
+        _run_counters.reset(token)
+
+def run_counters():
+    """
+    The current run's counters (an empty Counter outside counting_run())
+    """
+    counters = _run_counters.get()
+    return counters if counters is not None else Counter()
+
+def count_event(name, n=1):
+    counters = _run_counters.get()
+    if counters is not None:
+        counters[name] += n
+    if prometheus_client is not None and n:
+        EVENTS.labels(name).inc(n)
+
+def log_run_summary(event, **fields):
+    """
+    Log the caller's fields plus the current run's counters gathered since the last summary, then reset them
+    """
+    counters = run_counters()
+    summary = dict(sorted(counters.items()))
+    counters.clear()
+    log_kv(logging.INFO, event, **fields, **summary)
+
+# --- Metrics ---
+# Prometheus counters and latency histograms, served at /metrics: Flask routes, ingestion
+# stages (observe_stage), outbound HTTP by host, Gemini token usage, latency and cost per
+# analysis tier, cache lookups, and every count_event() name. With PROMETHEUS_MULTIPROC_DIR
+# set (gunicorn, run-scheduler and worker processes share one directory) each process writes
+# its samples to mmap'd files there and /metrics merges them; otherwise the in-process
+# registry is served. Without prometheus_client installed all of this is a no-op.
+METRICS_MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+if prometheus_client is not None:
+    HTTP_REQUESTS = prometheus_client.Counter(
+        'sims_http_requests_total', 'API requests served', ['route', 'method', 'status'])
+    HTTP_REQUEST_SECONDS = prometheus_client.Histogram(
+        'sims_http_request_duration_seconds', 'API request latency', ['route', 'method'], buckets=LATENCY_BUCKETS)
+    STAGE_SECONDS = prometheus_client.Histogram(
+        'sims_stage_duration_seconds', 'Ingestion/analysis pipeline stage latency', ['stage'], buckets=LATENCY_BUCKETS)
+    STAGE_ERRORS = prometheus_client.Counter(
+        'sims_stage_errors_total', 'Pipeline stages that raised', ['stage'])
+    OUTBOUND_REQUESTS = prometheus_client.Counter(
+        'sims_outbound_requests_total', 'Outbound HTTP calls', ['host', 'status'])
+    OUTBOUND_SECONDS = prometheus_client.Histogram(
+        'sims_outbound_request_duration_seconds', 'Outbound HTTP latency', ['host'], buckets=LATENCY_BUCKETS)
+    GEMINI_TOKENS = prometheus_client.Counter(
+        'sims_gemini_tokens_total', 'Gemini tokens used', ['kind'])
+    ANALYSIS_TIER_SECONDS = prometheus_client.Histogram(
+        'sims_analysis_tier_duration_seconds', 'Gemini request latency by analysis tier', ['tier'], buckets=LATENCY_BUCKETS)
+    ANALYSIS_TIER_COST = prometheus_client.Counter(
+        'sims_analysis_tier_cost_usd_total', 'Estimated Gemini cost by analysis tier', ['tier'])
+    CACHE_LOOKUPS = prometheus_client.Counter(
+        'sims_cache_lookups_total', 'Cache lookups by cache and result', ['cache', 'result'])
+    EVENTS = prometheus_client.Counter(
+        'sims_events_total', 'count_event() occurrences', ['event'])
+
+def metric_status(status):
+    return f"{status // 100}xx" if isinstance(status, int) else str(status)
+
+@contextmanager
+def observe_stage(stage):
+    """
+    Time a pipeline stage: `with observe_stage('gemini_call'): ...`
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        if prometheus_client is not None:
+            STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        if prometheus_client is not None:
+            STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started)
+
+@contextmanager
+def observe_outbound(host):
+    """
+    Time an outbound call made through an SDK (Exa, Gemini) rather than http_request()
+    """
+    started = time.perf_counter()
+    status = 'ok'
+    try:
+        yield
+    except Exception:
+        status = 'error'
+        raise
+    finally:
+        if prometheus_client is not None:
+            OUTBOUND_REQUESTS.labels(host, status).inc()
+            OUTBOUND_SECONDS.labels(host).observe(time.perf_counter() - started)
+
+def http_request(method, url, **kwargs):
+    """
+    requests.request() with outbound metrics per host
+    """
+    started = time.perf_counter()
+    status = 'error'
+    try:
+        response = requests.request(method, url, **kwargs)
+        status = metric_status(response.status_code)
+        return response
+    finally:
+        if prometheus_client is not None:
+            host = (urlsplit(url).hostname or 'unknown').lower()
+            OUTBOUND_REQUESTS.labels(host, status).inc()
+            OUTBOUND_SECONDS.labels(host).observe(time.perf_counter() - started)
+
+def record_cache_lookup(cache, hit, n=1):
+    if prometheus_client is not None and n:
+        CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc(n)
+
+def record_gemini_usage(usage):
+    if prometheus_client is None or usage is None:
+        return
+    for kind, attr in (('prompt', 'prompt_token_count'), ('output', 'candidates_token_count'),
+                       ('thinking', 'thoughts_token_count'), ('tool_prompt', 'tool_use_prompt_token_count')):
+        value = getattr(usage, attr, None)
+        if value:
+            GEMINI_TOKENS.labels(kind).inc(value)
+
+# --- Article Deadlines ---
+# Ingesting or reanalyzing one article gets ARTICLE_DEADLINE_SECONDS for all of its stages
+# together: Gemini streaming, grounding-redirect resolution, URL validation and NER. Each stage
+# uses min(its own timeout, the time left) as its timeout, and one that finds the budget spent
+# raises DeadlineExceeded. The article is then stored with what did finish, its summary_json
+# lists the 'incomplete' stages, and a 'reanalyze' work item retries it later, so one stuck
+# article no longer holds up a serial run. Without an active deadline (interactive analysis,
+# maintenance commands) stages keep their own timeouts; Gemini's is GEMINI_TIMEOUT_SECONDS.
+ARTICLE_DEADLINE_SECONDS = float(os.getenv('ARTICLE_DEADLINE_SECONDS', '90'))   # 0 disables
+GEMINI_TIMEOUT_SECONDS = float(os.getenv('GEMINI_TIMEOUT_SECONDS', '120'))
+ARTICLE_RETRY_MINUTES = int(os.getenv('ARTICLE_RETRY_MINUTES', '30'))          # retry job, without ANALYSIS_QUEUE
+_article_deadline = contextvars.ContextVar('article_deadline', default=None)
+
+class DeadlineExceeded(Exception):
+    """
+    The article's time budget ran out in `stage`; `partial` holds whatever the stage finished
+    """
+    def __init__(self, stage, partial=None):
+        super().__init__(f"article deadline exceeded in {stage}")
+        self.stage = stage
+        self.partial = partial
+
+@contextmanager
+def article_deadline(seconds=None):
+    """
+    Give the enclosed work (or the decorated function, per call) one time budget
+    """
+    seconds = ARTICLE_DEADLINE_SECONDS if seconds is None else seconds
+    token = _article_deadline.set(time.monotonic() + seconds if seconds > 0 else None)
+    try:
+        yield
+    finally:
+        _article_deadline.reset(token)
+
+def deadline_remaining():
+    """
+    Seconds left in the current article's budget, or None without one
+    """
+    deadline = _article_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def deadline_spent():
+    remaining = deadline_remaining()
+    return remaining is not None and remaining <= 0
+
+def check_deadline(stage, partial=None):
+    if deadline_spent():
+        raise DeadlineExceeded(stage, partial)
+
+def stage_timeout(stage, default):
+    """
+    Timeout for one call in `stage`: its default, capped by the budget left
+    """
+    check_deadline(stage)
+    remaining = deadline_remaining()
+    return default if remaining is None else min(default, remaining)
+
+def retry_incomplete_article(article_id, stages):
+    """
+    Count an article stored without some stages and queue its reanalysis
+    """
+    count_event('deadline.incomplete_articles')
+    for stage in stages:
+        count_event(f'deadline.exceeded.{stage}')
+    log_kv(logging.WARNING, 'deadline.incomplete', id=article_id, stages=','.join(stages))
+    enqueue_work('reanalyze', {'article_id': article_id}, dedupe_key=str(article_id))
+
+# --- Response Encoding ---
+# JSON is serialized with orjson when installed, and responses above RESPONSE_COMPRESS_MIN_BYTES
+# are compressed with brotli or gzip according to Accept-Encoding. Payloads that are expensive
+# to build (dashboard, source lists) are kept in a small in-process cache as ready-to-send bytes
+# for every encoding, and dropped whenever the article data changes.
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESS_MIN_BYTES', '1024'))
+RESPONSE_GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', '6'))
+RESPONSE_BROTLI_QUALITY = int(os.getenv('RESPONSE_BROTLI_QUALITY', '5'))
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '300'))          # seconds, 0 disables
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '64'))
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson. Output matches the default provider (sorted keys,
+    datetimes as HTTP dates via its default hook) so clients see the same documents.
+    """
+    options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+    def dumps_bytes(self, obj):
+        return orjson.dumps(obj, default=self.default, option=self.options)
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+if orjson:
+    app.json = OrjsonProvider(app)
+
+def json_bytes(obj):
+    """
+    Serialize obj to UTF-8 JSON bytes with the app's provider, skipping the str round trip under orjson
+    """
+    if isinstance(app.json, OrjsonProvider):
+        return app.json.dumps_bytes(obj)
+    return app.json.dumps(obj).encode('utf-8')
+
+def compress_body(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=RESPONSE_BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL)
+    return body
+
+def negotiate_encoding(body_size=None):
+    """
+    Pick the Content-Encoding for the current request: 'br', 'gzip' or None
+    """
+    if body_size is not None and body_size < RESPONSE_COMPRESS_MIN_BYTES:
+        return None
+    offered = ['br', 'gzip'] if brotli else ['gzip']
+    encodings = request.accept_encodings
+    best = max(offered, key=lambda e: encodings[e])  # ties keep the first (preferred) entry
+    return best if encodings[best] > 0 else None
+
+@app.after_request
+def compress_response(response):
+    response.vary.add('Accept-Encoding')
+    if (response.direct_passthrough or response.is_streamed or response.status_code < 200
+            or response.status_code >= 300 or 'Content-Encoding' in response.headers
+            or not response.mimetype or not response.mimetype.endswith('json')):
+        return response
+    body = response.get_data()
+    encoding = negotiate_encoding(len(body))
+    if encoding:
+        response.set_data(compress_body(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+
+def utc_now():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+def invalidate_response_cache():
+    with _response_cache_lock:
+        _response_cache.clear()
+
+def current_data_generation():
+    """
+    Return (generation, changed_at) from the shared data_generation row. Every process
+    (web workers, scheduler, CLI jobs) sees the same counter, so validators stay consistent.
+    """
+    row = db.session.get(DataGeneration, 1)
+    if row is None:
+        return 0, None
+    return row.generation, row.changed_at
+
+def mark_data_changed():
+    """
+    Record that article data changed: bump the data generation (new ETags everywhere)
+    and drop this process's cached payloads.
+    """
+    changed = db.session.execute(
+        db.update(DataGeneration).where(DataGeneration.id == 1)
+        .values(generation=DataGeneration.generation + 1, changed_at=utc_now())
+    ).rowcount
+    if not changed:
+        db.session.add(DataGeneration(id=1, generation=1, changed_at=utc_now()))
+    db.session.commit()
+    invalidate_response_cache()
+
+def representation_etag(base):
+    """
+    Strong ETag for `base` as encoded for this client (identity/gzip/br are different bytes)
+    """
+    return f"{base}-{negotiate_encoding() or 'identity'}"
+
+def not_modified(etag, last_modified=None):
+    """
+    Return a 304 response if the request's validators match, else None.
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    """
+    if request.if_none_match:
+        matched = request.if_none_match.contains(etag)
+    elif request.if_modified_since and last_modified:
+        matched = last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    else:
+        return None
+    record_cache_lookup('conditional_get', matched)
+    if not matched:
+        return None
+    count_event('conditional_get.not_modified')
+    response = app.response_class(status=304)
+    return with_validators(response, etag, last_modified)
+
+def with_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'  # always revalidate, the 304 is cheap
+    return response
+
+def cached_json_response(build):
+    """
+    Serve build()'s JSON document with a strong ETag / Last-Modified taken from the data
+    generation. A matching If-None-Match gets a 304 before anything is built. Otherwise the
+    encoded bytes come from the response cache, keyed by generation + path + query string;
+    each entry keeps the identity bytes and lazily adds the gzip/br encodings as clients ask.
+    """
+    generation, changed_at = current_data_generation()
+    etag = representation_etag(f"g{generation}")
+    response = not_modified(etag, changed_at)
+    if response is not None:
+        return response
+    if RESPONSE_CACHE_TTL <= 0:
+        return with_validators(jsonify(build()), etag, changed_at)
+    key = (generation, request.full_path)
+    now = time.time()
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+    if entry is None or now - entry['created'] > RESPONSE_CACHE_TTL:
+        entry = {'created': now, None: json_bytes(build())}
+        count_event('response_cache.miss')
+        record_cache_lookup('response', False)
+        with _response_cache_lock:
+            if len(_response_cache) >= RESPONSE_CACHE_MAX_ENTRIES:
+                _response_cache.pop(min(_response_cache, key=lambda k: _response_cache[k]['created']))
+            _response_cache[key] = entry
+    else:
+        count_event('response_cache.hit')
+        record_cache_lookup('response', True)
+    encoding = negotiate_encoding(len(entry[None]))
+    if encoding not in entry:
+        entry[encoding] = compress_body(entry[None], encoding)
+    response = app.response_class(entry[encoding], mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return with_validators(response, etag, changed_at)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if prometheus_client is not None and started is not None:
+        # The rule template (/api/articles/<int:article_id>) keeps label cardinality bounded
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUESTS.labels(route, request.method, metric_status(response.status_code)).inc()
+        HTTP_REQUEST_SECONDS.labels(route, request.method).observe(time.perf_counter() - started)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    if prometheus_client is None:
+        return Response('prometheus_client is not installed\n', status=501, mimetype='text/plain')
+    if METRICS_MULTIPROC_DIR:
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return Response(prometheus_client.generate_latest(registry), mimetype=prometheus_client.CONTENT_TYPE_LATEST)
+
 # --- CORS Configuration ---
 CORS(app, 
      resources={r"/api/*": {"origins": "*"}},
@@ -121,7 +707,6 @@ CORS(app,
 with app.app_context():
     db.create_all()
 
-load_dotenv()
 EXA_API_KEY = os.getenv('EXA_API_KEY')
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 
@@ -223,7 +808,8 @@ def filter_independent_sources(sources, original_domain):
         
         # Skip if source domain matches original domain (self-referencing)
         if source_domain and source_domain == original_domain:
-            logger.info(f"Filtering out self-referencing source: {source_domain}")
+            count_event('sources.self_reference_filtered')
+            log_sampled(logging.DEBUG, 'source.self_reference_filtered', domain=source_domain)
             continue
             
         filtered_sources.append(source)
@@ -265,19 +851,13 @@ def determine_fact_check_status(sources):
     has_intl_source = len(international_sources) >= 1
     
     # VERIFIED: Requires BOTH BD and International sources
-    if has_bd_source and has_intl_source:
-        logger.info(f"VERIFIED: Found both categories - BD: {len(bd_sources)} ({bd_sources}), International: {len(international_sources)} ({international_sources})")
-        return 'verified'
-    
     # UNVERIFIED: Everything else (only BD, only international, or no sources)
-    else:
-        if has_bd_source and not has_intl_source:
-            logger.info(f"UNVERIFIED: Found {len(bd_sources)} BD sources ({bd_sources}) but missing international verification")
-        elif has_intl_source and not has_bd_source:
-            logger.info(f"UNVERIFIED: Found {len(international_sources)} international sources ({international_sources}) but missing BD sources")
-        else:
-            logger.info(f"UNVERIFIED: No external sources found for verification (BD: {len(bd_sources)}, International: {len(international_sources)})")
-        return 'unverified'
+    status = 'verified' if has_bd_source and has_intl_source else 'unverified'
+    count_event(f'fact_check.{status}')
+    log_kv(logging.DEBUG, 'fact_check.status', status=status,
+           bd_sources=len(bd_sources), intl_sources=len(international_sources),
+           bd_names=bd_sources, intl_names=international_sources)
+    return status
 
 def categorize_news_source(domain, url):
     """
@@ -560,6 +1140,14 @@ def categorize_news_source(domain, url):
 
 # Removed construct_realistic_url function - was creating fake URLs
 
+def record_url_check(ok, check, reason, url, **fields):
+    """
+    Count a URL validation outcome and emit a sampled debug line for it
+    """
+    count_event(f"url_validation.{check}.{'ok' if ok else 'failed'}")
+    log_sampled(logging.DEBUG, 'url_validation', check=check, ok=ok, reason=reason, url=url, **fields)
+    return ok
+
 def validate_url_thoroughly(url):
     """Enhanced URL validation with multiple checks"""
     try:
@@ -569,8 +1157,7 @@ def validate_url_thoroughly(url):
         # Basic URL structure validation
         parsed = urlparse(url)
         if not parsed.scheme or not parsed.netloc:
-            logger.info(f"✗ Invalid URL structure: {url}")
-            return False
+            return record_url_check(False, 'thorough', 'invalid_structure', url)
         
         # Check for suspicious patterns
         suspicious_patterns = [
@@ -578,30 +1165,27 @@ def validate_url_thoroughly(url):
             'localhost', '127.0.0.1', '0.0.0.0', 'fake-news'
         ]
         if any(pattern in url.lower() for pattern in suspicious_patterns):
-            logger.info(f"✗ Suspicious URL pattern detected: {url}")
-            return False
+            return record_url_check(False, 'thorough', 'suspicious_pattern', url)
         
         # Try HEAD request first (faster)
         try:
-            response = requests.head(url, timeout=5, allow_redirects=True, headers={
+            response = http_request('HEAD', url, timeout=stage_timeout('url_validation', 5), allow_redirects=True, headers={
                 'User-Agent': 'Mozilla/5.0 (compatible; SIMS-Analytics-Bot/1.0)'
             })
             
             # Check status code
             if response.status_code == 200:
-                logger.info(f"✓ URL validated via HEAD: {url}")
-                return True
+                return record_url_check(True, 'thorough', 'head_ok', url)
             elif response.status_code in [301, 302, 303, 307, 308]:
                 # Check if redirect leads to valid content
                 final_url = response.url
                 if final_url and final_url != url:
-                    logger.info(f"✓ URL redirects to: {final_url}")
-                    return True
+                    return record_url_check(True, 'thorough', 'redirect', url, final_url=final_url)
             
         except requests.exceptions.RequestException:
             # HEAD failed, try GET with limited data
             try:
-                response = requests.get(url, timeout=5, stream=True, headers={
+                response = http_request('GET', url, timeout=stage_timeout('url_validation', 5), stream=True, headers={
                     'User-Agent': 'Mozilla/5.0 (compatible; SIMS-Analytics-Bot/1.0)'
                 })
                 
@@ -617,39 +1201,30 @@ def validate_url_thoroughly(url):
                                 'published', 'author', 'reporter', 'correspondent'
                             ]
                             if any(indicator in chunk.lower() for indicator in article_indicators):
-                                logger.info(f"✓ URL validated via GET (article content): {url}")
-                                return True
+                                return record_url_check(True, 'thorough', 'get_article_content', url)
                             else:
-                                logger.info(f"✗ URL doesn't appear to be article content: {url}")
-                                return False
+                                return record_url_check(False, 'thorough', 'not_article_content', url)
                         except:
-                            logger.info(f"✓ URL accessible but content unreadable: {url}")
-                            return True  # Give benefit of doubt
+                            return record_url_check(True, 'thorough', 'content_unreadable', url)  # Give benefit of doubt
                     else:
-                        logger.info(f"✓ URL accessible (non-HTML content): {url}")
-                        return True
+                        return record_url_check(True, 'thorough', 'non_html', url)
                 else:
-                    logger.info(f"✗ URL returned status {response.status_code}: {url}")
-                    return False
+                    return record_url_check(False, 'thorough', 'get_status', url, status=response.status_code)
                     
             except requests.exceptions.RequestException as e:
-                logger.info(f"✗ URL validation failed (GET): {url} - {str(e)}")
-                return False
+                return record_url_check(False, 'thorough', 'get_error', url, error=e)
         
-        logger.info(f"✗ URL validation failed (status {response.status_code}): {url}")
-        return False
+        return record_url_check(False, 'thorough', 'head_status', url, status=response.status_code)
         
     except Exception as e:
-        logger.info(f"✗ URL validation error: {url} - {str(e)}")
-        return False
+        return record_url_check(False, 'thorough', 'exception', url, error=e)
 
 def validate_url_exists(url):
     """
     Smart URL validation that handles Google grounding redirects and direct URLs
     """
     if not url or not url.startswith(('http://', 'https://')):
-        logger.warning(f"URL validation FAILED: Invalid format - {url}")
-        return False
+        return record_url_check(False, 'exists', 'invalid_format', url)
     
     # Check if this is a Google grounding API redirect
     if is_google_grounding_redirect(url):
@@ -673,8 +1248,6 @@ def validate_google_grounding_url(url):
     """
     Validate Google grounding redirect by following it to the final destination
     """
-    logger.info(f"🔗 Detected Google grounding redirect: {url[:100]}...")
-    
     try:
         # Try to resolve the redirect to get the final URL
         final_url = resolve_redirect_url(url)
@@ -684,20 +1257,14 @@ def validate_google_grounding_url(url):
             from urllib.parse import urlparse
             final_domain = urlparse(final_url).netloc.lower().replace('www.', '')
             
-            # Accept all valid domains - categorize later
-            if is_known_news_domain(final_domain):
-                logger.info(f"✅ Google redirect resolves to known news domain: {final_domain}")
-                return True
-            else:
-                logger.info(f"✅ Google redirect resolves to other source domain: {final_domain}")
-                return True  # Accept unknown domains as "Other Sources"
+            # Accept all valid domains (unknown ones become "Other Sources") - categorize later
+            reason = 'known_domain' if is_known_news_domain(final_domain) else 'other_domain'
+            return record_url_check(True, 'grounding', reason, url, final_domain=final_domain)
         else:
-            logger.warning(f"❌ Could not resolve Google redirect: {url}")
-            return False
+            return record_url_check(False, 'grounding', 'unresolved', url)
             
     except Exception as e:
-        logger.warning(f"❌ Error validating Google redirect: {url} - {str(e)}")
-        return False
+        return record_url_check(False, 'grounding', 'exception', url, error=e)
 
 def is_known_news_domain(domain):
     """
@@ -713,26 +1280,23 @@ def validate_direct_url(url):
     """
     try:
         # Use HEAD request to check if URL exists without downloading content
-        response = requests.head(url, timeout=10, allow_redirects=True)
+        response = http_request('HEAD', url, timeout=stage_timeout('url_validation', 10), allow_redirects=True)
         
         # Accept 200 (OK) and 302 (Redirect) as valid
-        if response.status_code in [200, 302]:
-            logger.info(f"✅ Direct URL validation SUCCESS: {url} (status: {response.status_code})")
-            return True
-        else:
-            logger.warning(f"❌ Direct URL validation FAILED: {url} (status: {response.status_code})")
-            return False
+        ok = response.status_code in [200, 302]
+        return record_url_check(ok, 'direct', 'status', url, status=response.status_code)
             
     except requests.exceptions.RequestException as e:
-        logger.warning(f"❌ Direct URL validation ERROR: {url} - {str(e)}")
-        return False
+        return record_url_check(False, 'direct', 'request_error', url, error=e)
     except Exception as e:
-        logger.error(f"❌ Direct URL validation EXCEPTION: {url} - {str(e)}")
-        return False
+        return record_url_check(False, 'direct', 'exception', url, error=e)
 
+@observe_stage('url_validation')
 def validate_and_filter_sources(sources):
     """
-    Validate all source URLs and filter out broken/fake ones
+    Validate all source URLs and filter out broken/fake ones.
+    Raises DeadlineExceeded, with the sources validated so far as `partial`, if the
+    article's budget runs out before every URL is checked.
     """
     if not sources or not isinstance(sources, list):
         return []
@@ -744,27 +1308,50 @@ def validate_and_filter_sources(sources):
             continue
             
         source_url = source.get('source_url', '')
-        source_name = source.get('source_name', '')
         
         if not source_url:
-            logger.warning(f"Source '{source_name}' has no URL, skipping")
+            count_event('sources.missing_url')
             continue
         
         # Validate URL exists
+        check_deadline('url_validation', validated_sources)
         if validate_url_exists(source_url):
             validated_sources.append(source)
-            logger.info(f"✅ VALID source: {source_name} - {source_url}")
-        else:
-            logger.warning(f"❌ INVALID source removed: {source_name} - {source_url}")
+        elif deadline_spent():
+            # Cut off by the budget rather than found broken: left unchecked, not rejected
+            raise DeadlineExceeded('url_validation', validated_sources)
     
-    logger.info(f"URL validation complete: {len(validated_sources)}/{len(sources)} sources valid")
+    log_kv(logging.DEBUG, 'sources.validated', valid=len(validated_sources), total=len(sources))
     return validated_sources
 
+class CompressedText(TypeDecorator):
+    """
+    Text column transparently compressed on SQLite (see compress_text / decompress_text)
+    """
+    impl = db.Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name != 'sqlite':
+            return value
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
+
+def text_sql(column):
+    """
+    SQL expression for the plain text of a CompressedText column, for use in filters
+    """
+    if db.engine.dialect.name == 'sqlite':
+        return db.func.text_decompress(column, type_=db.Text)
+    return column
+
 class Article(db.Model):
     id           = db.Column(db.Integer, primary_key=True)
     url          = db.Column(db.String, unique=True, nullable=False)
     title        = db.Column(db.String, nullable=False)
-    published_at = db.Column(db.DateTime)
+    published_at = db.Column(db.DateTime, index=True)
     author       = db.Column(db.String)
     source       = db.Column(db.String)
     sentiment    = db.Column(db.String)
@@ -774,12 +1361,40 @@ class Article(db.Model):
     image        = db.Column(db.String)
     favicon      = db.Column(db.String)
     score        = db.Column(db.Float)
-    extras       = db.Column(db.Text)  # Store as JSON string
-    full_text    = db.Column(db.Text)
-    summary_json = db.Column(db.Text)  # Store as JSON string
+    # Large payload columns are compressed and deferred: list/aggregate queries don't load
+    # them, queries that render them use .options(undefer_group('payload'))
+    extras       = deferred(db.Column(CompressedText), group='payload')  # Store as JSON string
+    full_text    = deferred(db.Column(CompressedText), group='payload')
+    summary_json = deferred(db.Column(CompressedText), group='payload')  # Store as JSON string
     category     = db.Column(db.String) # Added for Gemma analysis
     summary_text = db.Column(db.Text) # Added for Gemma analysis
-    fact_check_results = db.Column(db.Text) # Added for Gemma analysis
+    fact_check_results = deferred(db.Column(CompressedText), group='payload') # Added for Gemma analysis
+    # Local VADER breakdown of full_text, computed once at write time
+    sentiment_positive = db.Column(db.Float)
+    sentiment_negative = db.Column(db.Float)
+    sentiment_neutral  = db.Column(db.Float)
+    sentiment_cautious = db.Column(db.Float)
+    # bd_relevance() of title, text and entities, computed at ingestion (see `flask backfill-bd-relevance`)
+    bd_relevance_score = db.Column(db.Float, index=True)
+    # Bumped on every write (UTC); per-article ETag / Last-Modified validator
+    updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now)
+
+    def set_sentiment_breakdown(self, breakdown):
+        self.sentiment_positive = breakdown.get('positive')
+        self.sentiment_negative = breakdown.get('negative')
+        self.sentiment_neutral = breakdown.get('neutral')
+        self.sentiment_cautious = breakdown.get('cautious')
+
+    def sentiment_breakdown(self):
+        """Stored VADER breakdown, or None if the row has not been backfilled yet"""
+        if self.sentiment_positive is None:
+            return None
+        return {
+            "positive": self.sentiment_positive,
+            "negative": self.sentiment_negative,
+            "neutral": self.sentiment_neutral,
+            "cautious": self.sentiment_cautious
+        }
 
     def to_dict(self):
         # Parse summary_json to get the full Gemma analysis
@@ -829,8 +1444,8 @@ class Article(db.Model):
         extras = json.loads(self.extras) if self.extras else {}
         entities = extras.get('entities', [])
 
-        # Perform local sentiment analysis on the full text
-        sentiment_analysis = analyze_sentiment_locally(self.full_text or "")
+        # Local sentiment breakdown is persisted at ingestion (see `flask backfill-sentiment`)
+        sentiment_analysis = self.sentiment_breakdown()
         
         # Create summary structure that frontend expects
         summary_structure = {
@@ -875,6 +1490,7 @@ class Article(db.Model):
             "extras": extras,
             "text": self.full_text or "",
             "author": self.author or "",
+            "bd_relevance_score": self.bd_relevance_score,
             "links": [],  # Add empty links array for compatibility
             # Add media coverage summary for compatibility
             "media_coverage_summary": {
@@ -899,6 +1515,224 @@ class IntMatch(db.Model):
     source     = db.Column(db.String, nullable=False)
     url        = db.Column(db.String)
 
+class ArchivedArticle(db.Model):
+    """
+    Cold-tier copy of an Article moved out of the hot table by archive_old_articles().
+    The filterable columns stay plain; the full row and its matches live in `payload`
+    as compressed JSON (see archive_payload / ArchivedArticle.to_article).
+    """
+    __tablename__ = 'article_archive'
+    id           = db.Column(db.Integer, primary_key=True, autoincrement=False)  # original article.id
+    url          = db.Column(db.String, unique=True, nullable=False)
+    title        = db.Column(db.String, nullable=False)
+    published_at = db.Column(db.DateTime, index=True)
+    source       = db.Column(db.String)
+    sentiment    = db.Column(db.String)
+    category     = db.Column(db.String)
+    fact_check   = db.Column(db.String)
+    bd_relevance_score = db.Column(db.Float)
+    archived_at  = db.Column(db.DateTime, nullable=False)
+    payload      = deferred(db.Column(db.LargeBinary, nullable=False))
+
+    def load_payload(self):
+        return json.loads(decompress_text(self.payload))
+
+    def to_article(self):
+        """
+        Rebuild a transient Article (not attached to the session) so the existing
+        serializers can render archived rows. Returns (article, bd_matches, int_matches).
+        """
+        data = self.load_payload()
+        columns = data['columns']
+        if columns.get('published_at'):
+            columns['published_at'] = datetime.datetime.fromisoformat(columns['published_at'])
+        return Article(**columns), data.get('bd_matches', []), data.get('int_matches', [])
+
+class WorkItem(db.Model):
+    """
+    Analysis work queue shared by `flask worker` processes (see claim_work_items).
+    A claimed item is leased to one worker until lease_expires_at; the worker heartbeats
+    to extend it, and an expired lease makes the item claimable again.
+    """
+    __tablename__ = 'work_item'
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'dedupe_key', name='uq_work_item_kind_dedupe_key'),
+        db.Index('ix_work_item_claim', 'status', 'available_at'),
+    )
+    id               = db.Column(db.Integer, primary_key=True)
+    kind             = db.Column(db.String(32), nullable=False)     # ingest | reanalyze
+    dedupe_key       = db.Column(db.String, nullable=False)
+    payload          = db.Column(db.Text, nullable=False)           # JSON
+    status           = db.Column(db.String(16), nullable=False, default='pending')  # pending | leased | done | dead
+    attempts         = db.Column(db.Integer, nullable=False, default=0)
+    available_at     = db.Column(db.DateTime, nullable=False, default=utc_now)
+    lease_owner      = db.Column(db.String)
+    lease_expires_at = db.Column(db.DateTime)
+    heartbeat_at     = db.Column(db.DateTime)
+    outcome          = db.Column(db.String(16))                     # processed | skipped | failed
+    last_error       = db.Column(db.Text)
+    created_at       = db.Column(db.DateTime, nullable=False, default=utc_now)
+    completed_at     = db.Column(db.DateTime, index=True)
+
+class GeminiBatchJob(db.Model):
+    """
+    A Gemini Batch API job submitted for bulk reanalysis (see submit_gemini_batch_jobs).
+    A finished job's output is applied by whichever poller claims the row first
+    (claim_gemini_batch_job); applied_at marks it done for every other poller.
+    """
+    __tablename__ = 'gemini_batch_job'
+    id               = db.Column(db.Integer, primary_key=True)
+    job              = db.Column(db.String, unique=True, nullable=False)   # Batch API job name
+    target           = db.Column(db.String(16), nullable=False)           # reanalyze | reverify
+    tier             = db.Column(db.String(16), nullable=False)
+    model            = db.Column(db.String, nullable=False)
+    state            = db.Column(db.String(32), nullable=False)           # JOB_STATE_*
+    articles         = db.Column(db.Integer, nullable=False)
+    input_path       = db.Column(db.Text)
+    input_file       = db.Column(db.String)
+    submitted_at     = db.Column(db.DateTime, nullable=False, default=utc_now)
+    claimed_by       = db.Column(db.String)
+    claim_expires_at = db.Column(db.DateTime)
+    applied_at       = db.Column(db.DateTime)
+    stats            = db.Column(db.Text)                                 # JSON, once applied
+    error            = db.Column(db.Text)
+
+class ExaWatermark(db.Model):
+    """
+    Per query profile / domain shard `start_published_date` for incremental Exa searches
+    """
+    __tablename__ = 'exa_watermark'
+    id                   = db.Column(db.Integer, primary_key=True)
+    query_key            = db.Column(db.String, unique=True, nullable=False)   # profile:domain-shard hash
+    profile              = db.Column(db.String, nullable=False)
+    domains              = db.Column(db.Text, nullable=False)                  # JSON list of the shard's domains
+    start_published_date = db.Column(db.DateTime)
+    last_run_at          = db.Column(db.DateTime)
+    last_result_count    = db.Column(db.Integer)
+
+class DataGeneration(db.Model):
+    """
+    Single-row counter bumped by mark_data_changed() whenever article data changes.
+    Drives the ETag / Last-Modified validators of the aggregate endpoints.
+    """
+    __tablename__ = 'data_generation'
+    id         = db.Column(db.Integer, primary_key=True)
+    generation = db.Column(db.Integer, nullable=False, default=0)
+    changed_at = db.Column(db.DateTime, nullable=False, default=utc_now)
+
+class ArticleArchiveRollup(db.Model):
+    """
+    Aggregate counts of archived articles per month/source/sentiment/category/fact-check,
+    so stats can include the cold tier without decompressing it.
+    """
+    __tablename__ = 'article_archive_rollup'
+    __table_args__ = (db.UniqueConstraint('month', 'source', 'sentiment', 'category', 'fact_check',
+                                          name='uq_article_archive_rollup_key'),)
+    id            = db.Column(db.Integer, primary_key=True)
+    month         = db.Column(db.String(7), nullable=False)  # YYYY-MM of published_at
+    source        = db.Column(db.String, nullable=False, default='')
+    sentiment     = db.Column(db.String, nullable=False, default='')
+    category      = db.Column(db.String, nullable=False, default='')
+    fact_check    = db.Column(db.String, nullable=False, default='')
+    article_count = db.Column(db.Integer, nullable=False, default=0)
+
+# --- Article Write Helpers ---
+ARTICLE_BULK_CHUNK_SIZE = int(os.getenv('ARTICLE_BULK_CHUNK_SIZE', '500'))
+
+def _dialect_insert(table):
+    """
+    Return the dialect-specific INSERT construct that supports ON CONFLICT
+    """
+    return postgresql.insert(table) if db.engine.dialect.name == 'postgresql' else sqlite.insert(table)
+
+def _article_insert():
+    return _dialect_insert(Article.__table__)
+
+def upsert_article(values):
+    """
+    Insert or update one article keyed on its URL with INSERT ... ON CONFLICT and return its id.
+    Concurrent ingestion processes racing on the same URL update the row instead of failing
+    on the unique constraint. Only the columns present in `values` are overwritten.
+    """
+    values = dict(values, updated_at=utc_now())
+    stmt = _article_insert().values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['url'],
+        set_={k: stmt.excluded[k] for k in values if k not in ('id', 'url')},
+    ).returning(Article.__table__.c.id)
+    return db.session.execute(stmt).scalar_one()
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=' ')
+    return value
+
+def _copy_article_chunk(chunk, columns):
+    """
+    Stream a chunk into a temp staging table with COPY and merge it into `article`
+    with one INSERT ... SELECT ... ON CONFLICT. Returns False if the driver has no COPY support.
+    """
+    raw = db.engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if not hasattr(cursor, 'copy_expert'):
+            return False
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in chunk:
+            writer.writerow([_copy_value(row.get(c)) for c in columns])
+        buf.seek(0)
+        col_list = ', '.join(columns)
+        updates = ', '.join(f'{c} = EXCLUDED.{c}' for c in columns if c not in ('id', 'url'))
+        cursor.execute('CREATE TEMP TABLE article_staging (LIKE article INCLUDING DEFAULTS) ON COMMIT DROP')
+        cursor.copy_expert(f"COPY article_staging ({col_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buf)
+        cursor.execute(
+            f'INSERT INTO article ({col_list}) SELECT {col_list} FROM article_staging '
+            f'ON CONFLICT (url) DO ' + (f'UPDATE SET {updates}' if updates else 'NOTHING')
+        )
+        raw.commit()
+        return True
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+def _write_article_chunk(chunk):
+    # ON CONFLICT DO UPDATE bypasses the column's onupdate, so stamp updated_at explicitly
+    now = utc_now()
+    chunk = [dict(row, updated_at=now) for row in chunk]
+    columns = list(chunk[0].keys())
+    if db.engine.dialect.name == 'postgresql' and _copy_article_chunk(chunk, columns):
+        return len(chunk)
+    stmt = _article_insert()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['url'],
+        set_={c: stmt.excluded[c] for c in columns if c not in ('id', 'url')},
+    )
+    db.session.execute(stmt, chunk)
+    db.session.commit()
+    return len(chunk)
+
+def bulk_upsert_articles(rows, chunk_size=ARTICLE_BULK_CHUNK_SIZE):
+    """
+    Load an iterable of article column dicts (all with the same keys) in chunks.
+    PostgreSQL uses COPY into a staging table, other engines use executemany upserts.
+    Each chunk is committed separately so memory stays bounded. Returns rows written.
+    """
+    written = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            written += _write_article_chunk(chunk)
+            chunk = []
+    if chunk:
+        written += _write_article_chunk(chunk)
+    return written
+
 def safe_capitalize(val, default='Neutral'):
     if isinstance(val, str):
         v = val.capitalize()
@@ -920,54 +1754,311 @@ def normalize_category(val):
             return cat
     return 'Other'
 
-# --- Gemma API Call Function (OpenRouter) ---
-def clean_json_text(text):
+# --- Keyword Matching ---
+# Keyword lists (Bangladesh relevance, category and sentiment inference) are compiled once
+# into an Aho-Corasick automaton, so a text is scanned in a single pass however many
+# keywords there are. pyahocorasick runs the scan in C; without it a pure-Python automaton
+# with the same results is used.
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+class KeywordMatcher:
     """
-    Clean up common JSON formatting issues that might cause parsing errors.
+    Finds which of a fixed set of keywords occur in a text, case-insensitively. With
+    whole_words a hit only counts when it is not part of a longer word (regex `\\b...\\b`).
     """
-    if not text:
-        return ""
-    
-    # Remove markdown code blocks
-    text = re.sub(r'```json\s*', '', text)
-    text = re.sub(r'```\s*$', '', text)
-    
-    # Remove leading/trailing whitespace and newlines
-    text = text.strip()
-    
-    # Fix common quote issues
-    text = re.sub(r'[\u201c\u201d]', '"', text)  # Replace smart quotes
-    text = re.sub(r'[\u2018\u2019]', "'", text)  # Replace smart single quotes
-    
-    # Fix trailing commas in objects and arrays
-    text = re.sub(r',(\s*[}\]])', r'\1', text)
-    
-    return text
+    def __init__(self, keywords, whole_words=True):
+        self.keywords = list(dict.fromkeys(kw.lower() for kw in keywords))
+        self.whole_words = whole_words
+        self._automaton = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                self._automaton.add_word(kw, kw)
+            self._automaton.make_automaton()
+            return
+        # Trie of the keywords, then failure links breadth-first
+        self._goto, self._fail, self._out = [{}], [0], [()]
+        for kw in self.keywords:
+            state = 0
+            for ch in kw:
+                if ch not in self._goto[state]:
+                    self._goto[state][ch] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = self._goto[state][ch]
+            self._out[state] += (kw,)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
 
-def resolve_redirect_url(url):
+    def _iter_hits(self, text):
+        """(end index, keyword) for every occurrence, overlapping ones included"""
+        if self._automaton is not None:
+            yield from self._automaton.iter(text)
+            return
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for kw in out[state]:
+                yield i, kw
+
+    def _iter_matches(self, text):
+        """Keyword of every occurrence in the lowercased text, whole words only if whole_words"""
+        for end, kw in self._iter_hits(text):
+            if self.whole_words:
+                start = end - len(kw) + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if end + 1 < len(text) and _is_word_char(text[end + 1]):
+                    continue
+            yield kw
+
+    def matches(self, text):
+        """Set of the keywords found in text"""
+        text = (text or '').lower()
+        if not text or not self.keywords:
+            return set()
+        return set(self._iter_matches(text))
+
+    def counts(self, text):
+        """Counter of how often each keyword occurs in text"""
+        text = (text or '').lower()
+        if not text or not self.keywords:
+            return Counter()
+        return Counter(self._iter_matches(text))
+
+BD_RELEVANCE_KEYWORDS = [
+    'bangladesh', 'bangladeshi', 'bangladeshis', 'dhaka', 'sheikh hasina', 'bdnews24', 'thedailystar', 'prothomalo', 'dhakatribune', 'newagebd', 'financialexpress.com.bd', 'theindependentbd',
+    'padma', 'jamuna', 'chittagong', 'sylhet', 'khulna', 'rajshahi', 'barisal', 'rangpur', 'mymensingh', 'bengal', 'bengali', 'rohingya', 'cox', 'buriganga', 'ganges', 'sundarbans', 'grameen', 'brac', 'biman', 'sonar bangla', 'ekushey', 'shakib', 'mashrafe', 'mustafizur', 'mirpur', 'banani', 'gulshan', 'uttara', 'motijheel', 'narayanganj', 'gazipur', 'comilla', 'noakhali', 'feni', 'kushtia', 'pabna', 'bogura', 'tangail', 'sirajganj', 'jessore', 'khagrachari', 'bandarban', 'rangamati', 'savar', 'ashulia', 'bimanbandar', 'agargaon', 'bd', 'bdesh', 'bdeshi'
+]
+BD_KEYWORD_MATCHER = KeywordMatcher(BD_RELEVANCE_KEYWORDS)
+BD_RELEVANCE_TITLE_WEIGHT = float(os.getenv('BD_RELEVANCE_TITLE_WEIGHT', '0.5'))    # share of the score a BD keyword in the title earns
+BD_RELEVANCE_DENSITY_SCALE = float(os.getenv('BD_RELEVANCE_DENSITY_SCALE', '3.0'))  # keyword occurrences per 100 words that fill ~63% of the rest
+
+def bd_relevance(title, text, entities=()):
     """
-    Resolve redirect URLs (like Google's grounding API redirects) to get the actual source URL.
+    Bangladesh relevance score (0-100, stored as Article.bd_relevance_score). A BD keyword in
+    the title earns BD_RELEVANCE_TITLE_WEIGHT of it; the rest saturates with the density of
+    BD keyword occurrences in the text and NER entities, so long articles are not marked down
+    for their length.
     """
-    try:
-        # Check if it's a Google grounding API redirect URL
-        if 'vertexaisearch.cloud.google.com/grounding-api-redirect' in url:
-            logger.info(f"Resolving Google redirect URL: {url[:100]}...")
-            
-            # Make a HEAD request to follow redirects
-            response = requests.head(url, allow_redirects=True, timeout=10)
-            
+    body = f"{text or ''}\n{' '.join(entities)}"
+    title_share = BD_RELEVANCE_TITLE_WEIGHT if BD_KEYWORD_MATCHER.matches(title) else 0.0
+    density = 100 * sum(BD_KEYWORD_MATCHER.counts(body).values()) / max(1, len(body.split()))
+    return round(100 * (1 - (1 - title_share) * math.exp(-density / BD_RELEVANCE_DENSITY_SCALE)), 2)
+
+# --- Prompt Compaction ---
+# call_gemini_api() used to send full_text[:4000]. That blind cut often spent the budget on
+# navigation, share widgets and "Also read" blocks, and cut off the body. compact_article_text()
+# drops boilerplate lines and repeated paragraphs. If the rest is still over
+# GEMINI_TEXT_TOKEN_BUDGET, it keeps the highest-ranked sentences, in their original order.
+GEMINI_TEXT_TOKEN_BUDGET = int(os.getenv('GEMINI_TEXT_TOKEN_BUDGET', '900'))
+CHARS_PER_TOKEN = 4  # rough English average, for budgeting only; billed counts come from usage_metadata
+BOILERPLATE_PREFIXES = [
+    'also read', 'read more', 'read also', 'related stories', 'related news', 'recommended',
+    'stories you might', 'you may also like', 'more from', 'advertisement', 'sponsored',
+    'subscribe', 'sign up', 'follow us', 'share this', 'share on', 'share via', 'click here',
+    'download the app', 'download our app', 'copyright', '©', 'all rights reserved',
+    'quick read', 'story saved', 'summary is ai generated', 'published on', 'published by',
+    'updated on', 'photo credit', '| photo credit', 'image source', 'image credit',
+    'we welcome your comments', 'show full', 'web stories', 'live events', '- ends', '\\- ends',
+    'get the latest headlines',
+]
+# A cookie consent dialog ends the article: it and everything after it is dropped
+BOILERPLATE_TAIL_RE = re.compile(
+    r'^(?:#+\s*)?(?:privacy preference center|manage consent preferences|cookie list)\b', re.IGNORECASE)
+BOILERPLATE_LINE_RE = re.compile(
+    r'^(?:#+\s*)?(?:' + '|'.join(re.escape(p) for p in BOILERPLATE_PREFIXES) + r')(?![a-z])'
+    r'|^(?:#+\s*)?\w+ cookies$'
+    r'|^(?:https?://)?(?:www\.)?[\w.-]+\.[a-z]{2,}(?:/\S*)?$',  # a bare URL or domain
+    re.IGNORECASE,
+)
+MARKDOWN_LINK_RE = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')
+
+# spaCy's rule-based sentencizer: no model needed, and much cheaper than running the
+# loaded model's parser a second time just for sentence boundaries
+try:
+    sentence_splitter = spacy.blank('en')
+    sentence_splitter.add_pipe('sentencizer')
+    from spacy.lang.en.stop_words import STOP_WORDS
+except Exception as e:
+    logger.warning(f"spaCy sentencizer unavailable, splitting sentences on punctuation: {e}")
+    sentence_splitter = None
+    STOP_WORDS = frozenset()
+
+def estimate_tokens(text):
+    return len(text or '') // CHARS_PER_TOKEN
+
+def is_boilerplate_line(line):
+    """Navigation, share/"also read" widgets, credits, bare links and short menu-like lines"""
+    if BOILERPLATE_LINE_RE.search(line):
+        return True
+    if line.count('|') + line.count('•') >= 3:
+        return True
+    # Menu items, datelines, section labels: a few words and no sentence punctuation
+    return len(line.split()) < 4 and not line.rstrip('*_"\'”’)').endswith(('.', '!', '?'))
+
+def split_sentences(paragraphs):
+    """List of sentence lists, one per paragraph"""
+    if sentence_splitter is None:
+        return [[s for s in re.split(r'(?<=[.!?])\s+', p) if s] for p in paragraphs]
+    return [[s.text.strip() for s in doc.sents if s.text.strip()] for doc in sentence_splitter.pipe(paragraphs)]
+
+def compact_article_text(title, text, token_budget=GEMINI_TEXT_TOKEN_BUDGET):
+    """
+    Article text for the Gemini prompt: boilerplate lines and repeated paragraphs removed
+    and, if still over token_budget, the best sentences by extractive rank. Each sentence is
+    scored by the document frequency of its content words, with bonuses for title words,
+    BD keywords and the lead. The kept sentences stay in document order.
+    """
+    paragraphs = []
+    seen = set()
+    for line in (text or '').splitlines():
+        line = MARKDOWN_LINK_RE.sub(r'\1', line).strip()
+        if BOILERPLATE_TAIL_RE.search(line):
+            break
+        if not line or is_boilerplate_line(line):
+            continue
+        key = ' '.join(re.findall(r'\w+', line.lower()))
+        if key in seen:
+            continue
+        seen.add(key)
+        paragraphs.append(line)
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    if not paragraphs:
+        # Nothing looked like prose (e.g. a list-only page); fall back to the plain cut
+        return (text or '')[:budget_chars]
+    cleaned = '\n'.join(paragraphs)
+    if len(cleaned) <= budget_chars:
+        return cleaned
+
+    sentences = [(p, i, s) for p, sents in enumerate(split_sentences(paragraphs)) for i, s in enumerate(sents)]
+    words = [[w for w in re.findall(r'[a-z]+', s.lower()) if len(w) > 2 and w not in STOP_WORDS] for _, _, s in sentences]
+    freq = Counter(w for ws in words for w in set(ws))
+    top = max(freq.values(), default=1)
+    title_words = {w for w in re.findall(r'[a-z]+', (title or '').lower()) if len(w) > 2 and w not in STOP_WORDS}
+    scored = []
+    for n, ((p, i, s), ws) in enumerate(zip(sentences, words)):
+        if not ws:
+            continue
+        score = sum(freq[w] for w in set(ws)) / top / len(ws) ** 0.5
+        if title_words:
+            score += len(title_words.intersection(ws)) / len(title_words)
+        score += 0.2 * min(3, len(BD_KEYWORD_MATCHER.matches(s)))
+        if n < 3:
+            score += 0.5
+        scored.append((score, n))
+
+    chosen = set()
+    used = 0
+    for score, n in sorted(scored, reverse=True):
+        size = len(sentences[n][2]) + 1
+        if used + size > budget_chars:
+            continue
+        chosen.add(n)
+        used += size
+    out = []
+    last_paragraph = None
+    for n in sorted(chosen):
+        p, _, s = sentences[n]
+        if p == last_paragraph:
+            out[-1] += ' ' + s
+        else:
+            out.append(s)
+        last_paragraph = p
+    return '\n'.join(out)
+
+@app.cli.command('compaction-report')
+@click.option('--limit', default=500, show_default=True, help='Most recent articles to measure.')
+@click.option('--budget', default=GEMINI_TEXT_TOKEN_BUDGET, show_default=True, help='Token budget to compact to.')
+def compaction_report(limit, budget):
+    """
+    Compare the prompt text of stored articles with the old 4000-character cut and after compaction.
+    Usage: flask compaction-report [--limit 500] [--budget 900]
+    """
+    blind = compacted = original = 0
+    seconds = 0.0
+    articles = (Article.query.options(undefer(Article.full_text)).filter(Article.full_text.isnot(None))
+                .order_by(Article.id.desc()).limit(limit).all())
+    for a in articles:
+        started = time.perf_counter()
+        text = compact_article_text(a.title, a.full_text, budget)
+        seconds += time.perf_counter() - started
+        original += estimate_tokens(a.full_text)
+        blind += estimate_tokens(a.full_text[:4000])
+        compacted += estimate_tokens(text)
+    if not articles:
+        print("No articles with text.")
+        return
+    n = len(articles)
+    print(f"Articles: {n}")
+    print(f"Full text:        {original / n:8.0f} tokens/article (est.)")
+    print(f"4000-char cut:    {blind / n:8.0f} tokens/article")
+    print(f"Compacted:        {compacted / n:8.0f} tokens/article ({(compacted - blind) / max(blind, 1) * 100:+.1f}% vs cut)")
+    print(f"Compaction time:  {seconds / n * 1000:8.2f} ms/article")
+
+# --- Gemma API Call Function (OpenRouter) ---
+def clean_json_text(text):
+    """
+    Clean up common JSON formatting issues that might cause parsing errors.
+    """
+    if not text:
+        return ""
+    
+    # Remove markdown code blocks
+    text = re.sub(r'```json\s*', '', text)
+    text = re.sub(r'```\s*$', '', text)
+    
+    # Remove leading/trailing whitespace and newlines
+    text = text.strip()
+    
+    # Fix common quote issues
+    text = re.sub(r'[\u201c\u201d]', '"', text)  # Replace smart quotes
+    text = re.sub(r'[\u2018\u2019]', "'", text)  # Replace smart single quotes
+    
+    # Fix trailing commas in objects and arrays
+    text = re.sub(r',(\s*[}\]])', r'\1', text)
+    
+    return text
+
+def resolve_redirect_url(url):
+    """
+    Resolve redirect URLs (like Google's grounding API redirects) to get the actual source URL.
+    """
+    try:
+        # Check if it's a Google grounding API redirect URL
+        if 'vertexaisearch.cloud.google.com/grounding-api-redirect' in url:
+            
+            # Make a HEAD request to follow redirects
+            response = http_request('HEAD', url, allow_redirects=True, timeout=stage_timeout('redirect', 10))
+            
             if response.status_code == 200 and response.url != url:
-                logger.info(f"Resolved to: {response.url}")
+                count_event('redirect.resolved')
+                log_sampled(logging.DEBUG, 'redirect.resolved', url=url, final_url=response.url)
                 return response.url
             else:
-                logger.warning(f"Could not resolve redirect URL: {url}")
+                count_event('redirect.unresolved')
+                log_sampled(logging.DEBUG, 'redirect.unresolved', url=url, status=response.status_code)
                 return None
         else:
             # For other URLs, just return as-is
             return url
             
     except Exception as e:
-        logger.warning(f"Error resolving redirect URL {url}: {e}")
+        count_event('redirect.error')
+        log_sampled(logging.WARNING, 'redirect.error', url=url, error=e)
         return None
 
 def extract_json(text):
@@ -989,28 +2080,366 @@ def extract_json(text):
             if json_text_match:
                 return json.loads(json_text_match.group())
         except Exception as e:
-            logger.error(f"❌ Failed to parse JSON: {e}")
-            logger.error(f"Raw text (first 500 chars): {text[:500]}")
-            logger.error(f"Cleaned text (first 500 chars): {cleaned_text[:500]}")
+            log_kv(logging.ERROR, 'json.parse_failed', error=e, length=len(text))
+            log_kv(logging.DEBUG, 'json.parse_failed.dump', raw=text[:500], cleaned=cleaned_text[:500])
     return {}
 
-def call_gemini_api(title, full_text):
+# Gemini answers with a JSON object constrained by GEMINI_ANALYSIS_SCHEMA, and
+# parse_gemini_json() reads it. The regex parser over markdown sections,
+# parse_gemini_response(), is only a fallback for responses that are not valid JSON; each
+# use is counted as gemini.parse.fallback_regex. GEMINI_RESPONSE_FORMAT=text restores the
+# markdown prompt. Search grounding is set by the analysis tier. gemini-2.5 models reject
+# the Google Search tool together with a JSON response mime type, so a grounded request
+# keeps the JSON prompt but drops the schema constraint. GEMINI_JSON_SEARCH=true keeps both,
+# for models that support it. The listed sources are HTTP-validated downstream either way.
+GEMINI_RESPONSE_FORMAT = os.getenv('GEMINI_RESPONSE_FORMAT', 'json').lower()   # json | text
+GEMINI_JSON_SEARCH = os.getenv('GEMINI_JSON_SEARCH', 'false').lower() == 'true'
+GEMINI_SENTIMENTS = ['positive', 'negative', 'neutral', 'cautious']
+GEMINI_CATEGORIES = ['politics', 'sports', 'technology', 'crime', 'health', 'education', 'business', 'entertainment', 'environment', 'others']
+GEMINI_SOURCE_COUNTRIES = ['Bangladesh', 'India', 'International']
+GEMINI_ANALYSIS_FIELDS = ['summary', 'sentiment', 'category', 'geopolitical_implications', 'media_bias_assessment', 'entities', 'sources']
+GEMINI_ANALYSIS_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'summary': {'type': 'STRING'},
+        'sentiment': {'type': 'STRING', 'enum': GEMINI_SENTIMENTS},
+        'category': {'type': 'STRING', 'enum': GEMINI_CATEGORIES},
+        'geopolitical_implications': {'type': 'STRING'},
+        'media_bias_assessment': {'type': 'STRING'},
+        'entities': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+        'sources': {
+            'type': 'ARRAY',
+            'items': {
+                'type': 'OBJECT',
+                'properties': {
+                    'source_name': {'type': 'STRING'},
+                    'source_country': {'type': 'STRING', 'enum': GEMINI_SOURCE_COUNTRIES},
+                    'source_url': {'type': 'STRING'},
+                },
+                'required': ['source_name', 'source_country', 'source_url'],
+                'propertyOrdering': ['source_name', 'source_country', 'source_url'],
+            },
+        },
+    },
+    'required': GEMINI_ANALYSIS_FIELDS,
+    'propertyOrdering': GEMINI_ANALYSIS_FIELDS,
+}
+
+def gemini_json_instructions(search=False):
     """
-    Calls Google Gemini AI for enhanced news analysis with web search capabilities.
+    Field instructions shared by the single-article and batched JSON prompts (formats come from the schema)
     """
-    if not gemini_client:
+    if search:
+        source_instructions = "Use web search to find news articles from other outlets that cover this same story."
+    else:
+        source_instructions = ("List news articles from other outlets that you know cover this same story. "
+                               "Leave the list empty rather than guess a URL.")
+    return f"""
+        - summary: a complete 2-3 sentence summary of the main story and its significance
+        - sentiment: the tone of the reporting
+        - category: the article's topic
+        - geopolitical_implications: the impact on Bangladesh-India relations and regional dynamics
+        - media_bias_assessment: the reporting perspective, potential bias, and framing of the story
+        - entities: important people, places and organizations mentioned
+        - sources: {source_instructions}
+          Each URL must be a complete link to a specific article about this exact topic, not a
+          homepage, section, tag or search page.
+          Search priorities:
+          - Bangladesh: thedailystar.net, prothomalo.com, dhakatribune.com, bdnews24.com, newagebd.net, dailyjanakantha.com, samakal.com, banglatribune.com, somoynews.tv, jamuna.tv
+          - India: timesofindia.indiatimes.com, thehindu.com, economictimes.indiatimes.com, hindustantimes.com, ndtv.com, indianexpress.com, news18.com, business-standard.com
+          - International: bbc.com, reuters.com, aljazeera.com, cnn.com, apnews.com, theguardian.com, nytimes.com, france24.com, dw.com
+        """
+
+def gemini_json_prompt(title, article_text, search=False):
+    """
+    Analysis prompt for GEMINI_RESPONSE_FORMAT=json
+    """
+    return f"""
+        Analyze this Bangladesh-India related news article for SIMS Analytics Dashboard:
+
+        **Title:** {title}
+        **Content:** {article_text}
+
+        Respond with a JSON object:{gemini_json_instructions(search)}"""
+
+def parse_gemini_json(response_text, title, searched=False):
+    """
+    Parse a schema-constrained JSON analysis into the structure parse_gemini_response() returns.
+    Returns None if the text is not a JSON object with a summary, so the caller can fall back.
+    """
+    text = (response_text or '').strip()
+    if text.startswith('```'):
+        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text)
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        log_kv(logging.WARNING, 'gemini.json_invalid', title=title[:50], error=e, preview=text[:200])
+        return None
+    return gemini_analysis_from_dict(data, title, response_text, searched)
+
+def gemini_analysis_from_dict(data, title, raw_response='', searched=False):
+    """
+    Validate one decoded analysis object (see GEMINI_ANALYSIS_SCHEMA); None if it has no summary.
+    `searched`: the request was grounded, so its sources come from search results.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('summary'), str) or not data['summary'].strip():
+        log_kv(logging.WARNING, 'gemini.json_incomplete', title=title[:50], preview=str(data)[:200])
+        return None
+
+    sentiment = str(data.get('sentiment') or '').lower()
+    if sentiment not in GEMINI_SENTIMENTS:
+        count_event('gemini.json.invalid_sentiment')
+        sentiment = 'neutral'
+    category = str(data.get('category') or '').lower()
+    if category not in GEMINI_CATEGORIES:
+        count_event('gemini.json.invalid_category')
+        category = 'others'
+    sources = []
+    for source in data.get('sources') or []:
+        url = str(source.get('source_url') or '').strip() if isinstance(source, dict) else ''
+        if not re.match(r'https?://\S+$', url):
+            count_event('gemini.json.invalid_source')
+            continue
+        country = source.get('source_country')
+        sources.append({
+            'source_name': str(source.get('source_name') or '').strip() or get_article_domain(url),
+            'source_country': country if country in GEMINI_SOURCE_COUNTRIES else 'International',
+            'source_url': url,
+            'verification_status': 'gemini-verified' if searched else 'unverified',
+        })
+    count_event('gemini.sources.structured', len(sources))
+    entities = [str(e).strip() for e in data.get('entities') or [] if str(e).strip()]
+    return {
+        'sentiment': sentiment,
+        'category': category,
+        'summary': data['summary'].strip(),
+        'entities': list(dict.fromkeys(entities))[:15],
+        'fact_check': {
+            'status': determine_fact_check_status(sources),
+            'sources': sources,
+            'web_search_results': []
+        },
+        'geopolitical_implications': str(data.get('geopolitical_implications') or '').strip(),
+        'media_bias_assessment': str(data.get('media_bias_assessment') or '').strip(),
+        'gemini_raw_response': raw_response[:1000]
+    }
+
+# --- Analysis Tiers ---
+# Every Gemini analysis runs in a named tier that sets the model, the thinking budget and
+# whether Google Search grounding is attached:
+# - fast: interactive /api/gemini-analyze requests, answered without thinking or search
+# - standard: reanalysis of articles whose sources are already verified
+# - deep: articles that still need source verification, i.e. outlets outside the source
+#   registry and every article without a verified fact-check backed by validated sources,
+#   which includes every new article. These keep the grounded analysis all articles got
+#   before tiers, so their fact-check verdicts do not shift.
+# route_analysis_tier() applies that policy. A tier is overridden with
+# ANALYSIS_TIER_<NAME>=model,thinking_budget,search (e.g. gemini-2.5-pro,-1,on), where
+# thinking_budget -1 lets the model decide and 0 disables thinking.
+# Each request is timed and priced by tier with GEMINI_PRICES (USD per 1M tokens;
+# thinking is billed as output, grounded prompts at GEMINI_GROUNDING_PRICE, batch jobs at
+# GEMINI_BATCH_JOB_DISCOUNT). The results go to the sims_analysis_tier_* metrics, the
+# tier.<name>.* run-summary counters and /api/analysis-tiers.
+ANALYSIS_TIER_DEFAULTS = {
+    'fast': ('gemini-2.5-flash-lite', 0, False),
+    'standard': ('gemini-2.5-flash', 1024, False),
+    'deep': ('gemini-2.5-flash', -1, True),
+}
+GEMINI_PRICES = {
+    'gemini-2.5-flash-lite': (0.10, 0.40),
+    'gemini-2.5-flash': (0.30, 2.50),
+    'gemini-2.5-pro': (1.25, 10.00),
+}
+GEMINI_GROUNDING_PRICE = float(os.getenv('GEMINI_GROUNDING_PRICE', '0.035'))    # USD per grounded prompt
+GEMINI_BATCH_JOB_DISCOUNT = 0.5
+
+def load_analysis_tiers():
+    tiers = {}
+    for name, (model, thinking_budget, search) in ANALYSIS_TIER_DEFAULTS.items():
+        override = [part.strip() for part in os.getenv(f'ANALYSIS_TIER_{name.upper()}', '').split(',')]
+        if override[0]:
+            model = override[0]
+        if len(override) > 1 and override[1]:
+            thinking_budget = int(override[1])
+        if len(override) > 2 and override[2]:
+            search = override[2].lower() in ('1', 'true', 'on')
+        tiers[name] = {'model': model, 'thinking_budget': thinking_budget, 'search': search}
+    return tiers
+
+ANALYSIS_TIERS = load_analysis_tiers()
+tier_latencies = defaultdict(lambda: deque(maxlen=1000))
+tier_totals = defaultdict(Counter)
+
+def route_analysis_tier(purpose, url=None, fact_check=None, sources=None):
+    """
+    Tier for one analysis: 'fast' for interactive requests, 'standard' for a registered
+    outlet's article whose stored fact-check is verified by validated `sources`, 'deep'
+    (search-grounded source verification) otherwise
+    """
+    if purpose == 'interactive':
+        return 'fast'
+    if url and get_article_domain(url) not in REGISTERED_SOURCES:
+        return 'deep'
+    if (fact_check or '').lower() != 'verified' or not sources:
+        return 'deep'
+    return 'standard'
+
+def route_article_tier(article):
+    """
+    route_analysis_tier() for a stored article (payload loaded) being reanalyzed
+    """
+    try:
+        sources = json.loads(article.fact_check_results or '[]')
+    except ValueError:
+        sources = []
+    return route_analysis_tier('reanalyze', article.url, article.fact_check, sources)
+
+def gemini_request_cost(model, usage, grounded=False, discount=1.0):
+    """
+    Estimated USD cost of one request from its usage metadata
+    """
+    input_price, output_price = GEMINI_PRICES.get(model, GEMINI_PRICES['gemini-2.5-flash'])
+    input_tokens = (getattr(usage, 'prompt_token_count', None) or 0) + (getattr(usage, 'tool_use_prompt_token_count', None) or 0)
+    output_tokens = (getattr(usage, 'candidates_token_count', None) or 0) + (getattr(usage, 'thoughts_token_count', None) or 0)
+    cost = (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+    return (cost + (GEMINI_GROUNDING_PRICE if grounded else 0)) * discount
+
+def record_tier_request(tier, seconds, usage, discount=1.0):
+    """
+    Record one Gemini request's latency (None for batch jobs) and estimated cost under its tier
+    """
+    config = ANALYSIS_TIERS[tier]
+    cost = gemini_request_cost(config['model'], usage, config['search'], discount)
+    totals = tier_totals[tier]
+    totals['requests'] += 1
+    totals['cost_microusd'] += round(cost * 1_000_000)
+    totals['prompt_tokens'] += getattr(usage, 'prompt_token_count', None) or 0
+    totals['output_tokens'] += getattr(usage, 'candidates_token_count', None) or 0
+    totals['thinking_tokens'] += getattr(usage, 'thoughts_token_count', None) or 0
+    count_event(f'tier.{tier}.requests')
+    count_event(f'tier.{tier}.cost_microusd', round(cost * 1_000_000))
+    if seconds is not None:
+        tier_latencies[tier].append(seconds)
+    if prometheus_client is not None:
+        ANALYSIS_TIER_COST.labels(tier).inc(cost)
+        if seconds is not None:
+            ANALYSIS_TIER_SECONDS.labels(tier).observe(seconds)
+
+def analysis_tier_report():
+    """
+    Tier settings with this process's request count, latency percentiles and cost per tier
+    """
+    report = {}
+    for tier, config in ANALYSIS_TIERS.items():
+        totals = tier_totals[tier]
+        latencies = sorted(tier_latencies[tier])
+        requests_count = totals['requests']
+        report[tier] = dict(
+            config,
+            requests=requests_count,
+            p50_ms=round(latencies[len(latencies) // 2] * 1000) if latencies else None,
+            p95_ms=round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000) if latencies else None,
+            cost_usd=round(totals['cost_microusd'] / 1_000_000, 4),
+            cost_per_request_usd=round(totals['cost_microusd'] / 1_000_000 / requests_count, 6) if requests_count else None,
+            prompt_tokens=totals['prompt_tokens'],
+            output_tokens=totals['output_tokens'],
+            thinking_tokens=totals['thinking_tokens'],
+        )
+    return report
+
+def stream_gemini(prompt, response_schema=None, tier='standard', client=None):
+    """
+    Send one prompt to Gemini, streaming, and return the response text. The tier sets the
+    model, thinking budget and search grounding; with a response_schema the answer is
+    requested as JSON (unconstrained when grounded, unless GEMINI_JSON_SEARCH). `client`
+    defaults to the module's gemini_client.
+    Times out after GEMINI_TIMEOUT_SECONDS, or raises DeadlineExceeded when the article's
+    budget runs out first.
+    """
+    config = ANALYSIS_TIERS[tier]
+    if config['search'] and not GEMINI_JSON_SEARCH:
+        response_schema = None
+    contents = [
+        types.Content(
+            role="user",
+            parts=[
+                types.Part.from_text(text=prompt),
+            ],
+        ),
+    ]
+    use_json = response_schema is not None
+    tools = [
+        types.Tool(googleSearch=types.GoogleSearch()),
+    ] if config['search'] else None
+    generate_content_config = types.GenerateContentConfig(
+        thinking_config=types.ThinkingConfig(
+            thinking_budget=config['thinking_budget'],
+        ),
+        tools=tools,
+        response_mime_type="application/json" if use_json else "text/plain",
+        response_schema=response_schema,
+        # Applies to connecting and to each read, so a stalled stream fails within the budget
+        http_options=types.HttpOptions(timeout=math.ceil(stage_timeout('gemini', GEMINI_TIMEOUT_SECONDS) * 1000)),
+    )
+
+    # Collect the streaming response
+    response_text = ""
+    usage = None
+    started = time.perf_counter()
+    try:
+        with observe_stage('gemini_call'), observe_outbound('generativelanguage.googleapis.com'):
+            for chunk in (client or gemini_client).models.generate_content_stream(
+                model=config['model'],
+                contents=contents,
+                config=generate_content_config,
+            ):
+                if chunk.text:
+                    response_text += chunk.text
+                # Token counts arrive on the stream's last chunk(s)
+                usage = getattr(chunk, 'usage_metadata', None) or usage
+                # A stream that keeps trickling is cut off between chunks
+                check_deadline('gemini')
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        # A read timeout shortened to the remaining budget
+        if deadline_spent():
+            raise DeadlineExceeded('gemini') from e
+        raise
+    record_gemini_usage(usage)
+    record_tier_request(tier, time.perf_counter() - started, usage)
+    count_event('gemini.responses')
+    return response_text
+
+def call_gemini_api(title, full_text, tier='standard', client=None, response_format=None):
+    """
+    Calls Google Gemini AI for enhanced news analysis in the given analysis tier.
+    Returns None if the analysis failed; raises DeadlineExceeded if the article's budget ran out.
+    `client` and `response_format` default to gemini_client and GEMINI_RESPONSE_FORMAT.
+    """
+    client = client or gemini_client
+    if not client:
         logger.error("Gemini AI client not initialized!")
         return None
     
     try:
-        logger.info(f"Making Gemini AI API call for article: {title[:50]}...")
+        article_text = compact_article_text(title, full_text)
+        count_event('prompt.text_tokens_in', estimate_tokens(full_text))
+        count_event('prompt.text_tokens_sent', estimate_tokens(article_text))
+        log_kv(logging.DEBUG, 'gemini.call', title=title[:50], tier=tier, text_length=len(full_text or ''),
+               sent_length=len(article_text))
         
+        use_json = (response_format or GEMINI_RESPONSE_FORMAT) == 'json'
+        searched = ANALYSIS_TIERS[tier]['search']
         # Construct the analysis prompt specifically for SIMS Analytics
-        analysis_prompt = f"""
+        if use_json:
+            analysis_prompt = gemini_json_prompt(title, article_text, search=searched)
+        else:
+            analysis_prompt = f"""
         Analyze this Bangladesh-India related news article for SIMS Analytics Dashboard:
         
         **Title:** {title}
-        **Content:** {full_text[:4000]}
+        **Content:** {article_text}
         
         Please provide a comprehensive analysis in the following format:
         
@@ -1058,58 +2487,36 @@ def call_gemini_api(title, full_text):
         - Include "VERIFIED: ✓" for each working URL you confirm
         """
         
-        model = "gemini-2.5-flash"
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_text(text=analysis_prompt),
-                ],
-            ),
-        ]
-        tools = [
-            types.Tool(googleSearch=types.GoogleSearch()),
-        ]
-        generate_content_config = types.GenerateContentConfig(
-            thinking_config=types.ThinkingConfig(
-                thinking_budget=-1,
-            ),
-            tools=tools,
-            response_mime_type="text/plain",
-        )
-
-        # Collect the streaming response
-        response_text = ""
-        for chunk in gemini_client.models.generate_content_stream(
-            model=model,
-            contents=contents,
-            config=generate_content_config,
-        ):
-            if chunk.text:
-                response_text += chunk.text
-
-        logger.info(f"Gemini AI response received for '{title[:30]}...': {len(response_text)} chars")
-        
+        response_text = stream_gemini(analysis_prompt, GEMINI_ANALYSIS_SCHEMA if use_json else None, tier, client)
+        log_kv(logging.DEBUG, 'gemini.response', title=title[:50], length=len(response_text))
         # Debug: Log the raw response to see what Gemini is actually returning
-        logger.info(f"=== GEMINI RAW RESPONSE DEBUG ===")
-        logger.info(f"Title: {title[:50]}...")
-        logger.info(f"Response length: {len(response_text)} characters")
-        logger.info(f"Raw response preview (first 500 chars): {response_text[:500]}")
-        logger.info(f"=== END GEMINI RAW RESPONSE ===")
-        
-        # Check if web search results are present
-        if "search" in response_text.lower() or "sources" in response_text.lower():
-            logger.info("✓ Response appears to contain search/sources information")
-        else:
-            logger.warning("⚠ Response does not seem to contain search/sources information")
+        log_kv(logging.DEBUG, 'gemini.response.dump', preview=response_text[:500])
         
         # Parse the response and structure it for SIMS Analytics
-        return parse_gemini_response(response_text, title)
+        return parse_gemini_analysis(response_text, title, use_json, searched)
         
+    except DeadlineExceeded:
+        # Not a failed analysis: the caller stores what it has and retries the article
+        raise
     except Exception as e:
         logger.error(f"Gemini AI API request failed for article '{title}': {e}")
         return None
 
+def parse_gemini_analysis(response_text, title, use_json=True, searched=False):
+    """
+    Parse one article's Gemini response, JSON first with the markdown parser as fallback
+    """
+    with observe_stage('parse'):
+        result = parse_gemini_json(response_text, title, searched) if use_json else None
+        if result is not None:
+            count_event('gemini.parse.json')
+        else:
+            count_event('gemini.parse.fallback_regex' if use_json else 'gemini.parse.regex')
+            result = parse_gemini_response(response_text, title)
+    if result and not result['fact_check']['sources']:
+        count_event('gemini.responses_without_sources')
+    return result
+
 def parse_gemini_response(response_text, title):
     """
     Parse Gemini AI response and structure it for SIMS Analytics compatibility.
@@ -1158,37 +2565,32 @@ def parse_gemini_response(response_text, title):
                 'source_url': source_url,
                 'verification_status': verification_status
             })
-            verification_marker = "🟢 GEMINI-VERIFIED" if verification_status == "gemini-verified" else "🟡 UNVERIFIED"
-            logger.info(f"✓ Structured source found: {source_name} ({source_country}) - {source_url} [{verification_marker}]")
+            log_sampled(logging.DEBUG, 'gemini.structured_source', name=source_name,
+                        country=source_country, url=source_url, status=verification_status)
         
         # If structured sources found, use them directly (prioritize Gemini-verified ones)
         if structured_sources:
-            logger.info(f"Using {len(structured_sources)} structured sources from Gemini")
-            
             # Separate Gemini-verified from unverified sources
             gemini_verified = [s for s in structured_sources if s.get('verification_status') == 'gemini-verified']
             unverified = [s for s in structured_sources if s.get('verification_status') != 'gemini-verified']
+            count_event('gemini.sources.structured', len(structured_sources))
+            count_event('gemini.sources.gemini_verified', len(gemini_verified))
             
             if gemini_verified:
-                logger.info(f"🟢 Found {len(gemini_verified)} Gemini-verified sources (skipping backend validation)")
+                # Gemini-verified sources skip backend validation
                 sources = gemini_verified
             else:
-                logger.info(f"🟡 Found {len(unverified)} unverified sources (will apply backend validation)")
                 # Apply backend validation to unverified sources
                 validated_sources = []
                 for source in unverified:
                     url = source['source_url']
-                    logger.info(f"Backend validating: {url}")
                     if validate_url_thoroughly(url):
                         source['verification_status'] = 'backend-verified'
                         validated_sources.append(source)
-                        logger.info(f"✓ Backend validated: {url}")
-                    else:
-                        logger.info(f"✗ Backend validation failed: {url}")
                 sources = validated_sources
         else:
             # Fallback to URL extraction method
-            logger.info("No structured sources found, falling back to URL extraction")
+            count_event('gemini.sources.url_extraction_fallback')
             
             url_patterns = [
                 r'https?://[^\s\)\]\,\;\"\'\n]+',  # Enhanced HTTP URLs (stop at more punctuation)
@@ -1210,10 +2612,7 @@ def parse_gemini_response(response_text, title):
                     if url and len(url) > 10:  # Only URLs longer than 10 chars
                         found_urls.append(url)
             
-            logger.info(f"=== URL EXTRACTION DEBUG ===")
-            logger.info(f"Raw URLs found: {len(found_urls)}")
-            if found_urls:
-                logger.info(f"First 5 raw URLs: {found_urls[:5]}")
+            log_kv(logging.DEBUG, 'url_extraction.raw', count=len(found_urls), first=found_urls[:5])
             
             # Clean and validate URLs for actual article content
             valid_urls = []
@@ -1234,7 +2633,7 @@ def parse_gemini_response(response_text, title):
                 ]
                 
                 if any(skip in url.lower() for skip in skip_patterns):
-                    logger.info(f"✗ URL skipped (non-article): {url}")
+                    count_event('url_extraction.skipped_non_article')
                     continue
                     
                 # Only include URLs that look like actual articles
@@ -1249,19 +2648,17 @@ def parse_gemini_response(response_text, title):
                         parsed = urlparse(url)
                         if parsed.scheme and parsed.netloc:
                             valid_urls.append(url)
-                            logger.info(f"✓ Valid article URL: {url}")
                         else:
-                            logger.info(f"✗ Invalid URL format: {url}")
+                            count_event('url_extraction.invalid_format')
                     except Exception as e:
-                        logger.info(f"✗ URL parsing error for {url}: {e}")
+                        count_event('url_extraction.parse_error')
                 else:
-                    logger.info(f"✗ URL doesn't look like article: {url}")
+                    count_event('url_extraction.not_article_like')
             
-            logger.info(f"Valid article URLs after filtering: {len(valid_urls)}")
+            count_event('url_extraction.candidates', len(valid_urls))
             
             # Create sources from found URLs
             sources = []
-            logger.info(f"=== SOURCE CREATION DEBUG ===")
             
             # Use global validate_url_thoroughly function
             
@@ -1274,9 +2671,7 @@ def parse_gemini_response(response_text, title):
                     clean_domain = domain.replace('www.', '')
                     
                     # Thorough URL validation
-                    logger.info(f"Validating URL: {url}")
                     if not validate_url_thoroughly(url):
-                        logger.info(f"✗ URL validation failed: {url}")
                         continue
                     
                     # Use the comprehensive BD sources map for accurate categorization
@@ -1285,12 +2680,10 @@ def parse_gemini_response(response_text, title):
                         # Known BD or International source
                         source_country = source_info.get('source_country', 'International')
                         source_name = source_info.get('source_name', source_info.get('name', clean_domain.title()))
-                        logger.info(f"✓ Known source validated: {source_name} ({source_country}) - {url}")
                     else:
                         # Unknown domain - categorize as "International" (anything non-BD is international)
                         source_country = 'International'
                         source_name = clean_domain.title()
-                        logger.info(f"✓ Unknown source validated: {source_name} ({source_country}) - {url}")
                     
                     sources.append({
                         'source_name': source_name,
@@ -1298,13 +2691,12 @@ def parse_gemini_response(response_text, title):
                         'source_url': url
                     })
                 except Exception as e:
-                    logger.error(f"✗ Error processing URL {url}: {e}")
+                    log_kv(logging.ERROR, 'url_extraction.error', url=url, error=e)
                     continue
             
-            logger.info(f"Final validated sources created: {len(sources)}")
-            for i, source in enumerate(sources):
-                logger.info(f"  Source {i+1}: {source['source_name']} ({source['source_country']}) - {source['source_url']}")
-            logger.info(f"=== END URL EXTRACTION DEBUG ===")
+            count_event('url_extraction.sources', len(sources))
+            log_kv(logging.DEBUG, 'url_extraction.sources', count=len(sources),
+                   sources=[f"{x['source_name']}|{x['source_country']}|{x['source_url']}" for x in sources])
         
         result['fact_check']['sources'] = sources
         
@@ -1448,42 +2840,211 @@ def parse_gemini_response(response_text, title):
         
         result['fact_check']['status'] = fact_check_status
         
-        logger.info(f"Gemini AI response parsed successfully for '{title[:30]}...': {len(sources)} sources found, status: {fact_check_status}")
+        log_kv(logging.DEBUG, 'gemini.parsed', title=title[:30], sources=len(sources), status=fact_check_status)
         return result
                 
     except Exception as e:
-        logger.error(f"Error parsing Gemini AI response for '{title}': {e}")
-        logger.error(f"Response text preview: {response_text[:500]}...")
+        log_kv(logging.ERROR, 'gemini.parse_failed', title=title, error=e)
+        log_kv(logging.DEBUG, 'gemini.parse_failed.dump', preview=response_text[:500])
         return None
     
-def call_gemma_api(title, full_text):
+def call_gemma_api(title, full_text, tier='standard', client=None, response_format=None):
     """
-    Calls Google Gemini 2.5 Flash model exclusively for news analysis.
+    Calls Google Gemini exclusively for news analysis, with the model of the given analysis tier.
     No fallback to other models.
     """
-    if not gemini_client:
+    if not (client or gemini_client):
         logger.error("Gemini AI client not initialized! Please check GEMINI_API_KEY configuration.")
         return None
         
-    logger.info(f"Using Gemini 2.5 Flash for analysis: {title[:50]}...")
-    gemini_result = call_gemini_api(title, full_text)
+    log_kv(logging.DEBUG, 'gemma.analyze', model=ANALYSIS_TIERS[tier]['model'], tier=tier, title=title[:50])
+    gemini_result = call_gemini_api(title, full_text, tier, client, response_format)
     
     if gemini_result:
-        # Convert Gemini result to expected format
-        return {
-            'sentiment': gemini_result.get('sentiment', 'neutral'),
-            'category': gemini_result.get('category', 'others'),
-            'summary': gemini_result.get('summary', ''),
-            'fact_check': gemini_result.get('fact_check', {'status': 'unverified', 'sources': []}),
-            'gemini_enhanced': True,
-            'geopolitical_implications': gemini_result.get('geopolitical_implications', ''),
-            'media_bias_assessment': gemini_result.get('media_bias_assessment', ''),
-            'entities_extracted': gemini_result.get('entities', [])
-        }
+        return gemma_result_from_gemini(gemini_result)
     else:
         logger.error(f"Gemini AI analysis failed for article '{title}' - no fallback model configured")
     return None
 
+def gemma_result_from_gemini(gemini_result):
+    """
+    Convert a Gemini analysis to the format the ingestion and reanalysis paths store
+    """
+    return {
+        'sentiment': gemini_result.get('sentiment', 'neutral'),
+        'category': gemini_result.get('category', 'others'),
+        'summary': gemini_result.get('summary', ''),
+        'fact_check': gemini_result.get('fact_check', {'status': 'unverified', 'sources': []}),
+        'gemini_enhanced': True,
+        'geopolitical_implications': gemini_result.get('geopolitical_implications', ''),
+        'media_bias_assessment': gemini_result.get('media_bias_assessment', ''),
+        'entities_extracted': gemini_result.get('entities', [])
+    }
+
+# --- Batched Gemini Analysis ---
+# Each single-article request repeats the same ~2 KB of instructions and pays the fixed
+# per-request latency. With GEMINI_BATCH_SIZE > 1 (JSON response format only), several
+# compacted articles share one request instead. Each article is tagged with a short id
+# (a1, a2, ...) and the model returns one analysis per id under "analyses". Batches are
+# packed greedily up to GEMINI_BATCH_TOKEN_BUDGET estimated input tokens. The response is
+# split back per article. An article whose analysis is missing or invalid, or every
+# article of a batch whose response does not parse, is retried with its own request
+# (counted as gemini.batch.retried_individually).
+GEMINI_BATCH_SIZE = int(os.getenv('GEMINI_BATCH_SIZE', '1'))                         # articles per request, 1 disables
+GEMINI_BATCH_TOKEN_BUDGET = int(os.getenv('GEMINI_BATCH_TOKEN_BUDGET', '6000'))       # estimated article tokens per request
+GEMINI_BATCH_ARTICLE_OVERHEAD = 20   # estimated tokens for an article's heading and labels
+GEMINI_BATCH_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'analyses': {
+            'type': 'ARRAY',
+            'items': dict(
+                GEMINI_ANALYSIS_SCHEMA,
+                properties={'article_id': {'type': 'STRING'}, **GEMINI_ANALYSIS_SCHEMA['properties']},
+                required=['article_id'] + GEMINI_ANALYSIS_FIELDS,
+                propertyOrdering=['article_id'] + GEMINI_ANALYSIS_FIELDS,
+            ),
+        },
+    },
+    'required': ['analyses'],
+}
+
+def gemini_batching_enabled(batch_size=None, response_format=None):
+    return (batch_size or GEMINI_BATCH_SIZE) > 1 and (response_format or GEMINI_RESPONSE_FORMAT) == 'json'
+
+def pack_gemini_batches(entries, max_articles=None, token_budget=None):
+    """
+    Split (key, title, article_text) entries, in order, into lists of at most `max_articles`
+    whose estimated tokens stay within `token_budget`. An article over the budget on its own
+    gets a batch of one.
+    """
+    max_articles = max_articles or GEMINI_BATCH_SIZE
+    token_budget = token_budget or GEMINI_BATCH_TOKEN_BUDGET
+    batches, batch, batch_tokens = [], [], 0
+    for entry in entries:
+        tokens = estimate_tokens(entry[1]) + estimate_tokens(entry[2]) + GEMINI_BATCH_ARTICLE_OVERHEAD
+        if batch and (len(batch) >= max_articles or batch_tokens + tokens > token_budget):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(entry)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+def gemini_batch_prompt(entries, search=False):
+    """
+    Analysis prompt for several articles; `entries` are (article_id, title, article_text)
+    """
+    articles = ''.join(
+        f"""
+        ### Article {article_id}
+        **Title:** {title}
+        **Content:** {article_text}
+"""
+        for article_id, title, article_text in entries
+    )
+    return f"""
+        Analyze each of these {len(entries)} Bangladesh-India related news articles for SIMS Analytics Dashboard.
+        Treat every article independently; do not mix facts between them.
+{articles}
+        Respond with a JSON object whose "analyses" list has exactly one entry per article:
+        - article_id: the id from the article's heading (e.g. {entries[0][0]}){gemini_json_instructions(search)}"""
+
+def parse_gemini_batch(response_text, titles, searched=False):
+    """
+    Split a batched JSON response into {article_id: analysis} for the ids in `titles`
+    ({article_id: title}). Entries with unknown, repeated or invalid analyses are left out;
+    a response that is not valid JSON gives {}.
+    """
+    text = (response_text or '').strip()
+    if text.startswith('```'):
+        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text)
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        log_kv(logging.WARNING, 'gemini.batch.json_invalid', articles=len(titles), error=e, preview=text[:200])
+        return {}
+    analyses = data.get('analyses') if isinstance(data, dict) else None
+    if not isinstance(analyses, list):
+        log_kv(logging.WARNING, 'gemini.batch.json_incomplete', articles=len(titles), preview=text[:200])
+        return {}
+    results = {}
+    for entry in analyses:
+        article_id = str(entry.get('article_id') or '').strip() if isinstance(entry, dict) else ''
+        if article_id not in titles:
+            count_event('gemini.batch.unknown_id')
+            continue
+        if article_id in results:
+            count_event('gemini.batch.duplicate_id')
+            continue
+        result = gemini_analysis_from_dict(entry, titles[article_id], response_text, searched)
+        if result is not None:
+            results[article_id] = result
+    return results
+
+def call_gemma_api_batch(articles, individual=True, client=None, batch_size=None, response_format=None):
+    """
+    Analyze (key, title, full_text, tier) articles, several per Gemini request when batching
+    is enabled (a batch never mixes tiers). Returns {key: result in call_gemma_api() format,
+    or None if it failed}. Each batched request gets one ARTICLE_DEADLINE_SECONDS budget.
+    Articles that end up alone or in a failed batch are analyzed one by one; with
+    individual=False they are returned as None instead, for a caller that analyzes them
+    itself under a per-article deadline. `client`, `batch_size` and `response_format`
+    default to gemini_client, GEMINI_BATCH_SIZE and GEMINI_RESPONSE_FORMAT.
+    """
+    client = client or gemini_client
+
+    def analyze_individually(title, full_text, tier):
+        return call_gemma_api(title, full_text, tier, client, response_format) if individual else None
+
+    if not gemini_batching_enabled(batch_size, response_format) or not client or len(articles) < 2:
+        return {key: analyze_individually(title, full_text, tier) for key, title, full_text, tier in articles}
+    full_texts = {key: full_text for key, _, full_text, _ in articles}
+    tiers = {key: tier for key, _, _, tier in articles}
+    results = {}
+    for tier in dict.fromkeys(tiers.values()):
+        searched = ANALYSIS_TIERS[tier]['search']
+        entries = [(key, title, compact_article_text(title, full_text))
+                   for key, title, full_text, article_tier in articles if article_tier == tier]
+        for batch in pack_gemini_batches(entries, batch_size):
+            if len(batch) == 1:
+                key, title, _ = batch[0]
+                results[key] = analyze_individually(title, full_texts[key], tier)
+                continue
+            ids = {f'a{i + 1}': entry for i, entry in enumerate(batch)}
+            count_event('gemini.batch.requests')
+            count_event('gemini.batch.articles', len(batch))
+            for key, title, article_text in batch:
+                count_event('prompt.text_tokens_in', estimate_tokens(full_texts[key]))
+                count_event('prompt.text_tokens_sent', estimate_tokens(article_text))
+            prompt = gemini_batch_prompt([(article_id, title, article_text)
+                                          for article_id, (_, title, article_text) in ids.items()],
+                                         search=searched)
+            try:
+                with article_deadline():
+                    response_text = stream_gemini(prompt, GEMINI_BATCH_SCHEMA, tier, client)
+                with observe_stage('parse'):
+                    parsed = parse_gemini_batch(response_text, {article_id: entry[1] for article_id, entry in ids.items()},
+                                                searched)
+            except Exception as e:
+                log_kv(logging.ERROR, 'gemini.batch.failed', articles=len(batch), tier=tier, error=e)
+                parsed = {}
+            if not parsed:
+                count_event('gemini.batch.failed')
+            log_kv(logging.DEBUG, 'gemini.batch.response', articles=len(batch), tier=tier, parsed=len(parsed))
+            for article_id, (key, title, _) in ids.items():
+                result = parsed.get(article_id)
+                if result is None:
+                    count_event('gemini.batch.retried_individually')
+                    results[key] = analyze_individually(title, full_texts[key], tier)
+                    continue
+                count_event('gemini.parse.json')
+                if not result['fact_check']['sources']:
+                    count_event('gemini.responses_without_sources')
+                results[key] = gemma_result_from_gemini(result)
+    return results
+
 def parse_gemma_response(response_text, title):
     """
     Parse the structured response from Gemma API.
@@ -1546,449 +3107,2429 @@ def parse_gemma_response(response_text, title):
                 }
             ]
         
-        logger.info(f"Parsed result for '{title[:30]}...': sentiment={result['sentiment']}, category={result['category']}")
+        log_kv(logging.DEBUG, 'gemma.parsed', title=title[:30], sentiment=result['sentiment'], category=result['category'])
         return result
         
     except Exception as e:
-        logger.error(f"Error parsing Gemma response for '{title}': {e}")
-        logger.error(f"Raw response: {response_text[:500]}...")
+        log_kv(logging.ERROR, 'gemma.parse_failed', title=title, error=e)
+        log_kv(logging.DEBUG, 'gemma.parse_failed.dump', preview=response_text[:500])
         return None
 
-# --- Refactor ingestion to use Gemma ---
-def run_exa_ingestion():
-    if not EXA_API_KEY:
-        logger.error("Error: EXA_API_KEY environment variable not set")
-        return
-    with app.app_context():
-        # Check for very recent articles, but don't block - just log a warning
-        # The duplicate checking later will handle actual duplicates
-        recent_articles = Article.query.filter(
-            Article.published_at >= datetime.datetime.now() - datetime.timedelta(hours=2)
-        ).count()
-        if recent_articles > 50:  # Increased threshold from 10 to 50
-            logger.warning(f"Found {recent_articles} recent articles (last 2 hours). This is high, but continuing ingestion anyway. Duplicate checking will filter duplicates.")
-        elif recent_articles > 10:
-            logger.info(f"Found {recent_articles} recent articles in last 2 hours. Continuing ingestion...")
-    exa = Exa(api_key=EXA_API_KEY)
-    logger.info("Running Exa ingestion for Bangladesh-related news coverage by Indian Media...")
-    all_domains = list(INDIAN_SOURCES.union(BD_SOURCES).union(INTL_SOURCES))
-    result = exa.search_and_contents(
-        "Bangladesh-related News coverage by Indian news media",
-        category="news",
-        text=True,
-        num_results=25,
-        livecrawl="always",
-        include_domains=all_domains,
-        subpages=5,
-        subpage_target=[
-            "bangladesh", "article", "story", "news", "2024", "2023", "politics", "diplomacy"
-        ],
-        include_text=["Bangladesh"]
-    )
-    logger.info(f"Total results from Exa: {len(result.results)}")
-    def is_article_url(url):
-        if not url:
-            return False
-        url = url.lower()
-        if url.rstrip('/') in ["https://indianexpress.com", "https://www.indianexpress.com"]:
-            return False
-        if url.endswith(('/', '/news', '/home', '/index.html')):
-            return False
-        if re.search(r'/20[0-9]{2}/', url):
-            return True
-        if any(x in url for x in ['/article/', '/news/', '/story/', '/politics/', '/diplomacy/', '/world/', '/india/', '/bangladesh/']):
-            return True
-        if url.count('/') > 3:
-            return True
-        return False
-    def is_article_title(title):
-        bad_phrases = [
-            "Latest News", "Breaking News", "Top Headlines", "Home", "Update", "Today", "Live", "Videos", "Photos"
-        ]
-        if not title:
-            return False
-        if any(phrase.lower() in title.lower() for phrase in bad_phrases):
-            return False
-        return True
-    def is_article_text(text):
-        if not text or len(text) < 300:
-            return False
-        if "bangladesh" not in text.lower():
-            return False
-        lines = text.splitlines()
-        if lines:
-            list_lines = sum(1 for l in lines if l.strip().startswith(('-', '*')))
-            if list_lines / len(lines) > 0.5:
-                return False
-        return True
-    seen_titles = set()
-    filtered_results = []
-    for r in result.results:
-        url = getattr(r, 'url', '')
-        title = getattr(r, 'title', '')
-        text = getattr(r, 'text', '')
-        title_hash = hashlib.md5(title.strip().lower().encode('utf-8')).hexdigest() if title else None
-        if (
-            is_article_url(url)
-            and is_article_title(title)
-            and is_article_text(text)
-            and title_hash not in seen_titles
-        ):
-            seen_titles.add(title_hash)
-            filtered_results.append(r)
-    logger.info(f"Filtered to {len(filtered_results)} likely articles (from {len(result.results)})")
-    logger.info(f"Starting processing at {datetime.datetime.now()}")
-    
-    # Check current database state before processing
-    existing_articles = Article.query.count()
-    existing_with_analysis = Article.query.filter(Article.summary_json.isnot(None)).count()
-    logger.info(f"Pre-processing database state: {existing_articles} articles, {existing_with_analysis} with analysis")
-    
-    # Counters for monitoring
-    processed_count = 0
-    skipped_count = 0
-    for idx, item in enumerate(filtered_results):
-        art = None  # Initialize art to None at the start of each loop
+# --- Exa Fetch (search first, contents only for unseen URLs) ---
+# Phase one is a plain Exa search (titles/URLs, no crawl). Result URLs are canonicalized and
+# checked against the known-URL index; phase two live-crawls contents only for the new ones.
+EXA_TWO_PHASE = os.getenv('EXA_TWO_PHASE', 'on').lower() in ('1', 'true', 'on')
+EXA_CONTENTS_BATCH_SIZE = int(os.getenv('EXA_CONTENTS_BATCH_SIZE', '10'))
+KNOWN_URL_BLOOM_CAPACITY = int(os.getenv('KNOWN_URL_BLOOM_CAPACITY', '200000'))
+KNOWN_URL_BLOOM_ERROR_RATE = float(os.getenv('KNOWN_URL_BLOOM_ERROR_RATE', '0.001'))
+TRACKING_QUERY_PARAMS = {'fbclid', 'gclid', 'ocid', 'cmpid', 'ref', 'ref_src', 'src', 'utm_source',
+                         'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'at_medium', 'at_campaign'}
+
+def canonical_url(url):
+    """
+    Normalize a URL for duplicate detection: https, lower-case host without www., no fragment,
+    no tracking query parameters, sorted query string and no trailing slash.
+    """
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port:
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in TRACKING_QUERY_PARAMS
+    ))
+    path = parts.path.rstrip('/') or ''
+    scheme = parts.scheme.lower()
+    if scheme in ('', 'http'):
+        scheme = 'https'
+    return urlunsplit((scheme, host, path, query, ''))
+
+def url_variants(url):
+    """
+    Spellings a stored Article.url may have for the same canonical URL
+    """
+    canonical = canonical_url(url)
+    parts = urlsplit(canonical)
+    variants = {url, canonical}
+    for scheme in ('https', 'http'):
+        for host in (parts.netloc, f"www.{parts.netloc}"):
+            for path in (parts.path, parts.path + '/'):
+                variants.add(urlunsplit((scheme, host, path, parts.query, '')))
+    return variants
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings (double hashing on one blake2b digest).
+    No false negatives; false positives at about `error_rate` once `capacity` items are added.
+    """
+    def __init__(self, capacity, error_rate):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, value):
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+# Process-wide index of canonical URLs already stored (hot or archived). Loaded incrementally by
+# article id, so each run only reads rows added since the previous one.
+_known_urls = {'bloom': None, 'last_id': 0}
+_known_urls_lock = threading.Lock()
+
+def refresh_known_urls():
+    with _known_urls_lock:
+        if _known_urls['bloom'] is None:
+            _known_urls['bloom'] = BloomFilter(KNOWN_URL_BLOOM_CAPACITY, KNOWN_URL_BLOOM_ERROR_RATE)
+        bloom = _known_urls['bloom']
+        last_id = _known_urls['last_id']
+        for model in (Article, ArchivedArticle):
+            for article_id, url in db.session.query(model.id, model.url).filter(model.id > last_id).yield_per(5000):
+                bloom.add(canonical_url(url))
+                _known_urls['last_id'] = max(_known_urls['last_id'], article_id)
+        return bloom
+
+def unseen_urls(urls):
+    """
+    Return the subset of `urls` not stored yet. The Bloom filter answers "new" for most
+    URLs without touching the database; only its "maybe seen" answers are confirmed by a
+    lookup of the stored spellings in article and article_archive.
+    """
+    bloom = refresh_known_urls()
+    maybe_seen = [u for u in urls if canonical_url(u) in bloom]
+    seen = set()
+    if maybe_seen:
+        variants = {v: u for u in maybe_seen for v in url_variants(u)}
+        for model in (Article, ArchivedArticle):
+            for (url,) in db.session.query(model.url).filter(model.url.in_(list(variants))):
+                seen.add(variants[url])
+    count_event('exa.bloom_false_positive', len(maybe_seen) - len(seen))
+    record_cache_lookup('known_urls', True, len(seen))
+    record_cache_lookup('known_urls', False, len(urls) - len(seen))
+    return [u for u in urls if u not in seen]
+
+# Ingestion fans out over query profiles x domain shards. Each profile names a query and a
+# domain group (indian, bd, intl or all); the group is split into shards of EXA_SHARD_SIZE
+# domains. Override the profiles with EXA_QUERY_PROFILES='[{"name": ..., "query": ..., "domains": ...}]'.
+DEFAULT_EXA_QUERY_PROFILES = [
+    {'name': 'coverage', 'query': 'Bangladesh-related News coverage by Indian news media', 'domains': 'all'},
+    {'name': 'relations', 'query': 'India Bangladesh relations: border, trade, water sharing and diplomacy', 'domains': 'indian'},
+]
+EXA_QUERY_PROFILES = json.loads(os.getenv('EXA_QUERY_PROFILES') or 'null') or DEFAULT_EXA_QUERY_PROFILES
+EXA_SHARD_SIZE = int(os.getenv('EXA_SHARD_SIZE', '40'))
+EXA_RESULTS_PER_SEARCH = int(os.getenv('EXA_RESULTS_PER_SEARCH', '25'))
+EXA_MAX_CONCURRENCY = int(os.getenv('EXA_MAX_CONCURRENCY', '4'))
+EXA_REQUESTS_PER_SECOND = float(os.getenv('EXA_REQUESTS_PER_SECOND', '4'))   # shared by search and contents calls
+EXA_INITIAL_LOOKBACK_DAYS = int(os.getenv('EXA_INITIAL_LOOKBACK_DAYS', '7'))
+# Re-search a little before the watermark: Exa indexes some articles after their publish time
+EXA_WATERMARK_OVERLAP_HOURS = int(os.getenv('EXA_WATERMARK_OVERLAP_HOURS', '6'))
+
+class RateLimiter:
+    """
+    Spaces calls at least 1/per_second apart across all threads of the process
+    """
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self.next_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            at = max(now, self.next_at)
+            self.next_at = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+exa_rate_limiter = RateLimiter(EXA_REQUESTS_PER_SECOND)
+
+def exa_search_plan():
+    """
+    Expand the query profiles into (query_key, profile, query, domains) searches
+    """
+    groups = {
+        'indian': INDIAN_SOURCES, 'bd': BD_SOURCES, 'intl': INTL_SOURCES,
+        'all': INDIAN_SOURCES | BD_SOURCES | INTL_SOURCES,
+    }
+    plan = []
+    for profile in EXA_QUERY_PROFILES:
+        domains = sorted(groups.get(profile.get('domains', 'all'), groups['all']))
+        for start in range(0, len(domains), EXA_SHARD_SIZE):
+            shard = domains[start:start + EXA_SHARD_SIZE]
+            digest = hashlib.sha1('\n'.join(shard).encode('utf-8')).hexdigest()[:12]
+            plan.append((f"{profile['name']}:{digest}", profile['name'], profile['query'], shard))
+    return plan
+
+def parse_exa_date(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def exa_search_fanout(exa, two_phase=True):
+    """
+    Run every planned search in parallel (EXA_MAX_CONCURRENCY threads, EXA_REQUESTS_PER_SECOND
+    overall), each from its own watermark. Returns the hits merged and deduped by canonical
+    URL (highest score wins) and the new watermarks, which the caller saves once the run has
+    been processed.
+    """
+    plan = exa_search_plan()
+    watermarks = {w.query_key: w.start_published_date for w in ExaWatermark.query.filter(
+        ExaWatermark.query_key.in_([key for key, _, _, _ in plan]))}
+    default_start = utc_now() - datetime.timedelta(days=EXA_INITIAL_LOOKBACK_DAYS)
+    overlap = datetime.timedelta(hours=EXA_WATERMARK_OVERLAP_HOURS)
+
+    def search(entry):
+        key, profile, query, domains = entry
+        start = watermarks.get(key)
+        start = start - overlap if start else default_start
+        options = dict(
+            category="news",
+            num_results=EXA_RESULTS_PER_SEARCH,
+            include_domains=domains,
+            include_text=["Bangladesh"],
+            start_published_date=start.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+        )
+        exa_throttle(exa)
+        with observe_stage('exa_search'), observe_outbound('api.exa.ai'):
+            if two_phase:
+                return exa.search(query, contents=False, **options).results
+            return exa.search_and_contents(query, text=True, livecrawl="always", **options).results
+
+    merged = {}
+    updates = {}
+    with ThreadPoolExecutor(max_workers=max(1, EXA_MAX_CONCURRENCY)) as pool:
+        # Each search runs in a copy of this context so its counts land in the caller's run
+        futures = {pool.submit(contextvars.copy_context().run, search, entry): entry for entry in plan}
+        for future in as_completed(futures):
+            key, profile, _, domains = futures[future]
+            try:
+                hits = future.result()
+            except Exception as e:
+                count_event('exa.search_failed')
+                log_kv(logging.WARNING, 'exa.search_failed', query_key=key, error=e)
+                continue
+            newest = watermarks.get(key)
+            for hit in hits:
+                published = parse_exa_date(getattr(hit, 'published_date', None))
+                # Future-dated hits must not push the watermark past articles still to come
+                if published and published <= utc_now() and (newest is None or published > newest):
+                    newest = published
+                url = canonical_url(getattr(hit, 'url', ''))
+                if url and (url not in merged or (getattr(hit, 'score', 0) or 0) > (getattr(merged[url], 'score', 0) or 0)):
+                    merged[url] = hit
+            count_event('exa.search_hits', len(hits))
+            updates[key] = (profile, domains, newest, len(hits))
+    count_event('exa.searches', len(plan))
+    return list(merged.values()), updates
+
+def save_exa_watermarks(updates):
+    now = utc_now()
+    for key, (profile, domains, newest, result_count) in updates.items():
+        mark = ExaWatermark.query.filter_by(query_key=key).first()
+        if mark is None:
+            mark = ExaWatermark(query_key=key, profile=profile, domains=json.dumps(domains))
+            db.session.add(mark)
+        if newest is not None:
+            mark.start_published_date = newest
+        mark.last_run_at = now
+        mark.last_result_count = result_count
+    db.session.commit()
+
+# Running average cost of one live crawl, so runs that crawl nothing can still report savings
+_exa_crawl_cost = {'seconds': None, 'chars': None}
+
+def exa_crawl_savings(searched, prefiltered, known, crawled, seconds, chars):
+    """
+    Summary fields for one two-phase fetch: what was crawled and the estimated crawl
+    time/volume avoided by not fetching contents for prefiltered and already-known URLs.
+    """
+    if crawled:
+        for key, value in (('seconds', seconds / crawled), ('chars', chars / crawled)):
+            previous = _exa_crawl_cost[key]
+            _exa_crawl_cost[key] = value if previous is None else 0.8 * previous + 0.2 * value
+    avoided = prefiltered + known
+    per_seconds, per_chars = _exa_crawl_cost['seconds'], _exa_crawl_cost['chars']
+    return {
+        'exa_searched': searched,
+        'exa_prefiltered': prefiltered,
+        'exa_known': known,
+        'exa_crawled': crawled,
+        'exa_contents_seconds': round(seconds, 1),
+        'exa_crawls_avoided': avoided,
+        'exa_saved_seconds_est': round(avoided * per_seconds, 1) if per_seconds is not None else None,
+        'exa_saved_chars_est': int(avoided * per_chars) if per_chars is not None else None,
+    }
+
+def fetch_exa_contents(exa, urls):
+    """
+    Phase two: live-crawl full text for `urls` in batches of EXA_CONTENTS_BATCH_SIZE
+    """
+    results = []
+    for start in range(0, len(urls), EXA_CONTENTS_BATCH_SIZE):
+        batch = urls[start:start + EXA_CONTENTS_BATCH_SIZE]
+        exa_throttle(exa)
+        try:
+            with observe_stage('exa_contents'), observe_outbound('api.exa.ai'):
+                response = exa.get_contents(batch, text=True, livecrawl="always")
+            results.extend(response.results)
+        except Exception as e:
+            count_event('exa.contents_failed', len(batch))
+            log_kv(logging.WARNING, 'exa.contents_failed', urls=len(batch), error=e)
+    return results
+
+# --- Exa Response Cache (record / replay) ---
+# Every raw Exa response is stored gzip-compressed under EXA_CACHE_DIR/objects/<sha256>.json.gz,
+# addressed by the hash of its content so identical responses are kept once. Each ingestion run
+# writes a manifest (runs/<run id>.json) listing its calls in order. Runs older than
+# EXA_CACHE_RETENTION_DAYS are pruned together with objects no remaining run references.
+# `flask fetch-exa --replay` feeds a recorded run back through the pipeline without network.
+EXA_CACHE_ENABLED = os.getenv('EXA_CACHE', 'on').lower() in ('1', 'true', 'on')
+EXA_CACHE_DIR = os.getenv('EXA_CACHE_DIR', os.path.join(instance_path, 'exa_cache'))
+EXA_CACHE_RETENTION_DAYS = int(os.getenv('EXA_CACHE_RETENTION_DAYS', '14'))
+
+def exa_result_dict(result):
+    if dataclasses.is_dataclass(result):
+        data = dataclasses.asdict(result)
+    else:
+        data = dict(vars(result))
+    return {k: v for k, v in data.items() if v is not None}
+
+class ExaResponseStore:
+    """
+    One recorded run in the Exa response cache
+    """
+    def __init__(self, root=EXA_CACHE_DIR):
+        self.root = root
+        self.run_id = f"{utc_now():%Y%m%dT%H%M%SZ}-{os.getpid()}"
+        self.started_at = utc_now()
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], f"{digest}.json.gz")
+
+    def record(self, method, args, kwargs, results):
+        body = json.dumps({'results': [exa_result_dict(r) for r in results]},
+                          sort_keys=True, default=str).encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(body, 6))
+            os.replace(tmp_path, path)
+            count_event('exa_cache.objects_written')
+            record_cache_lookup('exa_response_store', False)
+        else:
+            count_event('exa_cache.objects_reused')
+            record_cache_lookup('exa_response_store', True)
+        with self.lock:
+            self.calls.append({
+                'method': method,
+                'args': list(args),
+                'kwargs': kwargs,
+                'object': digest,
+                'results': len(results),
+                'bytes': len(body),
+            })
+
+    def finish(self):
+        runs_dir = os.path.join(self.root, 'runs')
+        os.makedirs(runs_dir, exist_ok=True)
+        with open(os.path.join(runs_dir, f"{self.run_id}.json"), 'w') as f:
+            json.dump({'run': self.run_id, 'started_at': self.started_at.isoformat(),
+                       'finished_at': utc_now().isoformat(), 'calls': self.calls}, f, default=str)
+        prune_exa_cache(self.root)
+        return self.run_id
+
+def exa_cache_runs(root=EXA_CACHE_DIR):
+    runs_dir = os.path.join(root, 'runs')
+    if not os.path.isdir(runs_dir):
+        return []
+    return sorted(name[:-len('.json')] for name in os.listdir(runs_dir) if name.endswith('.json'))
+
+def load_exa_run(run_id='latest', root=EXA_CACHE_DIR):
+    runs = exa_cache_runs(root)
+    if not runs:
+        raise click.ClickException(f"No recorded Exa runs in {root}")
+    if run_id == 'latest':
+        run_id = runs[-1]
+    if run_id not in runs:
+        raise click.ClickException(f"Unknown Exa run {run_id}; recorded runs: {', '.join(runs[-5:])}")
+    with open(os.path.join(root, 'runs', f"{run_id}.json")) as f:
+        return json.load(f)
+
+def prune_exa_cache(root=EXA_CACHE_DIR, retention_days=EXA_CACHE_RETENTION_DAYS):
+    """
+    Drop run manifests past the retention window, then objects no kept run references
+    """
+    cutoff = (utc_now() - datetime.timedelta(days=retention_days)).strftime('%Y%m%dT%H%M%SZ')
+    referenced = set()
+    removed_runs = removed_objects = 0
+    for run_id in exa_cache_runs(root):
+        path = os.path.join(root, 'runs', f"{run_id}.json")
+        if run_id[:16] < cutoff:
+            os.remove(path)
+            removed_runs += 1
+            continue
+        with open(path) as f:
+            referenced.update(call['object'] for call in json.load(f)['calls'])
+    objects_dir = os.path.join(root, 'objects')
+    for dirpath, _, filenames in os.walk(objects_dir):
+        for name in filenames:
+            if name.endswith('.json.gz') and name[:-len('.json.gz')] not in referenced:
+                os.remove(os.path.join(dirpath, name))
+                removed_objects += 1
+    return removed_runs, removed_objects
+
+class RecordingExa:
+    """
+    Exa client wrapper that writes every search/contents response to an ExaResponseStore
+    """
+    def __init__(self, exa, store):
+        self.exa = exa
+        self.store = store
+
+    def _call(self, method, args, kwargs):
+        response = getattr(self.exa, method)(*args, **kwargs)
+        try:
+            self.store.record(method, args, kwargs, response.results)
+        except Exception as e:
+            log_kv(logging.WARNING, 'exa_cache.record_failed', method=method, error=e)
+        return response
+
+    def search(self, *args, **kwargs):
+        return self._call('search', args, kwargs)
+
+    def search_and_contents(self, *args, **kwargs):
+        return self._call('search_and_contents', args, kwargs)
+
+    def get_contents(self, *args, **kwargs):
+        return self._call('get_contents', args, kwargs)
+
+class ReplayExa:
+    """
+    Stand-in Exa client answering from a recorded run. Searches match on method, query and
+    domains (dates are ignored, since the watermarks have moved on); contents match per URL.
+    """
+    def __init__(self, manifest, root=EXA_CACHE_DIR):
+        self.run_id = manifest['run']
+        self.searches = {}
+        self.contents = {}
+        store = ExaResponseStore(root)
+        for call in manifest['calls']:
+            with open(store.object_path(call['object']), 'rb') as f:
+                results = json.loads(gzip.decompress(f.read()))['results']
+            if call['method'] in ('search', 'search_and_contents'):
+                key = self._search_key(call['method'], call['args'], call['kwargs'])
+                self.searches.setdefault(key, []).extend(results)
+            if call['method'] in ('get_contents', 'search_and_contents'):
+                for result in results:
+                    if result.get('text'):
+                        self.contents[canonical_url(result.get('url'))] = result
+
+    @staticmethod
+    def _search_key(method, args, kwargs):
+        query = args[0] if args else kwargs.get('query')
+        return method, query, tuple(sorted(kwargs.get('include_domains') or ()))
+
+    def _response(self, results):
+        return SimpleNamespace(results=[SimpleNamespace(**result) for result in results])
+
+    def _search(self, method, args, kwargs):
+        results = self.searches.get(self._search_key(method, args, kwargs))
+        if results is None:
+            count_event('exa_cache.replay_miss')
+        return self._response(results or [])
+
+    def search(self, *args, **kwargs):
+        return self._search('search', args, kwargs)
+
+    def search_and_contents(self, *args, **kwargs):
+        return self._search('search_and_contents', args, kwargs)
+
+    def get_contents(self, urls, **kwargs):
+        urls = [urls] if isinstance(urls, str) else urls
+        found = [self.contents[canonical_url(u)] for u in urls if canonical_url(u) in self.contents]
+        count_event('exa_cache.replay_miss', len(urls) - len(found))
+        return self._response(found)
+
+def exa_throttle(exa):
+    # Replayed runs never touch the network, so they are not held to the Exa rate budget
+    if not isinstance(exa, ReplayExa):
+        exa_rate_limiter.wait()
+
+# --- Pre-LLM Triage ---
+# Before an article goes to Gemini, local signals decide how it is analyzed:
+# - 'full': the normal Gemini analysis.
+# - 'local': a cheap local analysis (keyword category and sentiment, lead sentences as the
+#   summary, no fact-check).
+# - 'drop': the article is not stored.
+# The signals are BD keyword relevance, near-duplicate titles, text length and source
+# registry membership. Every decision is logged as `triage.decision` and counted as
+# triage.<decision> and triage.reason.<reason>, both in the run summary and on /metrics.
+# TRIAGE_MODE=shadow (the default) logs the decisions but still sends everything to
+# Gemini. Compare its log with the Gemini results to check recall before switching to 'on'.
+TRIAGE_MODE = os.getenv('TRIAGE_MODE', 'shadow').lower()                       # shadow | on | off
+TRIAGE_MIN_CHARS = int(os.getenv('TRIAGE_MIN_CHARS', '500'))                     # shorter: drop
+TRIAGE_MIN_RELEVANCE = float(os.getenv('TRIAGE_MIN_RELEVANCE', '5'))            # below: drop
+TRIAGE_FULL_RELEVANCE = float(os.getenv('TRIAGE_FULL_RELEVANCE', '20'))          # below: local analysis
+TRIAGE_UNREGISTERED_FULL_RELEVANCE = float(os.getenv('TRIAGE_UNREGISTERED_FULL_RELEVANCE', '75'))  # same, for sources outside the registry
+TRIAGE_DUPLICATE_RATIO = float(os.getenv('TRIAGE_DUPLICATE_RATIO', '0.9'))       # title similarity counted as a duplicate
+TRIAGE_DUPLICATE_WINDOW_DAYS = int(os.getenv('TRIAGE_DUPLICATE_WINDOW_DAYS', '3'))
+REGISTERED_SOURCES = INDIAN_SOURCES | BD_SOURCES | INTL_SOURCES
+
+def find_duplicate_title(url, title, published_at=None):
+    """
+    Id of a stored article at another URL, published within TRIAGE_DUPLICATE_WINDOW_DAYS,
+    whose title is at least TRIAGE_DUPLICATE_RATIO similar; None if there is none
+    """
+    title = (title or '').strip().lower()
+    if not title:
+        return None
+    center = published_at or datetime.datetime.now()
+    window = datetime.timedelta(days=TRIAGE_DUPLICATE_WINDOW_DAYS)
+    candidates = db.session.query(Article.id, Article.title).filter(
+        Article.published_at.between(center - window, center + window),
+        Article.url != url,
+    )
+    for article_id, other in candidates:
+        matcher = SequenceMatcher(None, title, (other or '').lower())
+        if matcher.quick_ratio() >= TRIAGE_DUPLICATE_RATIO and matcher.ratio() >= TRIAGE_DUPLICATE_RATIO:
+            return article_id
+    return None
+
+def triage_article(url, title, text, published_date=None):
+    """
+    Decide 'full', 'local' or 'drop' for one article from local signals (see TRIAGE_*).
+    Returns the decision with the signals behind it; the decision is logged and counted.
+    """
+    relevance = bd_relevance(title, text)
+    chars = len(text or '')
+    registered = get_article_domain(url) in REGISTERED_SOURCES
+    duplicate_of = None
+    if chars < TRIAGE_MIN_CHARS:
+        decision, reason = 'drop', 'too_short'
+    elif relevance < TRIAGE_MIN_RELEVANCE:
+        decision, reason = 'drop', 'irrelevant'
+    else:
+        duplicate_of = find_duplicate_title(url, title, parse_exa_date(published_date))
+        if duplicate_of is not None:
+            decision, reason = 'drop', 'duplicate'
+        elif relevance < TRIAGE_FULL_RELEVANCE:
+            decision, reason = 'local', 'low_relevance'
+        elif not registered and relevance < TRIAGE_UNREGISTERED_FULL_RELEVANCE:
+            decision, reason = 'local', 'unregistered_source'
+        else:
+            decision, reason = 'full', 'relevant'
+    count_event(f'triage.{decision}')
+    count_event(f'triage.reason.{reason}')
+    log_kv(logging.INFO, 'triage.decision', decision=decision, reason=reason, mode=TRIAGE_MODE,
+           relevance=relevance, chars=chars, registered=registered, duplicate_of=duplicate_of, url=url)
+    return {
+        'decision': decision,
+        'reason': reason,
+        'relevance': relevance,
+        'chars': chars,
+        'registered': registered,
+        'duplicate_of': duplicate_of,
+    }
+
+def local_analysis(title, text):
+    """
+    Stand-in for call_gemma_api() on articles triaged to 'local': keyword category and
+    sentiment, the lead sentences as summary, fact-check left unverified
+    """
+    sentences = re.split(r'(?<=[.!?])\s+', compact_article_text(title, text).strip())
+    return {
+        'sentiment': infer_sentiment(title, text).lower(),
+        'category': infer_category(title, text),
+        'summary': ' '.join(sentences[:3])[:600],
+        'fact_check': {'status': 'unverified', 'sources': []},
+        'gemini_enhanced': False,
+        'analysis': 'local',
+    }
+
+# --- Local Gemini Stand-in ---
+# GEMINI_STANDIN=true answers Gemini requests with gemini_standin.LocalGeminiStandIn, an
+# offline imitation of the client and its Batch API endpoints, for development without an
+# API key (see gemini_standin.py, which also holds the analysis benchmark).
+GEMINI_STANDIN = os.getenv('GEMINI_STANDIN', 'false').lower() == 'true'
+
+def standin_analysis(title, text):
+    """
+    local_analysis() in the shape of a JSON-format Gemini analysis, for the stand-in's answers
+    """
+    result = local_analysis(title, text)
+    return {
+        'summary': result['summary'],
+        'sentiment': result['sentiment'] if result['sentiment'] in GEMINI_SENTIMENTS else 'neutral',
+        'category': result['category'] if result['category'] in GEMINI_CATEGORIES else 'others',
+        'geopolitical_implications': '',
+        'media_bias_assessment': '',
+        'entities': [],
+        'sources': [],
+    }
+
+if GEMINI_STANDIN:
+    from gemini_standin import LocalGeminiStandIn
+    gemini_client = LocalGeminiStandIn(standin_analysis, estimate_tokens)
+    logger.warning("GEMINI_STANDIN=true - Gemini requests are answered by the local stand-in")
+
+# --- Refactor ingestion to use Gemma ---
+def plan_exa_item(item, idx=0):
+    """
+    Decide how one Exa search result is handled before any analysis runs: 'skip' (already
+    analyzed or archived), 'failed' (no text), or the triage decision 'drop', 'local' or 'full'.
+    """
+    # Check if article already exists in database
+    art = Article.query.filter_by(url=item.url).first()
+    
+    # ENHANCED SKIP LOGIC: Skip if article already has complete AI analysis
+    if art and art.summary_json and art.summary_json.strip():
+        # Additional validation: check if summary_json contains actual Gemma analysis
+        try:
+            summary_data = json.loads(art.summary_json)
+            # Articles stored past their deadline ('incomplete') are analyzed again
+            if isinstance(summary_data, dict) and not summary_data.get('incomplete') and (
+                'fact_check' in summary_data or 
+                'sentiment' in summary_data or 
+                'category' in summary_data
+            ):
+                log_sampled(logging.DEBUG, 'ingestion.skip_existing', idx=idx + 1, url=item.url)
+                return 'skip'
+        except json.JSONDecodeError:
+            log_kv(logging.WARNING, 'ingestion.malformed_summary_json', idx=idx + 1, url=item.url)
+            pass  # Will continue to reprocess this article
+    # Articles moved to the cold tier are not re-ingested into the hot table
+    if not art and db.session.query(ArchivedArticle.id).filter_by(url=item.url).first():
+        log_sampled(logging.DEBUG, 'ingestion.skip_archived', idx=idx + 1, url=item.url)
+        return 'skip'
+    # The row is rewritten with an upsert, so the loaded instance must not stay in the session
+    if art:
+        db.session.expunge(art)
+
+    log_sampled(logging.INFO, 'ingestion.article', idx=idx + 1, title=item.title, url=item.url)
+    full_text = getattr(item, 'text', None)
+    if not full_text:
+        log_kv(logging.WARNING, 'ingestion.no_full_text', url=item.url)
+        return 'failed'
+    decision = 'full'
+    if TRIAGE_MODE in ('on', 'shadow'):
+        triage = triage_article(item.url, item.title, full_text, getattr(item, 'published_date', None))
+        if TRIAGE_MODE == 'on':
+            decision = triage['decision']
+    return decision
+
+@article_deadline()
+def process_exa_item(item, idx=0, plan=None, analysis=None):
+    """
+    Analyze and store one Exa search result (Gemini analysis, source validation, NER,
+    matches) within one article deadline. Returns 'processed', 'incomplete' (stored without
+    the stages the deadline cut off, reanalysis queued), 'skipped' (already analyzed /
+    archived / dropped by triage) or 'failed'.
+    `plan` is the plan_exa_item() decision if the caller already made it, and `analysis` a
+    call_gemma_api() result fetched for a 'full' item in a batch.
+    Used by run_exa_ingestion() inline and by `flask worker` for queued 'ingest' items.
+    """
+    art = None  # Initialize art to None at the start of each loop
+    try:
+        decision = plan or plan_exa_item(item, idx)
+        if decision == 'failed':
+            return 'failed'
+        if decision in ('skip', 'drop'):
+            return 'skipped'
+
+        # Stage fields on a detached Article; the row is written with an upsert below so
+        # concurrent ingestion processes can't collide on the unique URL constraint
+        art = Article(url=item.url)
+        full_text = item.text
+        incomplete = []   # stages cut off by the article deadline
+        if decision == 'local':
+            gemma_result_raw = local_analysis(item.title, full_text)
+        elif analysis is not None:
+            gemma_result_raw = analysis
+        else:
+            try:
+                gemma_result_raw = call_gemma_api(item.title, full_text, route_analysis_tier('ingest', item.url))
+            except DeadlineExceeded as e:
+                # Store the local analysis for now; the queued reanalysis replaces it
+                incomplete.append(e.stage)
+                gemma_result_raw = local_analysis(item.title, full_text)
+        gemma_result = gemma_result_raw
+        log_kv(logging.DEBUG, 'gemma.result.dump', url=item.url, result=gemma_result)
+        if not gemma_result:
+            count_event('ingestion.gemma_failed')
+            log_kv(logging.WARNING, 'ingestion.gemma_failed', url=item.url)
+            return 'failed'
+        # --- Patch: Ensure fact_check is always an object ---
+        fact_check = gemma_result.get('fact_check')
+        if isinstance(fact_check, str):
+            log_kv(logging.DEBUG, 'ingestion.fact_check_string', value=fact_check)
+            fact_check = {
+                'status': fact_check,
+                'bd_news_found': gemma_result.get('bd_news_found', False),
+                'sources_found': gemma_result.get('sources_found', 0),
+                'sources': gemma_result.get('sources', [])
+            }
+            gemma_result['fact_check'] = fact_check
+        # --- Enhanced Source Extraction from Article Text ---
+        sources = fact_check.get('sources', [])
+        # Local analyses skip source extraction: validating the URLs is outbound HTTP
+        if decision == 'full' and (not sources or not isinstance(sources, list) or len(sources) == 0):
+            count_event('ingestion.sources_from_text')
+            fallback_sources = []
+            
+            if full_text:
+                # Extract complete URLs from article text
+                url_pattern = r'https?://[^\s<>"\']+(?:\.[a-zA-Z]{2,})+[^\s<>"\']*'
+                url_matches = re.findall(url_pattern, full_text)
+                
+                # Also look for domain mentions without full URLs
+                domain_pattern = r'\b(?:www\.)?([a-zA-Z0-9-]+\.(?:com|net|org|co\.uk|com\.bd|gov\.bd))\b'
+                domain_matches = re.findall(domain_pattern, full_text.lower())
+                
+                # Process found URLs
+                for url in set(url_matches):
+                    domain = get_article_domain(url)
+                    if domain:
+                        source_info = categorize_news_source(domain, url)
+                        if source_info:
+                            fallback_sources.append(source_info)
+                
+                # Note: Removed fake URL construction - only use real URLs found in text
+            
+            # If still no sources found, skip this article rather than using placeholders
+            if not fallback_sources:
+                count_event('ingestion.no_sources')
+                fact_check['sources'] = []
+            else:
+                fact_check['sources'] = fallback_sources
+                log_kv(logging.DEBUG, 'ingestion.text_sources', url=item.url, count=len(fallback_sources))
+            
+            gemma_result['fact_check'] = fact_check
+        # Extract summary FIRST (most important)
+        summary_text = gemma_result.get('summary', '')
+        
+        # Then extract other fields
+        sentiment = gemma_result.get('sentiment', 'neutral')
+        category = gemma_result.get('category', 'others')
+        
+        # VALIDATE FACT-CHECK SOURCES URLs BEFORE PROCESSING
+        fact_check = gemma_result.get('fact_check', {})
+        if isinstance(fact_check, dict) and 'sources' in fact_check and fact_check['sources']:
+            # Step 1: Validate URLs actually exist (strict validation only)
+            try:
+                validated_sources = validate_and_filter_sources(fact_check['sources'])
+            except DeadlineExceeded as e:
+                incomplete.append(e.stage)
+                validated_sources = e.partial
+            
+            # Step 2: Filter out self-referencing sources  
+            original_domain = get_article_domain(item.url)
+            filtered_sources = filter_independent_sources(validated_sources, original_domain)
+            
+            # Step 3: Determine final fact-check status
+            validated_status = determine_fact_check_status(filtered_sources)
+            
+            # Update fact_check with validated data
+            fact_check['status'] = validated_status
+            fact_check['sources'] = filtered_sources
+            gemma_result['fact_check'] = fact_check
+            
+            log_kv(logging.DEBUG, 'ingestion.sources_validated', url=item.url,
+                   sources=len(filtered_sources), status=validated_status)
+        
+        # Extract verification status LAST
+        fact_check_status = fact_check.get('status', 'unverified')
+        art.fact_check = safe_capitalize(fact_check_status) # Storing only the status for simplicity
+        fact_check_results = gemma_result.get('fact_check', {
+            "status": "unverified",
+            "bd_news_found": False,
+            "sources_found": 0,
+            "sources": [],
+        })
+        gemma_sources = fact_check_results.get('sources', [])
+        # Fallback: If sources are missing or malformed
+        if not gemma_sources or not isinstance(gemma_sources, list):
+            count_event('ingestion.sources_missing')
+        art.title = item.title
+        if getattr(item, 'published_date', None):
+            art.published_at = datetime.datetime.fromisoformat(item.published_date.replace('Z','+00:00'))
+        else:
+            art.published_at = None
+        art.author = getattr(item, 'author', None)
+        if not art.author and item.text:
+            author_match = re.search(r'By\s+([A-Za-z\s]+)', item.text)
+            if author_match:
+                art.author = author_match.group(1).strip()
+        from urllib.parse import urlparse
+        domain = urlparse(item.url).netloc.lower() if item.url else ''
+        if domain in INDIAN_SOURCES:
+            art.source = domain
+        elif domain in BD_SOURCES:
+            art.source = domain
+        elif domain in INTL_SOURCES:
+            art.source = domain
+        else:
+            art.source = domain if domain else 'Other'
+        art.sentiment = safe_capitalize(sentiment)
+        art.category = normalize_category(category)
+        art.summary_text = summary_text
+        art.image = getattr(item, 'image', None)
+        art.favicon = getattr(item, 'favicon', None)
+        art.score = getattr(item, 'score', None)
+        extras = getattr(item, 'extras', {})
+        if extras and isinstance(extras, str):
+            try:
+                extras = json.loads(extras)
+            except Exception:
+                extras = {}
+        if not isinstance(extras, dict):
+            extras = {}
+        if not extras.get('links') and item.text:
+            links = re.findall(r'https?://\S+', item.text)
+            extras['links'] = list(set(links))
+        text_for_ner = f"{item.title or ''} {getattr(item, 'text', '') or ''}"
+        top_entities = []
+        if nlp:
+            try:
+                # spaCy can't be interrupted, so NER only starts with budget left
+                check_deadline('ner')
+                with observe_stage('ner'):
+                    doc = nlp(text_for_ner)
+                entity_freq = {}
+                for ent in doc.ents:
+                    if len(ent.text) > 2:
+                        entity_freq[ent.text] = entity_freq.get(ent.text, 0) + 1
+                top_entities = [k for k, v in sorted(entity_freq.items(), key=lambda x: -x[1])[:10]]
+            except DeadlineExceeded as e:
+                incomplete.append(e.stage)
+            except Exception as e:
+                log_kv(logging.WARNING, 'ner.failed', url=item.url, error=e)
+                top_entities = []
+        else:
+            count_event('ner.unavailable')
+        extras['entities'] = top_entities
+        art.extras = json.dumps(extras)
+        art.full_text = full_text
+        art.set_sentiment_breakdown(analyze_sentiment_locally(full_text))
+        fact_check_sources_json = json.dumps(gemma_sources)
+        art.fact_check_results = fact_check_sources_json
+        art.bd_relevance_score = bd_relevance(item.title, full_text, top_entities)
+        # --- Save the full Gemma result to summary_json ---
+        summary_json_obj = gemma_result.copy()
+        summary_json_obj['source'] = art.source
+        summary_json_obj['score'] = art.score
+        if incomplete:
+            summary_json_obj['incomplete'] = incomplete
+        art.summary_json = json.dumps(summary_json_obj, default=str)
+        with observe_stage('db_commit'):
+            art.id = upsert_article({
+                c.name: getattr(art, c.name) for c in Article.__table__.columns
+                if c.name != 'id' and getattr(art, c.name) is not None
+            })
+            db.session.commit()
+        recent_cutoff = datetime.datetime.now() - datetime.timedelta(days=30)
+        BDMatch.query.filter_by(article_id=art.id).delete()
+        IntMatch.query.filter_by(article_id=art.id).delete()
+        bd_matches_to_store = []
+        intl_matches_to_store = []
+        for s in gemma_sources:
+            if s.get('source_country') == 'Bangladesh':
+                bd_matches_to_store.append({'title': f"Simulated: {s.get('source_name')}", 'source': s.get('source_name'), 'url': s.get('source_url')})
+            else:
+                intl_matches_to_store.append({'title': f"Simulated: {s.get('source_name')}", 'source': s.get('source_name'), 'url': s.get('source_url')})
+        if not bd_matches_to_store:
+            bd_matches_to_store = [
+                {'title': a.title, 'source': a.source, 'url': a.url}
+                for a in Article.query.filter(Article.source.in_(BD_SOURCES), Article.published_at >= recent_cutoff).all()
+                if SequenceMatcher(None, a.title.lower(), item.title.lower()).ratio() > 0.7
+            ][:3]
+        if not intl_matches_to_store:
+            intl_matches_to_store = [
+                {'title': a.title, 'source': a.source, 'url': a.url}
+                for a in Article.query.filter(Article.source.in_(INTL_SOURCES), Article.published_at >= recent_cutoff).all()
+                if SequenceMatcher(None, a.title.lower(), item.title.lower()).ratio() > 0.7
+            ][:3]
+        for m in bd_matches_to_store[:3]:
+            db.session.add(BDMatch(article_id=art.id, title=m.get('title', ''), source=m.get('source', ''), url=m.get('url', '')))
+        for m in intl_matches_to_store[:3]:
+            db.session.add(IntMatch(article_id=art.id, title=m.get('title', ''), source=m.get('source', ''), url=m.get('url', '')))
+        with observe_stage('db_commit'):
+            db.session.commit()
+        log_sampled(logging.INFO, 'ingestion.committed', id=art.id, url=item.url, fact_check=art.fact_check)
+        if incomplete:
+            retry_incomplete_article(art.id, incomplete)
+            return 'incomplete'
+        return 'processed'
+    except Exception as e:
+        log_kv(logging.ERROR, 'ingestion.article_failed', url=getattr(item, 'url', None), error=e)
+        db.session.rollback()
+        return 'failed'
+
+def process_exa_batch(pending):
+    """
+    Analyze (idx, item) pairs planned 'full' with batched Gemini requests, then store each
+    one; returns their process_exa_item() outcomes. Items the batches did not cover are
+    analyzed by process_exa_item() itself, within their own deadline.
+    """
+    if not pending:
+        return []
+    analyses = call_gemma_api_batch([
+        (idx, item.title, item.text, route_analysis_tier('ingest', item.url))
+        for idx, item in pending
+    ], individual=False)
+    return [process_exa_item(item, idx, plan='full', analysis=analyses.get(idx)) for idx, item in pending]
+
+@counting_run()
+def run_exa_ingestion(replay_run=None):
+    """
+    Search Exa, filter, and analyze (or enqueue) the new articles. With `replay_run` (a run
+    id or 'latest'), the Exa responses come from the response cache instead of the network.
+    """
+    if not EXA_API_KEY and replay_run is None:
+        logger.error("Error: EXA_API_KEY environment variable not set")
+        return
+    with app.app_context():
+        # Check for very recent articles, but don't block - just log a warning
+        # The duplicate checking later will handle actual duplicates
+        recent_articles = Article.query.filter(
+            Article.published_at >= datetime.datetime.now() - datetime.timedelta(hours=2)
+        ).count()
+        if recent_articles > 50:  # Increased threshold from 10 to 50
+            logger.warning(f"Found {recent_articles} recent articles (last 2 hours). This is high, but continuing ingestion anyway. Duplicate checking will filter duplicates.")
+        elif recent_articles > 10:
+            logger.info(f"Found {recent_articles} recent articles in last 2 hours. Continuing ingestion...")
+    recorder = None
+    if replay_run is not None:
+        exa = ReplayExa(load_exa_run(replay_run))
+        logger.info(f"Replaying recorded Exa run {exa.run_id}")
+    else:
+        exa = Exa(api_key=EXA_API_KEY)
+        if EXA_CACHE_ENABLED:
+            recorder = ExaResponseStore()
+            exa = RecordingExa(exa, recorder)
+    run_started = time.time()
+    logger.info("Running Exa ingestion for Bangladesh-related news coverage by Indian Media...")
+    hits, watermark_updates = exa_search_fanout(exa, two_phase=EXA_TWO_PHASE)
+    def is_article_url(url):
+        if not url:
+            return False
+        url = url.lower()
+        if url.rstrip('/') in ["https://indianexpress.com", "https://www.indianexpress.com"]:
+            return False
+        if url.endswith(('/', '/news', '/home', '/index.html')):
+            return False
+        if re.search(r'/20[0-9]{2}/', url):
+            return True
+        if any(x in url for x in ['/article/', '/news/', '/story/', '/politics/', '/diplomacy/', '/world/', '/india/', '/bangladesh/']):
+            return True
+        if url.count('/') > 3:
+            return True
+        return False
+    def is_article_title(title):
+        bad_phrases = [
+            "Latest News", "Breaking News", "Top Headlines", "Home", "Update", "Today", "Live", "Videos", "Photos"
+        ]
+        if not title:
+            return False
+        if any(phrase.lower() in title.lower() for phrase in bad_phrases):
+            return False
+        return True
+    def is_article_text(text):
+        if not text or len(text) < 300:
+            return False
+        if "bangladesh" not in text.lower():
+            return False
+        lines = text.splitlines()
+        if lines:
+            list_lines = sum(1 for l in lines if l.strip().startswith(('-', '*')))
+            if list_lines / len(lines) > 0.5:
+                return False
+        return True
+    exa_stats = {}
+    results = hits
+    if EXA_TWO_PHASE:
+        # URL/title checks and the known-URL index run on the search hits, before anything is crawled
+        candidates = {}
+        with observe_stage('filter'):
+            for r in hits:
+                url = getattr(r, 'url', '')
+                if is_article_url(url) and is_article_title(getattr(r, 'title', '')):
+                    candidates.setdefault(canonical_url(url), url)
+            new_urls = unseen_urls(list(candidates.values()))
+        contents_started = time.time()
+        results = fetch_exa_contents(exa, new_urls)
+        exa_stats = exa_crawl_savings(
+            searched=len(hits),
+            prefiltered=len(hits) - len(candidates),
+            known=len(candidates) - len(new_urls),
+            crawled=len(new_urls),
+            seconds=time.time() - contents_started,
+            chars=sum(len(getattr(r, 'text', '') or '') for r in results),
+        )
+    seen_titles = set()
+    filtered_results = []
+    with observe_stage('filter'):
+        for r in results:
+            url = getattr(r, 'url', '')
+            title = getattr(r, 'title', '')
+            text = getattr(r, 'text', '')
+            title_hash = hashlib.md5(title.strip().lower().encode('utf-8')).hexdigest() if title else None
+            if (
+                is_article_url(url)
+                and is_article_title(title)
+                and is_article_text(text)
+                and title_hash not in seen_titles
+            ):
+                seen_titles.add(title_hash)
+                filtered_results.append(r)
+    # Check current database state before processing
+    existing_articles = Article.query.count()
+    existing_with_analysis = Article.query.filter(Article.summary_json.isnot(None)).count()
+    log_kv(logging.INFO, 'ingestion.start', exa_results=len(hits), filtered=len(filtered_results),
+           db_articles=existing_articles, db_with_analysis=existing_with_analysis)
+    
+    # Counters for monitoring
+    processed_count = 0
+    incomplete_count = 0
+    skipped_count = 0
+    queued_count = 0
+    pending = []
+    for idx, item in enumerate(filtered_results):
+        # With the work queue enabled, `flask worker` processes do the analysis
+        if ANALYSIS_QUEUE_ENABLED:
+            enqueue_work('ingest', exa_item_payload(item), dedupe_key=item.url)
+            queued_count += 1
+            continue
+        # With batching, items triaged to 'full' wait until a batch is collected; the rest
+        # are stored right away
+        if gemini_batching_enabled():
+            try:
+                plan = plan_exa_item(item, idx)
+            except Exception as e:
+                log_kv(logging.ERROR, 'ingestion.article_failed', url=item.url, error=e)
+                db.session.rollback()
+                plan = 'failed'
+            if plan != 'full':
+                outcomes = [process_exa_item(item, idx, plan=plan)]
+            else:
+                pending.append((idx, item))
+                if len(pending) < GEMINI_BATCH_SIZE:
+                    continue
+                outcomes = process_exa_batch(pending)
+                pending = []
+        else:
+            outcomes = [process_exa_item(item, idx)]
+        for outcome in outcomes:
+            if outcome == 'processed':
+                processed_count += 1
+            elif outcome == 'incomplete':
+                incomplete_count += 1
+            elif outcome == 'skipped':
+                skipped_count += 1
+    for outcome in process_exa_batch(pending):
+        if outcome == 'processed':
+            processed_count += 1
+        elif outcome == 'incomplete':
+            incomplete_count += 1
+    
+    # Summary logging: one line per run replaces the per-article / per-URL lines
+    total_articles_in_db = Article.query.count()
+    articles_with_analysis = Article.query.filter(Article.summary_json.isnot(None)).count()
+    log_run_summary(
+        'ingestion.summary',
+        found=len(filtered_results),
+        skipped=skipped_count,
+        processed=processed_count,
+        incomplete=incomplete_count,
+        queued=queued_count,
+        errors=len(filtered_results) - skipped_count - processed_count - incomplete_count - queued_count,
+        seconds=round(time.time() - run_started, 1),
+        db_articles=total_articles_in_db,
+        db_with_analysis=articles_with_analysis,
+        **exa_stats,
+    )
+    if recorder is not None:
+        try:
+            logger.info(f"Recorded Exa responses as run {recorder.finish()}")
+        except Exception as e:
+            log_kv(logging.WARNING, 'exa_cache.finish_failed', error=e)
+    # Advance the watermarks only once this run's hits have been processed (or queued);
+    # a replay says nothing about what Exa has published since
+    if replay_run is None:
+        save_exa_watermarks(watermark_updates)
+    mark_data_changed()
+    # Ingestion is the main write burst, fold the WAL back into the database while it is quiet
+    checkpoint_database()
+    logger.info("Done.")
+
+def checkpoint_database(mode='TRUNCATE'):
+    """
+    Checkpoint the SQLite write-ahead log into the main database file.
+    SQLite auto-checkpoints every SQLITE_WAL_AUTOCHECKPOINT pages in PASSIVE mode, which never
+    waits for readers, so a busy server can let the -wal file grow. An explicit TRUNCATE
+    checkpoint after each ingestion run (and via `flask checkpoint-db`) resets it to zero bytes.
+    """
+    if not IS_SQLITE:
+        return None
+    try:
+        with app.app_context():
+            with db.engine.connect() as conn:
+                busy, wal_pages, checkpointed = conn.execute(text(f'PRAGMA wal_checkpoint({mode})')).fetchone()
+        logger.info(f"WAL checkpoint ({mode}): busy={busy}, wal_pages={wal_pages}, checkpointed={checkpointed}")
+        return {'busy': busy, 'wal_pages': wal_pages, 'checkpointed': checkpointed}
+    except Exception as e:
+        logger.warning(f"WAL checkpoint failed: {e}")
+        return None
+
+@app.cli.command('fetch-exa')
+@click.option('--replay', is_flag=True, help='Use recorded Exa responses instead of calling Exa.')
+@click.option('--run', 'run_id', default='latest', show_default=True, help='Recorded run to replay (see flask exa-cache).')
+def fetch_exa(replay, run_id):
+    """
+    Run one Exa ingestion.
+    Usage: flask fetch-exa [--replay [--run RUN_ID]]
+    """
+    run_exa_ingestion(replay_run=run_id if replay else None)
+
+@app.cli.command('exa-cache')
+@click.option('--prune', is_flag=True, help='Apply the retention window now.')
+def exa_cache(prune):
+    """
+    List recorded Exa runs in the response cache.
+    Usage: flask exa-cache [--prune]
+    """
+    if prune:
+        removed_runs, removed_objects = prune_exa_cache()
+        print(f"Pruned {removed_runs} runs and {removed_objects} objects.")
+    for run_id in exa_cache_runs():
+        manifest = load_exa_run(run_id)
+        calls = manifest['calls']
+        print(f"{run_id}  calls={len(calls)}  results={sum(c['results'] for c in calls)}  "
+              f"raw_bytes={sum(c['bytes'] for c in calls)}")
+
+@app.cli.command('checkpoint-db')
+@click.option('--vacuum', is_flag=True, help='Also VACUUM the database to return free pages to the OS.')
+def checkpoint_db(vacuum):
+    """
+    Fold the SQLite WAL file back into the main database and truncate it.
+    Usage: flask checkpoint-db [--vacuum]
+    """
+    if vacuum and IS_SQLITE:
+        # VACUUM can't run inside a transaction; needed to shrink the file after bulk rewrites
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text('VACUUM'))
+        print("VACUUM complete.")
+    result = checkpoint_database()
+    print(f"Checkpoint result: {result}")
+
+# Scheduler uses the ingestion logic directly
+def run_exa_ingestion_with_context():
+    logger.info(f"[{datetime.datetime.now()}] Scheduled Exa ingestion running...")
+    with app.app_context():
+        run_exa_ingestion()
+
+# Bulk maintenance passes (patch, reverify, reanalyze) walk the table in chunks of this many
+# articles with their payload columns loaded, committing after each chunk
+MAINTENANCE_CHUNK_SIZE = int(os.getenv('MAINTENANCE_CHUNK_SIZE', '100'))
+
+def iter_article_chunks(query, chunk_size=MAINTENANCE_CHUNK_SIZE):
+    """
+    Yield lists of Article rows from `query` in id order, keyed on the last id seen rather
+    than OFFSET. The caller commits each chunk before asking for the next; the session is
+    then expunged, so the identity map never holds more than one chunk and memory stays
+    flat however large the table is.
+    """
+    last_id = 0
+    while True:
+        chunk = query.filter(Article.id > last_id).order_by(Article.id).limit(chunk_size).all()
+        if not chunk:
+            return
+        last_id = chunk[-1].id
+        yield chunk
+        db.session.expunge_all()
+
+def patch_old_fact_check_data():
+    """
+    Patch old Article records: if summary_json exists and fact_check is a string, convert it to an object.
+    """
+    with app.app_context():
+        query = Article.query.filter(Article.summary_json.isnot(None)).options(undefer_group('payload'))
+        patched = 0
+        for chunk in iter_article_chunks(query):
+            for art in chunk:
+                try:
+                    summary = json.loads(art.summary_json)
+                    fc = summary.get('fact_check')
+                    if isinstance(fc, str):
+                        # Patch to object
+                        summary['fact_check'] = {
+                            'status': fc,
+                            'bd_news_found': summary.get('bd_news_found', False),
+                            'sources_found': summary.get('sources_found', 0),
+                            'sources': summary.get('sources', [])
+                        }
+                        art.summary_json = json.dumps(summary)
+                        patched += 1
+                except Exception as e:
+                    print(f"Error patching article {art.id}: {e}")
+            db.session.commit()
+        mark_data_changed()
+        print(f"Patched {patched} articles.")
+
+def reverify_article_with_gemma(art, analysis=None):
+    """
+    Re-run Gemma on one article (payload loaded) and store the result in summary_json; the caller commits.
+    `analysis` is a call_gemma_api() result that was already fetched (batch job).
+    """
+    print(f"Reprocessing: {art.title}")
+    gemma_result = analysis or call_gemma_api(art.title, art.full_text or "", route_article_tier(art))
+    if gemma_result:
+        # Ensure all required fields are present in fact_check
+        fc = gemma_result.get('fact_check', {})
+        if not isinstance(fc, dict):
+            fc = {}
+        fc.setdefault('status', 'unverified')
+        fc.setdefault('sources', [])
+        fc.setdefault('bd_news_found', False)
+        fc.setdefault('sources_found', len(fc['sources']))
+        # --- Fallback: If sources are empty, extract from text ---
+        sources = fc.get('sources', [])
+        if not sources or not isinstance(sources, list) or len(sources) == 0:
+            fallback_sources = []
+            if art.full_text:
+                url_matches = re.findall(r'https?://[\w\.-]+', art.full_text)
+                for url in set(url_matches):
+                    if any(bd in url for bd in ['bdnews24', 'thedailystar', 'prothomalo', 'dhakatribune', 'newagebd', 'financialexpress.com.bd', 'theindependentbd']):
+                        fallback_sources.append({
+                            'source_name': url.split('//')[-1].split('/')[0],
+                            'source_country': 'BD',
+                            'source_url': url
+                        })
+                    elif any(intl in url for intl in ['bbc', 'cnn', 'reuters', 'aljazeera', 'nytimes', 'theguardian', 'france24', 'dw.com']):
+                        fallback_sources.append({
+                            'source_name': url.split('//')[-1].split('/')[0],
+                            'source_country': 'INTL',
+                            'source_url': url
+                        })
+                # Don't create fake sources - leave empty if no real sources found
+            fc['sources'] = fallback_sources
+        gemma_result['fact_check'] = fc
+        art.summary_json = json.dumps(gemma_result, default=str)
+
+def reverify_old_articles_with_gemma():
+    """
+    Reprocess all articles with Gemma and update summary_json with the latest Gemma response.
+    Commits after every chunk, so an interrupted run keeps what it already reprocessed.
+    """
+    with app.app_context():
+        for chunk in iter_article_chunks(Article.query.options(undefer_group('payload'))):
+            for art in chunk:
+                reverify_article_with_gemma(art)
+            db.session.commit()
+        mark_data_changed()
+        print("Reprocessing complete.")
+
+@app.cli.command('reverify-gemma')
+@click.option('--batch', is_flag=True, help='Submit a Gemini batch job instead of calling Gemini article by article.')
+def reverify_gemma(batch):
+    """
+    Reprocess all articles with Gemma and update summary_json with the latest Gemma response.
+    Usage: flask reverify-gemma [--batch]
+    """
+    if batch:
+        for batch_job in submit_gemini_batch_jobs(Article.query, 'reverify'):
+            print(f"Submitted {batch_job.job} with {batch_job.articles} {batch_job.tier} articles; waiting for it to finish...")
+            print(gemini_batch_job_report(wait_for_gemini_batch_job(batch_job)))
+        return
+    reverify_old_articles_with_gemma()
+    print("All articles reprocessed with Gemma.")
+
+# --- Gemini Batch Jobs (bulk reanalysis) ---
+# Bulk reanalysis has no latency requirement, so it can go through the Gemini Batch API
+# instead of one streaming call per article. The Batch API is asynchronous and billed at
+# a discount. submit_gemini_batch_jobs() routes each article to its analysis tier and
+# writes one JSONL request line per article (keyed by article id) to GEMINI_BATCH_JOB_DIR,
+# one file per tier since a job has a single model. It then uploads each file and creates
+# its job. A gemini_batch_job row records the job, its tier and its target:
+# - 'reanalyze' is /api/reanalyze-all?mode=batch or `flask batch-reanalyze`;
+# - 'reverify' is `flask reverify-gemma --batch`.
+# poll_gemini_batch_jobs() checks pending jobs. The scheduler (embedded or `flask
+# run-scheduler`) runs it every GEMINI_BATCH_POLL_MINUTES, and `flask batch-jobs --poll`
+# runs it on demand. When a job succeeds, the poller claims its row with a conditional
+# UPDATE, so a job is applied once even when several pollers see it finish (a claim
+# expires after GEMINI_BATCH_CLAIM_SECONDS, for a poller that died mid-way). The output
+# is then downloaded and every response goes through the normal parse
+# (parse_gemini_analysis) and persist (reanalyze_article / reverify_article_with_gemma)
+# path. Articles whose response is missing or failed are left unchanged and listed in the
+# job's stats.
+GEMINI_BATCH_JOB_DIR = os.getenv('GEMINI_BATCH_JOB_DIR', os.path.join(instance_path, 'gemini_batch_jobs'))
+GEMINI_BATCH_POLL_MINUTES = int(os.getenv('GEMINI_BATCH_POLL_MINUTES', '5'))
+GEMINI_BATCH_CLAIM_SECONDS = int(os.getenv('GEMINI_BATCH_CLAIM_SECONDS', '3600'))
+GEMINI_BATCH_JOB_DONE_STATES = {'JOB_STATE_SUCCEEDED', 'JOB_STATE_PARTIALLY_SUCCEEDED'}
+GEMINI_BATCH_JOB_FAILED_STATES = {'JOB_STATE_FAILED', 'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED'}
+
+def gemini_batch_job_request(title, full_text, tier='standard'):
+    """
+    One Batch API request body for an article: the JSON prompt, schema and tier settings
+    stream_gemini() sends. Batch jobs always ask for JSON; GEMINI_RESPONSE_FORMAT=text only
+    affects the streaming path.
+    """
+    config = ANALYSIS_TIERS[tier]
+    article_text = compact_article_text(title, full_text)
+    generation_config = {'thinking_config': {'thinking_budget': config['thinking_budget']}}
+    if not config['search'] or GEMINI_JSON_SEARCH:
+        generation_config.update(response_mime_type='application/json', response_schema=GEMINI_ANALYSIS_SCHEMA)
+    request_body = {
+        'contents': [{'role': 'user', 'parts': [{'text': gemini_json_prompt(title, article_text, search=config['search'])}]}],
+        'generation_config': generation_config,
+    }
+    if config['search']:
+        request_body['tools'] = [{'google_search': {}}]
+    return request_body
+
+def submit_gemini_batch_jobs(query, target='reanalyze', limit=None):
+    """
+    Write Batch API input files for the articles in `query` with enough text, one per
+    analysis tier, upload them and create the jobs. Returns the GeminiBatchJob rows.
+    """
+    if not gemini_client:
+        raise click.ClickException("Gemini AI client not initialized; set GEMINI_API_KEY or GEMINI_STANDIN=true")
+    os.makedirs(GEMINI_BATCH_JOB_DIR, exist_ok=True)
+    stem = f"{utc_now():%Y%m%dT%H%M%SZ}-{os.getpid()}"
+    files, counts = {}, Counter()
+    try:
+        for chunk in iter_article_chunks(query.options(undefer_group('payload'))):
+            for article in chunk:
+                if limit and sum(counts.values()) >= limit:
+                    break
+                if not article.full_text or len(article.full_text.strip()) < 100:
+                    count_event('batch_job.insufficient_content')
+                    continue
+                tier = route_article_tier(article)
+                if tier not in files:
+                    files[tier] = open(os.path.join(GEMINI_BATCH_JOB_DIR, f"input-{stem}-{tier}.jsonl"), 'w')
+                request_body = gemini_batch_job_request(article.title, article.full_text, tier)
+                files[tier].write(json.dumps({'key': str(article.id), 'request': request_body}) + '\n')
+                counts[tier] += 1
+            if limit and sum(counts.values()) >= limit:
+                break
+    finally:
+        for f in files.values():
+            f.close()
+    if not files:
+        raise click.ClickException("No articles with enough text to analyze")
+    jobs = []
+    for tier, f in files.items():
+        model = ANALYSIS_TIERS[tier]['model']
+        with observe_outbound('generativelanguage.googleapis.com'):
+            uploaded = gemini_client.files.upload(
+                file=f.name,
+                config=types.UploadFileConfig(display_name=os.path.basename(f.name), mime_type='jsonl'),
+            )
+            job = gemini_client.batches.create(
+                model=model,
+                src=uploaded.name,
+                config={'display_name': f"sims-{target}-{stem}-{tier}"},
+            )
+        batch_job = GeminiBatchJob(
+            job=job.name,
+            target=target,
+            tier=tier,
+            state=job.state.name if job.state else 'JOB_STATE_PENDING',
+            model=model,
+            articles=counts[tier],
+            input_path=f.name,
+            input_file=uploaded.name,
+        )
+        db.session.add(batch_job)
+        db.session.commit()
+        log_kv(logging.INFO, 'batch_job.submitted', job=job.name, target=target, tier=tier, articles=counts[tier])
+        jobs.append(batch_job)
+    return jobs
+
+def apply_gemini_batch_output(job_name, target, tier, articles_submitted, output):
+    """
+    Parse a finished job's JSONL output and persist each article's analysis through the
+    target's normal path; returns the job's stats
+    """
+    stats = Counter()
+    failed_ids = []
+    searched = ANALYSIS_TIERS[tier]['search']
+    lines = [json.loads(line) for line in output.decode('utf-8').splitlines() if line.strip()]
+    for start in range(0, len(lines), MAINTENANCE_CHUNK_SIZE):
+        batch = {}
+        for line in lines[start:start + MAINTENANCE_CHUNK_SIZE]:
+            try:
+                batch[int(line.get('key'))] = line
+            except (TypeError, ValueError):
+                stats['unknown_key'] += 1
+        articles = (Article.query.options(undefer_group('payload'))
+                    .filter(Article.id.in_(list(batch))).all())
+        stats['missing_article'] += len(batch) - len(articles)
+        for article in articles:
+            line = batch[article.id]
+            result = None
+            if line.get('response') and not line.get('error'):
+                response = types.GenerateContentResponse.model_validate(line['response'])
+                record_gemini_usage(response.usage_metadata)
+                record_tier_request(tier, None, response.usage_metadata, GEMINI_BATCH_JOB_DISCOUNT)
+                count_event('gemini.responses')
+                result = parse_gemini_analysis(response.text or '', article.title or '', True, searched)
+            if not result:
+                stats['failed'] += 1
+                failed_ids.append(article.id)
+                log_kv(logging.WARNING, 'batch_job.article_failed', job=job_name, id=article.id,
+                       error=line.get('error'))
+                continue
+            analysis = gemma_result_from_gemini(result)
+            if target == 'reverify':
+                reverify_article_with_gemma(article, analysis)
+                outcome = 'processed'
+            else:
+                outcome = reanalyze_article(article, analysis=analysis)
+            stats[outcome] += 1
+            if outcome == 'failed':
+                failed_ids.append(article.id)
+        db.session.commit()
+        db.session.expunge_all()
+    stats['not_returned'] = articles_submitted - len(lines)
+    mark_data_changed()
+    return dict(stats, failed_ids=failed_ids)
+
+def claim_gemini_batch_job(job_name, owner):
+    """
+    Lease a finished job to `owner` for applying its output. One conditional UPDATE that
+    only matches a job not applied yet whose claim is free or expired, so of several
+    pollers only one gets rowcount 1. Returns whether `owner` got the job.
+    """
+    now = utc_now()
+    claimed = db.session.execute(
+        db.update(GeminiBatchJob)
+        .where(GeminiBatchJob.job == job_name, GeminiBatchJob.applied_at.is_(None),
+               db.or_(GeminiBatchJob.claimed_by.is_(None), GeminiBatchJob.claim_expires_at < now))
+        .values(claimed_by=owner, claim_expires_at=now + datetime.timedelta(seconds=GEMINI_BATCH_CLAIM_SECONDS))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return bool(claimed)
+
+@counting_run()
+def poll_gemini_batch_job(batch_job, owner=None):
+    """
+    Refresh one job's state; once it has succeeded, claim it, then download and apply its
+    output. A job another poller has claimed or applied is left to it. Returns the
+    refreshed row.
+    """
+    owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+    job_name, target, tier, articles = batch_job.job, batch_job.target, batch_job.tier, batch_job.articles
+    with observe_outbound('generativelanguage.googleapis.com'):
+        job = gemini_client.batches.get(name=job_name)
+    state = job.state.name if job.state else batch_job.state
+    values = {'state': state}
+    conditions = [GeminiBatchJob.job == job_name, GeminiBatchJob.applied_at.is_(None)]
+    if state in GEMINI_BATCH_JOB_DONE_STATES:
+        if not job.dest or not job.dest.file_name:
+            values.update(state='JOB_STATE_FAILED', error='job finished without an output file')
+        elif not claim_gemini_batch_job(job_name, owner):
+            count_event('batch_job.claimed_elsewhere')
+            log_kv(logging.INFO, 'batch_job.claimed_elsewhere', job=job_name, owner=owner)
+            return GeminiBatchJob.query.filter_by(job=job_name).one()
+        else:
+            try:
+                with observe_outbound('generativelanguage.googleapis.com'):
+                    output = gemini_client.files.download(file=job.dest.file_name)
+                stats = apply_gemini_batch_output(job_name, target, tier, articles, output)
+            except Exception:
+                # Let the next poll retry instead of waiting out the claim
+                db.session.rollback()
+                db.session.execute(
+                    db.update(GeminiBatchJob).where(GeminiBatchJob.job == job_name, GeminiBatchJob.claimed_by == owner)
+                    .values(claimed_by=None, claim_expires_at=None).execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+                raise
+            values.update(stats=json.dumps(stats), applied_at=utc_now(), claimed_by=None, claim_expires_at=None)
+            conditions.append(GeminiBatchJob.claimed_by == owner)
+            log_run_summary('batch_job.applied', job=job_name, target=target,
+                            **{k: v for k, v in stats.items() if k != 'failed_ids'})
+    elif state in GEMINI_BATCH_JOB_FAILED_STATES:
+        values['error'] = str(job.error) if job.error else state
+        log_kv(logging.ERROR, 'batch_job.failed', job=job_name, state=state, error=values['error'])
+    db.session.execute(
+        db.update(GeminiBatchJob).where(*conditions).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return GeminiBatchJob.query.filter_by(job=job_name).one()
+
+def gemini_batch_job_pending(batch_job):
+    return not batch_job.applied_at and batch_job.state not in GEMINI_BATCH_JOB_FAILED_STATES
+
+def poll_gemini_batch_jobs():
+    """
+    Poll every job that is neither applied nor failed; returns the refreshed rows
+    """
+    if not gemini_client:
+        return []
+    pending = [job_name for (job_name,) in db.session.query(GeminiBatchJob.job)
+               .filter(GeminiBatchJob.applied_at.is_(None),
+                       GeminiBatchJob.state.notin_(GEMINI_BATCH_JOB_FAILED_STATES))
+               .order_by(GeminiBatchJob.id)]
+    polled = []
+    for job_name in pending:
+        try:
+            polled.append(poll_gemini_batch_job(GeminiBatchJob.query.filter_by(job=job_name).one()))
+        except Exception as e:
+            log_kv(logging.ERROR, 'batch_job.poll_failed', job=job_name, error=e)
+            db.session.rollback()
+    return polled
+
+def poll_gemini_batch_jobs_with_context():
+    with app.app_context():
+        poll_gemini_batch_jobs()
+
+def wait_for_gemini_batch_job(batch_job, interval=30):
+    while True:
+        batch_job = poll_gemini_batch_job(batch_job)
+        if not gemini_batch_job_pending(batch_job):
+            return batch_job
+        time.sleep(interval)
+
+def gemini_batch_job_report(batch_job):
+    stats = {k: v for k, v in json.loads(batch_job.stats or '{}').items() if k != 'failed_ids' and v}
+    return (f"{batch_job.job}  target={batch_job.target}  tier={batch_job.tier}  state={batch_job.state}  "
+            f"articles={batch_job.articles}  submitted={batch_job.submitted_at.isoformat()[:19]}  "
+            f"applied={batch_job.applied_at.isoformat()[:19] if batch_job.applied_at else '-'}"
+            + ''.join(f"  {k}={v}" for k, v in sorted(stats.items()))
+            + (f"  error={batch_job.error}" if batch_job.error else ''))
+
+@app.cli.command('batch-reanalyze')
+@click.option('--limit', type=int, help='Only the first N articles with text (by id).')
+@click.option('--wait/--no-wait', default=True, show_default=True, help='Poll until the job finishes and apply it.')
+@click.option('--interval', default=30, show_default=True, help='Seconds between polls with --wait.')
+def batch_reanalyze(limit, wait, interval):
+    """
+    Reanalyze all articles through a Gemini batch job instead of synchronous calls.
+    Usage: flask batch-reanalyze [--limit N] [--no-wait] [--interval 30]
+    """
+    jobs = submit_gemini_batch_jobs(Article.query, 'reanalyze', limit)
+    for batch_job in jobs:
+        print(f"Submitted {batch_job.job} with {batch_job.articles} {batch_job.tier} articles.")
+    for batch_job in jobs:
+        if wait:
+            batch_job = wait_for_gemini_batch_job(batch_job, interval)
+        print(gemini_batch_job_report(batch_job))
+
+@app.cli.command('batch-jobs')
+@click.option('--poll', is_flag=True, help='Check pending jobs now and apply the finished ones.')
+def batch_jobs(poll):
+    """
+    List Gemini batch jobs submitted for bulk reanalysis.
+    Usage: flask batch-jobs [--poll]
+    """
+    if poll:
+        poll_gemini_batch_jobs()
+    jobs = GeminiBatchJob.query.order_by(GeminiBatchJob.id).all()
+    if not jobs:
+        print("No batch jobs.")
+    for batch_job in jobs:
+        print(gemini_batch_job_report(batch_job))
+
+def _backfill_sentiment_chunk(rows):
+    """
+    Worker-process side of `flask backfill-sentiment`: score one chunk of (id, full_text) rows
+    """
+    return [(article_id, analyze_sentiment_locally(full_text or "")) for article_id, full_text in rows]
+
+def iter_sentiment_backfill_chunks(chunk_size, recompute=False):
+    """
+    Yield (id, full_text) chunks in id order using keyset pagination, so only one chunk
+    of article text is held by the reader at a time.
+    """
+    last_id = 0
+    while True:
+        query = db.session.query(Article.id, Article.full_text).filter(Article.id > last_id)
+        if not recompute:
+            query = query.filter(Article.sentiment_positive.is_(None))
+        rows = query.order_by(Article.id).limit(chunk_size).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield [(r[0], r[1]) for r in rows]
+
+def backfill_sentiment(chunk_size=200, workers=None, recompute=False):
+    """
+    Fill the stored VADER breakdown columns for existing articles. Chunks are scored in a
+    process pool (VADER is CPU-bound) and written back from this process, one commit per chunk.
+    """
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    workers = workers or os.cpu_count() or 1
+    updated = 0
+
+    def apply(results):
+        db.session.execute(db.update(Article), [
+            {
+                'id': article_id,
+                'sentiment_positive': b['positive'],
+                'sentiment_negative': b['negative'],
+                'sentiment_neutral': b['neutral'],
+                'sentiment_cautious': b['cautious'],
+            }
+            for article_id, b in results
+        ])
+        db.session.commit()
+        return len(results)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in iter_sentiment_backfill_chunks(chunk_size, recompute=recompute):
+            pending.add(executor.submit(_backfill_sentiment_chunk, chunk))
+            # Keep a bounded number of chunks in flight so memory doesn't grow with the corpus
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    updated += apply(future.result())
+                logger.info(f"Sentiment backfill: {updated} articles updated")
+        for future in pending:
+            updated += apply(future.result())
+    logger.info(f"Sentiment backfill complete: {updated} articles updated")
+    return updated
+
+@app.cli.command('backfill-sentiment')
+@click.option('--chunk-size', default=200, show_default=True, help='Articles per chunk (keyed by id).')
+@click.option('--workers', default=None, type=int, help='Worker processes (default: CPU count).')
+@click.option('--recompute', is_flag=True, help='Recompute rows that already have a stored breakdown.')
+def backfill_sentiment_command(chunk_size, workers, recompute):
+    """
+    Compute and store the VADER sentiment breakdown for existing articles.
+    Usage: flask backfill-sentiment [--chunk-size 200] [--workers 4] [--recompute]
+    """
+    updated = backfill_sentiment(chunk_size=chunk_size, workers=workers, recompute=recompute)
+    print(f"Backfilled sentiment for {updated} articles.")
+
+def _stored_bd_relevance(art):
+    try:
+        entities = json.loads(art.extras).get('entities', []) if art.extras else []
+    except (ValueError, AttributeError):
+        entities = []
+    return bd_relevance(art.title, art.full_text, entities)
+
+def backfill_bd_relevance(recompute=False, chunk_size=MAINTENANCE_CHUNK_SIZE):
+    """
+    Fill bd_relevance_score for hot and archived rows without one (all rows with recompute),
+    one commit per chunk. Archived rows are scored from their decompressed payload.
+    """
+    query = Article.query.options(undefer(Article.full_text), undefer(Article.extras))
+    if not recompute:
+        query = query.filter(Article.bd_relevance_score.is_(None))
+    updated = 0
+    for chunk in iter_article_chunks(query, chunk_size):
+        for art in chunk:
+            art.bd_relevance_score = _stored_bd_relevance(art)
+        db.session.commit()
+        updated += len(chunk)
+        logger.info(f"BD relevance backfill: {updated} articles updated")
+    archived = ArchivedArticle.query.options(undefer(ArchivedArticle.payload))
+    if not recompute:
+        archived = archived.filter(ArchivedArticle.bd_relevance_score.is_(None))
+    last_id = 0
+    while True:
+        chunk = archived.filter(ArchivedArticle.id > last_id).order_by(ArchivedArticle.id).limit(chunk_size).all()
+        if not chunk:
+            break
+        last_id = chunk[-1].id
+        for row in chunk:
+            row.bd_relevance_score = _stored_bd_relevance(row.to_article()[0])
+        db.session.commit()
+        db.session.expunge_all()
+        updated += len(chunk)
+        logger.info(f"BD relevance backfill: {updated} articles updated")
+    if updated:
+        # The dashboard serves, sorts and filters on the score
+        mark_data_changed()
+    return updated
+
+@app.cli.command('backfill-bd-relevance')
+@click.option('--chunk-size', default=MAINTENANCE_CHUNK_SIZE, show_default=True, help='Articles per chunk (keyed by id).')
+@click.option('--recompute', is_flag=True, help='Recompute rows that already have a stored score.')
+def backfill_bd_relevance_command(chunk_size, recompute):
+    """
+    Compute and store the Bangladesh relevance score for existing articles.
+    Usage: flask backfill-bd-relevance [--chunk-size 100] [--recompute]
+    """
+    updated = backfill_bd_relevance(recompute=recompute, chunk_size=chunk_size)
+    print(f"Backfilled BD relevance for {updated} articles.")
+
+# --- Article Archive (hot/cold tiering) ---
+# Articles published more than ARCHIVE_AFTER_DAYS ago are moved from `article` into
+# `article_archive` (compressed JSON payload) and counted in `article_archive_rollup`.
+# Endpoints only read the hot table unless called with ?include_archived=true.
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '0'))              # 0 disables the retention job
+ARCHIVE_CHUNK_SIZE = int(os.getenv('ARCHIVE_CHUNK_SIZE', '200'))
+ARCHIVE_CHUNK_PAUSE = float(os.getenv('ARCHIVE_CHUNK_PAUSE', '0.5'))        # seconds between chunks, lets writers in
+ARCHIVE_INTERVAL_HOURS = int(os.getenv('ARCHIVE_INTERVAL_HOURS', '24'))
+ARCHIVE_COMPRESSION_LEVEL = int(os.getenv('ARCHIVE_COMPRESSION_LEVEL', '9'))
+
+def archive_payload(article, bd_matches, int_matches):
+    """
+    Serialize an article row and its matches to compressed JSON for ArchivedArticle.payload.
+    Always compressed (cold data is rarely read), using the same markers as compress_text().
+    """
+    data = json.dumps({
+        'columns': {c.name: getattr(article, c.name) for c in Article.__table__.columns},
+        'bd_matches': bd_matches,
+        'int_matches': int_matches,
+    }, default=str).encode('utf-8')
+    if TEXT_COMPRESSION == 'zstd':
+        return b'S' + zstandard.ZstdCompressor(level=ARCHIVE_COMPRESSION_LEVEL).compress(data)
+    return b'Z' + zlib.compress(data, ARCHIVE_COMPRESSION_LEVEL)
+
+def include_archived_requested():
+    return request.args.get('include_archived', 'false').lower() == 'true'
+
+def _match_dicts(model, article_ids):
+    matches = defaultdict(list)
+    for m in model.query.filter(model.article_id.in_(article_ids)):
+        matches[m.article_id].append({'title': m.title, 'source': m.source, 'url': m.url})
+    return matches
+
+def _archive_chunk(articles, archived_at):
+    """
+    Move one chunk of articles to the archive in a single short transaction
+    """
+    ids = [a.id for a in articles]
+    bd_matches = _match_dicts(BDMatch, ids)
+    int_matches = _match_dicts(IntMatch, ids)
+    rollup = Counter()
+    rows = []
+    for a in articles:
+        rows.append({
+            'id': a.id,
+            'url': a.url,
+            'title': a.title,
+            'published_at': a.published_at,
+            'source': a.source,
+            'sentiment': a.sentiment,
+            'category': a.category,
+            'fact_check': a.fact_check,
+            'bd_relevance_score': a.bd_relevance_score,
+            'archived_at': archived_at,
+            'payload': archive_payload(a, bd_matches[a.id], int_matches[a.id]),
+        })
+        rollup[(a.published_at.strftime('%Y-%m'), a.source or '', a.sentiment or '',
+                a.category or '', a.fact_check or '')] += 1
+
+    db.session.execute(_dialect_insert(ArchivedArticle.__table__).on_conflict_do_nothing(), rows)
+    rollup_table = ArticleArchiveRollup.__table__
+    stmt = _dialect_insert(rollup_table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['month', 'source', 'sentiment', 'category', 'fact_check'],
+        set_={'article_count': rollup_table.c.article_count + stmt.excluded.article_count},
+    )
+    db.session.execute(stmt, [
+        {'month': k[0], 'source': k[1], 'sentiment': k[2], 'category': k[3], 'fact_check': k[4], 'article_count': n}
+        for k, n in rollup.items()
+    ])
+    db.session.query(BDMatch).filter(BDMatch.article_id.in_(ids)).delete(synchronize_session=False)
+    db.session.query(IntMatch).filter(IntMatch.article_id.in_(ids)).delete(synchronize_session=False)
+    db.session.query(Article).filter(Article.id.in_(ids)).delete(synchronize_session=False)
+    db.session.commit()
+    db.session.expunge_all()
+    return len(ids)
+
+@counting_run()
+def archive_old_articles(days=None, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """
+    Move articles published more than `days` days ago into the archive tier.
+    Runs as many small id-keyed chunks, each its own transaction, with a pause in between
+    so the write lock is never held for long. Articles without published_at are kept hot.
+    """
+    days = ARCHIVE_AFTER_DAYS if days is None else days
+    if days <= 0:
+        return 0
+    run_started = time.time()
+    cutoff = utc_now() - datetime.timedelta(days=days)
+    archived = chunks = 0
+    last_id = 0
+    while True:
+        articles = (Article.query.options(undefer_group('payload'))
+                    .filter(Article.published_at < cutoff, Article.id > last_id)
+                    .order_by(Article.id).limit(chunk_size).all())
+        if not articles:
+            break
+        last_id = articles[-1].id
+        try:
+            archived += _archive_chunk(articles, utc_now())
+            chunks += 1
+        except Exception as e:
+            db.session.rollback()
+            log_kv(logging.ERROR, 'archive.chunk_failed', first_id=articles[0].id, last_id=last_id, error=e)
+            continue
+        if ARCHIVE_CHUNK_PAUSE:
+            time.sleep(ARCHIVE_CHUNK_PAUSE)
+    log_run_summary('archive.summary', days=days, cutoff=cutoff.date().isoformat(), archived=archived,
+                    chunks=chunks, seconds=round(time.time() - run_started, 1))
+    if archived:
+        mark_data_changed()
+        checkpoint_database()
+    return archived
+
+def run_article_archival_with_context():
+    with app.app_context():
+        archive_old_articles()
+
+@app.cli.command('archive-articles')
+@click.option('--days', default=None, type=int, help='Archive articles older than this (default: ARCHIVE_AFTER_DAYS).')
+@click.option('--chunk-size', default=ARCHIVE_CHUNK_SIZE, show_default=True, help='Articles moved per transaction.')
+def archive_articles_command(days, chunk_size):
+    """
+    Move old articles from the hot table into the compressed archive.
+    Usage: flask archive-articles [--days 180] [--chunk-size 200]
+    """
+    days = ARCHIVE_AFTER_DAYS if days is None else days
+    if days <= 0:
+        print("Archiving is disabled: pass --days or set ARCHIVE_AFTER_DAYS.")
+        return
+    archived = archive_old_articles(days=days, chunk_size=chunk_size)
+    print(f"Archived {archived} articles older than {days} days.")
+
+# --- Corpus Snapshots (NDJSON export/import) ---
+# One JSON object per line: a header line, then one "article" record per article with
+# every Article column plus its BD/international matches. Files ending in .gz are gzipped.
+# Everything streams through generators, so memory stays flat regardless of corpus size.
+CORPUS_FORMAT_VERSION = 1
+CORPUS_CHUNK_SIZE = int(os.getenv('CORPUS_CHUNK_SIZE', '200'))
+
+def iter_corpus_records(include_archived=False, chunk_size=CORPUS_CHUNK_SIZE):
+    """
+    Yield snapshot records: the header, then every article in id order (keyset chunks,
+    expunged after each chunk), then archived articles if requested.
+    """
+    yield {
+        'type': 'header',
+        'version': CORPUS_FORMAT_VERSION,
+        'exported_at': datetime.datetime.now().isoformat(),
+        'include_archived': include_archived,
+    }
+    columns = [c.name for c in Article.__table__.columns if c.name != 'id']
+    last_id = 0
+    while True:
+        articles = (Article.query.options(undefer_group('payload')).filter(Article.id > last_id)
+                    .order_by(Article.id).limit(chunk_size).all())
+        if not articles:
+            break
+        last_id = articles[-1].id
+        ids = [a.id for a in articles]
+        bd_matches = _match_dicts(BDMatch, ids)
+        int_matches = _match_dicts(IntMatch, ids)
+        for a in articles:
+            yield {
+                'type': 'article',
+                'article': {c: getattr(a, c) for c in columns},
+                'bd_matches': bd_matches[a.id],
+                'int_matches': int_matches[a.id],
+            }
+        db.session.expunge_all()
+    if not include_archived:
+        return
+    last_id = 0
+    while True:
+        rows = (ArchivedArticle.query.options(undefer(ArchivedArticle.payload))
+                .filter(ArchivedArticle.id > last_id).order_by(ArchivedArticle.id).limit(chunk_size).all())
+        if not rows:
+            break
+        last_id = rows[-1].id
+        for row in rows:
+            data = row.load_payload()
+            data['columns'].pop('id', None)
+            yield {
+                'type': 'article',
+                'article': data['columns'],
+                'bd_matches': data.get('bd_matches', []),
+                'int_matches': data.get('int_matches', []),
+                'archived': True,
+            }
+        db.session.expunge_all()
+
+def iter_ndjson(records):
+    for record in records:
+        yield json.dumps(record, default=str, ensure_ascii=False) + '\n'
+
+def iter_gzip(chunks, level=6):
+    """
+    Incrementally gzip an iterable of str chunks
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def open_corpus_file(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+def _corpus_row(values):
+    row = dict(values)
+    if row.get('published_at'):
+        row['published_at'] = datetime.datetime.fromisoformat(row['published_at'])
+    return row
+
+def _import_corpus_batch(records):
+    """
+    Upsert one batch of article records and replace their matches. Idempotent, so a batch
+    that was interrupted half-way is simply written again on resume.
+    """
+    columns = [c.name for c in Article.__table__.columns if c.name != 'id']
+    rows = [{c: _corpus_row(r['article']).get(c) for c in columns} for r in records]
+    bulk_upsert_articles(rows)
+    urls = [r['url'] for r in rows]
+    ids = dict(db.session.query(Article.url, Article.id).filter(Article.url.in_(urls)).all())
+    db.session.query(BDMatch).filter(BDMatch.article_id.in_(ids.values())).delete(synchronize_session=False)
+    db.session.query(IntMatch).filter(IntMatch.article_id.in_(ids.values())).delete(synchronize_session=False)
+    for model, key in ((BDMatch, 'bd_matches'), (IntMatch, 'int_matches')):
+        matches = [
+            {'article_id': ids[r['article']['url']], 'title': m.get('title') or '',
+             'source': m.get('source') or '', 'url': m.get('url')}
+            for r in records for m in r.get(key, [])
+        ]
+        if matches:
+            db.session.execute(db.insert(model), matches)
+    db.session.commit()
+
+def import_corpus(path, batch_size=ARTICLE_BULK_CHUNK_SIZE, resume=True):
+    """
+    Stream a snapshot file into the database in batches. Progress (the last committed line)
+    is kept in `<path>.progress`, so a re-run after a crash continues where it stopped.
+    Returns the number of article records written by this run.
+    """
+    progress_path = path + '.progress'
+    done_lines = 0
+    if resume and os.path.exists(progress_path):
+        with open(progress_path) as f:
+            done_lines = json.load(f).get('line', 0)
+        logger.info(f"Resuming corpus import from line {done_lines}")
+
+    def save_progress(line):
+        with open(progress_path, 'w') as f:
+            json.dump({'line': line}, f)
+
+    imported = 0
+    batch = []
+    line_no = 0
+    with open_corpus_file(path, 'r') as f:
+        for line_no, line in enumerate(f, start=1):
+            if line_no <= done_lines or not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get('type') == 'header':
+                if record.get('version') != CORPUS_FORMAT_VERSION:
+                    raise click.ClickException(f"Unsupported corpus format version: {record.get('version')}")
+                continue
+            if record.get('type') != 'article':
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                _import_corpus_batch(batch)
+                imported += len(batch)
+                batch = []
+                save_progress(line_no)
+                log_kv(logging.INFO, 'corpus.import_progress', line=line_no, imported=imported)
+        if batch:
+            _import_corpus_batch(batch)
+            imported += len(batch)
+    if os.path.exists(progress_path):
+        os.remove(progress_path)
+    mark_data_changed()
+    checkpoint_database()
+    return imported
+
+@app.cli.command('export-corpus')
+@click.argument('path')
+@click.option('--include-archived', is_flag=True, help='Also export articles from the archive tier.')
+@click.option('--chunk-size', default=CORPUS_CHUNK_SIZE, show_default=True, help='Articles read per query.')
+def export_corpus_command(path, include_archived, chunk_size):
+    """
+    Write all articles, analyses and matches to an NDJSON snapshot (gzipped if PATH ends in .gz).
+    Usage: flask export-corpus snapshot.ndjson.gz [--include-archived]
+    """
+    written = 0
+    with open_corpus_file(path, 'w') as f:
+        for line in iter_ndjson(iter_corpus_records(include_archived=include_archived, chunk_size=chunk_size)):
+            f.write(line)
+            written += 1
+    print(f"Exported {written - 1} articles to {path}")
+
+@app.cli.command('import-corpus')
+@click.argument('path')
+@click.option('--batch-size', default=ARTICLE_BULK_CHUNK_SIZE, show_default=True, help='Articles written per transaction.')
+@click.option('--no-resume', is_flag=True, help='Ignore a previous partial run and start from the first line.')
+def import_corpus_command(path, batch_size, no_resume):
+    """
+    Load an NDJSON snapshot written by export-corpus or /api/export. Existing articles
+    (matched by URL) are updated; an interrupted import resumes from its last batch.
+    Usage: flask import-corpus snapshot.ndjson.gz [--batch-size 500] [--no-resume]
+    """
+    imported = import_corpus(path, batch_size=batch_size, resume=not no_resume)
+    print(f"Imported {imported} articles from {path}")
+
+# --- Synthetic Data (load testing) ---
+# `flask seed-synthetic` fills the database with generated but realistically shaped articles
+# (Gemini-style summary_json, fact-check sources, entities, BD/international matches) through
+# the same batch writer as import-corpus. benchmark.py uses it to load-test the API at 10k-1M rows.
+SYNTHETIC_URL_MARKER = '/synthetic/'
+SYNTHETIC_TOPICS = {
+    'Politics': ['interim government', 'election roadmap', 'opposition rally', 'cabinet reshuffle'],
+    'International': ['Teesta water sharing', 'border push-ins', 'visa restrictions', 'foreign secretary talks'],
+    'Economy': ['garment exports', 'remittance inflow', 'power import dues', 'transit fees'],
+    'Security': ['border killings', 'BSF-BGB flag meeting', 'Rohingya camps', 'arms seizure'],
+    'Crime': ['smuggling ring', 'cattle smuggling', 'human trafficking case', 'gold seizure'],
+    'Sports': ['cricket series', 'SAFF championship', 'Shakib Al Hasan', 'women\'s T20'],
+    'Culture': ['Ekushey book fair', 'Durga Puja security', 'film co-production', 'Bengali new year'],
+    'Environment': ['Sundarbans cyclone', 'Padma erosion', 'Dhaka air quality', 'flood forecasting'],
+}
+SYNTHETIC_SENTENCES = [
+    "Officials in Dhaka said the talks with New Delhi would continue next month.",
+    "The Ministry of External Affairs described the discussions as constructive.",
+    "Bangladesh's foreign adviser told reporters that bilateral ties remain important.",
+    "Analysts in Kolkata said the issue has been raised repeatedly since August.",
+    "Several Indian channels aired the claim without independent verification.",
+    "The Border Guard Bangladesh said patrols along the frontier had been stepped up.",
+    "Traders at the Benapole land port reported delays of up to three days.",
+    "A spokesperson for the interim government rejected the report as misleading.",
+    "Local residents said the situation had returned to normal by the evening.",
+    "The Daily Star and Prothom Alo carried differing accounts of the incident.",
+    "Diplomats expect the matter to come up at the next joint consultative commission.",
+    "The statement did not address earlier allegations about minority safety.",
+]
+SYNTHETIC_SENTIMENTS = (['Neutral', 'Negative', 'Cautious', 'Positive'], [55, 25, 12, 8])
+SYNTHETIC_FACT_CHECKS = (['Unverified', 'Verified', 'True', 'False', 'Mixed'], [70, 12, 10, 5, 3])
+
+def synthetic_records(count, seed=0, start=0):
+    """
+    Yield `count` corpus-format article records (see iter_corpus_records), deterministic
+    for a given seed and start index
+    """
+    rng = random.Random(f"{seed}:{start}")
+    indian = sorted(INDIAN_SOURCES)
+    bd = sorted(BD_SOURCES)
+    intl = sorted(INTL_SOURCES)
+    categories = sorted(SYNTHETIC_TOPICS)
+    now = utc_now()
+    for i in range(start, start + count):
+        source = rng.choice(indian) if rng.random() < 0.7 else rng.choice(intl)
+        category = rng.choice(categories)
+        topic = rng.choice(SYNTHETIC_TOPICS[category])
+        sentiment = rng.choices(*SYNTHETIC_SENTIMENTS)[0]
+        fact_check = rng.choices(*SYNTHETIC_FACT_CHECKS)[0]
+        published = now - datetime.timedelta(seconds=rng.randint(0, 365 * 86400))
+        title = f"{topic.capitalize()}: {rng.choice(['Dhaka', 'Delhi', 'Kolkata', 'Agartala'])} responds as row over {topic} deepens ({i})"
+        full_text = '\n\n'.join(
+            ' '.join(rng.choice(SYNTHETIC_SENTENCES) for _ in range(rng.randint(3, 6)))
+            for _ in range(rng.randint(4, 10))
+        )
+        sources = [
+            {'source_name': domain, 'source_country': 'Bangladesh' if domain in BD_SOURCES else 'International',
+             'source_url': f"https://{domain}/news/{i}-{k}"}
+            for k, domain in enumerate(rng.sample(bd, 2) + rng.sample(intl, 1))
+            if rng.random() < 0.6
+        ]
+        scores = [rng.random() for _ in range(4)]
+        total = sum(scores)
+        entities = ['Bangladesh', 'India', topic.split()[0].capitalize()]
+        summary = f"{source} reports on {topic} between Bangladesh and India. " + rng.choice(SYNTHETIC_SENTENCES)
+        article = {
+            'url': f"https://{source}{SYNTHETIC_URL_MARKER}{i}-{topic.lower().replace(' ', '-')}",
+            'title': title,
+            'published_at': published.isoformat(),
+            'author': rng.choice([None, 'Staff Reporter', 'Diplomatic Correspondent', 'PTI', 'Agencies']),
+            'source': source,
+            'sentiment': sentiment,
+            'fact_check': fact_check,
+            'bd_summary': 'Covered' if sources else 'Not covered',
+            'int_summary': 'Covered' if len(sources) > 1 else 'Not covered',
+            'image': f"https://{source}/images/{i}.jpg",
+            'favicon': f"https://{source}/favicon.ico",
+            'score': round(rng.random(), 4),
+            'extras': json.dumps({'links': [], 'entities': entities}),
+            'full_text': full_text,
+            'summary_json': json.dumps({
+                'sentiment': sentiment.lower(), 'category': category.lower(), 'summary': summary,
+                'fact_check': {'status': fact_check.lower(), 'sources': sources},
+                'gemini_enhanced': True, 'geopolitical_implications': '', 'media_bias_assessment': '',
+                'entities_extracted': ['Bangladesh', 'India'], 'source': source,
+            }),
+            'category': category,
+            'summary_text': summary,
+            'fact_check_results': json.dumps(sources),
+            'sentiment_positive': round(scores[0] / total, 4),
+            'sentiment_negative': round(scores[1] / total, 4),
+            'sentiment_neutral': round(scores[2] / total, 4),
+            'sentiment_cautious': round(scores[3] / total, 4),
+            'bd_relevance_score': bd_relevance(title, full_text, entities),
+        }
+        yield {
+            'type': 'article',
+            'url': article['url'],
+            'article': article,
+            'bd_matches': [{'title': f"Report on {s['source_name']}", 'source': s['source_name'], 'url': s['source_url']}
+                           for s in sources if s['source_country'] == 'Bangladesh'],
+            'int_matches': [{'title': f"Report on {s['source_name']}", 'source': s['source_name'], 'url': s['source_url']}
+                            for s in sources if s['source_country'] != 'Bangladesh'],
+        }
+
+def clear_synthetic_articles():
+    ids = db.session.query(Article.id).filter(Article.url.contains(SYNTHETIC_URL_MARKER)).scalar_subquery()
+    for model in (BDMatch, IntMatch):
+        db.session.query(model).filter(model.article_id.in_(ids)).delete(synchronize_session=False)
+    deleted = db.session.query(Article).filter(Article.url.contains(SYNTHETIC_URL_MARKER)).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+@app.cli.command('seed-synthetic')
+@click.option('--n', 'count', required=True, type=int, help='Number of synthetic articles to add.')
+@click.option('--seed', default=0, show_default=True, help='Random seed; the same seed gives the same data.')
+@click.option('--batch-size', default=ARTICLE_BULK_CHUNK_SIZE, show_default=True, help='Articles per committed batch.')
+@click.option('--clear', is_flag=True, help='Delete previously seeded synthetic articles first.')
+def seed_synthetic(count, seed, batch_size, clear):
+    """
+    Add generated articles, summaries, fact-check sources and matches for load testing.
+    Synthetic rows have '/synthetic/' in their URL; re-running appends after the existing ones.
+    Usage: flask seed-synthetic --n 100000 [--seed 0] [--clear]
+    """
+    if clear:
+        print(f"Deleted {clear_synthetic_articles()} synthetic articles.")
+    start = db.session.query(Article).filter(Article.url.contains(SYNTHETIC_URL_MARKER)).count()
+    started = time.time()
+    written = 0
+    batch = []
+    for record in synthetic_records(count, seed=seed, start=start):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            _import_corpus_batch(batch)
+            written += len(batch)
+            batch = []
+            log_sampled(logging.INFO, 'seed_synthetic.progress', written=written, total=count)
+    if batch:
+        _import_corpus_batch(batch)
+        written += len(batch)
+    mark_data_changed()
+    checkpoint_database()
+    elapsed = time.time() - started
+    print(f"Seeded {written} synthetic articles in {elapsed:.1f}s ({written / max(elapsed, 1e-6):.0f}/s).")
+
+# --- Analysis Work Queue ---
+# With ANALYSIS_QUEUE=on, ingestion and /api/reanalyze-all only enqueue work_item rows and any
+# number of `flask worker` processes (SQLite or PostgreSQL) claim, analyze and complete them.
+# Claims are leases: a worker heartbeats while it holds an item, and an item whose lease
+# expires (worker crashed or hung) becomes claimable again, up to WORK_MAX_ATTEMPTS attempts.
+ANALYSIS_QUEUE_ENABLED = os.getenv('ANALYSIS_QUEUE', 'off').lower() in ('1', 'true', 'on')
+WORK_LEASE_SECONDS = int(os.getenv('WORK_LEASE_SECONDS', '300'))
+WORK_MAX_ATTEMPTS = int(os.getenv('WORK_MAX_ATTEMPTS', '3'))
+WORK_RETRY_DELAY = int(os.getenv('WORK_RETRY_DELAY', '60'))   # seconds, doubled after each failed attempt
+EXA_ITEM_FIELDS = ('url', 'title', 'text', 'published_date', 'author', 'image', 'favicon', 'score', 'extras')
+
+def exa_item_payload(item):
+    return {f: getattr(item, f, None) for f in EXA_ITEM_FIELDS}
+
+def enqueue_many(kind, items):
+    """
+    Enqueue (dedupe_key, payload) pairs. A key that is already pending or leased is left
+    alone; one that finished (done/dead) is reset to pending with the new payload.
+    """
+    if not items:
+        return 0
+    now = utc_now()
+    table = WorkItem.__table__
+    stmt = _dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['kind', 'dedupe_key'],
+        set_={
+            'payload': stmt.excluded.payload, 'status': 'pending', 'attempts': 0,
+            'available_at': stmt.excluded.available_at, 'lease_owner': None, 'lease_expires_at': None,
+            'outcome': None, 'last_error': None, 'completed_at': None,
+        },
+        # Spelled as OR rather than IN: expanding IN parameters cannot be used with executemany
+        where=db.or_(table.c.status == 'done', table.c.status == 'dead'),
+    )
+    db.session.execute(stmt, [
+        {'kind': kind, 'dedupe_key': key, 'payload': json.dumps(payload, default=str),
+         'status': 'pending', 'attempts': 0, 'available_at': now, 'created_at': now}
+        for key, payload in items
+    ])
+    db.session.commit()
+    return len(items)
+
+def enqueue_work(kind, payload, dedupe_key):
+    return enqueue_many(kind, [(dedupe_key, payload)])
+
+def enqueue_reanalysis(chunk_size=ARTICLE_BULK_CHUNK_SIZE):
+    queued = 0
+    last_id = 0
+    while True:
+        ids = [r[0] for r in db.session.query(Article.id).filter(Article.id > last_id)
+               .order_by(Article.id).limit(chunk_size)]
+        if not ids:
+            return queued
+        queued += enqueue_many('reanalyze', [(str(i), {'article_id': i}) for i in ids])
+        last_id = ids[-1]
+
+def claim_work_items(owner, limit=1, kinds=None):
+    """
+    Atomically lease up to `limit` claimable items to `owner` and return them.
+    One UPDATE ... WHERE id IN (SELECT ... LIMIT n) RETURNING statement: SQLite serializes it
+    under its write lock, PostgreSQL uses FOR UPDATE SKIP LOCKED so workers never block each other.
+    """
+    now = utc_now()
+    # Expired leases with no attempts left are parked as dead instead of being retried forever
+    db.session.execute(
+        db.update(WorkItem)
+        .where(WorkItem.status == 'leased', WorkItem.lease_expires_at < now, WorkItem.attempts >= WORK_MAX_ATTEMPTS)
+        .values(status='dead', last_error=db.func.coalesce(WorkItem.last_error, 'lease expired'))
+        .execution_options(synchronize_session=False)
+    )
+    claimable = db.or_(
+        db.and_(WorkItem.status == 'pending', WorkItem.available_at <= now),
+        db.and_(WorkItem.status == 'leased', WorkItem.lease_expires_at < now),
+    )
+    candidates = db.select(WorkItem.id).where(claimable)
+    if kinds:
+        candidates = candidates.where(WorkItem.kind.in_(kinds))
+    candidates = candidates.order_by(WorkItem.id).limit(limit)
+    if db.engine.dialect.name == 'postgresql':
+        candidates = candidates.with_for_update(skip_locked=True)
+    items = db.session.execute(
+        db.update(WorkItem)
+        .where(WorkItem.id.in_(candidates.scalar_subquery()), claimable)
+        .values(status='leased', lease_owner=owner, lease_expires_at=now + datetime.timedelta(seconds=WORK_LEASE_SECONDS),
+                heartbeat_at=now, attempts=WorkItem.attempts + 1)
+        .returning(WorkItem.id, WorkItem.kind, WorkItem.payload, WorkItem.attempts)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+    return items
+
+def finish_work_item(item, owner, outcome, error=None):
+    """
+    Record the result of a leased item. Failures go back to pending with exponential backoff
+    until WORK_MAX_ATTEMPTS, then to dead. Returns False if the lease was lost meanwhile.
+    """
+    now = utc_now()
+    if outcome == 'failed':
+        if item.attempts >= WORK_MAX_ATTEMPTS:
+            values = {'status': 'dead', 'completed_at': now}
+        else:
+            delay = WORK_RETRY_DELAY * 2 ** (item.attempts - 1)
+            values = {'status': 'pending', 'available_at': now + datetime.timedelta(seconds=delay)}
+        values.update(outcome=outcome, last_error=(error or 'analysis failed')[:2000], lease_expires_at=None)
+    else:
+        values = {'status': 'done', 'outcome': outcome, 'completed_at': now, 'lease_expires_at': None, 'last_error': None}
+    updated = db.session.execute(
+        db.update(WorkItem)
+        .where(WorkItem.id == item.id, WorkItem.lease_owner == owner, WorkItem.status == 'leased')
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    if not updated:
+        count_event('queue.lease_lost')
+        log_kv(logging.WARNING, 'queue.lease_lost', id=item.id, kind=item.kind, owner=owner)
+    return bool(updated)
+
+def run_work_item(item):
+    """
+    Dispatch one claimed item to its handler. Returns (outcome, error).
+    """
+    payload = json.loads(item.payload)
+    try:
+        if item.kind == 'ingest':
+            return process_exa_item(SimpleNamespace(**payload)), None
+        if item.kind == 'reanalyze':
+            article = db.session.get(Article, payload['article_id'], options=[undefer_group('payload')])
+            if article is None:
+                return 'skipped', None
+            outcome = reanalyze_article(article)
+            # Retried with the item's backoff; an incomplete ingest is retried by the reanalyze item it queued
+            if outcome == 'incomplete':
+                return 'failed', 'article deadline exceeded'
+            return outcome, None
+        return 'failed', f"unknown work item kind: {item.kind}"
+    except Exception as e:
+        db.session.rollback()
+        return 'failed', str(e)
+
+def _lease_heartbeat(engine, owner, held_ids, stop):
+    """
+    Extend the leases of the items this worker holds every third of the lease period
+    """
+    table = WorkItem.__table__
+    while not stop.wait(WORK_LEASE_SECONDS / 3):
+        ids = list(held_ids)
+        if not ids:
+            continue
         try:
-            # Check if article already exists in database
-            art = Article.query.filter_by(url=item.url).first()
-            
-            # ENHANCED SKIP LOGIC: Skip if article already has complete AI analysis
-            if art and art.summary_json and art.summary_json.strip():
-                # Additional validation: check if summary_json contains actual Gemma analysis
-                try:
-                    summary_data = json.loads(art.summary_json)
-                    if isinstance(summary_data, dict) and (
-                        'fact_check' in summary_data or 
-                        'sentiment' in summary_data or 
-                        'category' in summary_data
-                    ):
-                        logger.info(f"Skipping already processed article {idx + 1}: {item.title} (has valid Gemma analysis)")
-                        skipped_count += 1
-                        continue
-                except json.JSONDecodeError:
-                    logger.warning(f"Article {idx + 1} has malformed summary_json, will reprocess: {item.title}")
-                    pass  # Will continue to reprocess this article
-            
-            # Create new article if it doesn't exist
-            if not art:
-                art = Article(url=item.url)
-                
-            logger.info(f"\nProcessing NEW item {idx + 1}:")
-            logger.info(f"Title: {item.title}")
-            logger.info(f"URL: {item.url}")
-            full_text = getattr(item, 'text', None)
-            if not full_text:
-                logger.warning(f"[WARNING] No full text for article '{getattr(item, 'title', 'N/A')}', skipping Gemma analysis.")
-                continue
-            gemma_result_raw = call_gemma_api(item.title, full_text)
-            print("[Gemma RAW response]", gemma_result_raw)
-            gemma_result = gemma_result_raw
-            print("[Gemma PARSED result]", gemma_result)
-            if not gemma_result:
-                logger.warning(f"[WARNING] Gemma API failed for article '{item.title}', skipping.")
-                continue
-            # --- Patch: Ensure fact_check is always an object ---
-            fact_check = gemma_result.get('fact_check')
-            if isinstance(fact_check, str):
-                logger.warning(f"fact_check is a string: {fact_check}, converting to object")
-                fact_check = {
-                    'status': fact_check,
-                    'bd_news_found': gemma_result.get('bd_news_found', False),
-                    'sources_found': gemma_result.get('sources_found', 0),
-                    'sources': gemma_result.get('sources', [])
-                }
-                gemma_result['fact_check'] = fact_check
-            # --- Enhanced Source Extraction from Article Text ---
-            sources = fact_check.get('sources', [])
-            if not sources or not isinstance(sources, list) or len(sources) == 0:
-                logger.info("O3 provided no sources, extracting from article text...")
-                fallback_sources = []
-                
-                if full_text:
-                    # Extract complete URLs from article text
-                    url_pattern = r'https?://[^\s<>"\']+(?:\.[a-zA-Z]{2,})+[^\s<>"\']*'
-                    url_matches = re.findall(url_pattern, full_text)
-                    
-                    # Also look for domain mentions without full URLs
-                    domain_pattern = r'\b(?:www\.)?([a-zA-Z0-9-]+\.(?:com|net|org|co\.uk|com\.bd|gov\.bd))\b'
-                    domain_matches = re.findall(domain_pattern, full_text.lower())
-                    
-                    # Process found URLs
-                    for url in set(url_matches):
-                        domain = get_article_domain(url)
-                        if domain:
-                            source_info = categorize_news_source(domain, url)
-                            if source_info:
-                                fallback_sources.append(source_info)
-                    
-                    # Note: Removed fake URL construction - only use real URLs found in text
-                
-                # If still no sources found, skip this article rather than using placeholders
-                if not fallback_sources:
-                    logger.warning(f"No credible sources found for article '{item.title}', marking as unverified")
-                    fact_check['sources'] = []
-                else:
-                    fact_check['sources'] = fallback_sources
-                    logger.info(f"Extracted {len(fallback_sources)} sources from article text")
-                
-                gemma_result['fact_check'] = fact_check
-            # Extract summary FIRST (most important)
-            summary_text = gemma_result.get('summary', '')
-            
-            # Then extract other fields
-            sentiment = gemma_result.get('sentiment', 'neutral')
-            category = gemma_result.get('category', 'others')
-            
-            # VALIDATE FACT-CHECK SOURCES URLs BEFORE PROCESSING
-            fact_check = gemma_result.get('fact_check', {})
-            if isinstance(fact_check, dict) and 'sources' in fact_check and fact_check['sources']:
-                logger.info(f"Validating {len(fact_check['sources'])} sources from GPT-4...")
-                
-                # Step 1: Validate URLs actually exist (strict validation only)
-                validated_sources = validate_and_filter_sources(fact_check['sources'])
-                
-                # Step 2: Filter out self-referencing sources  
-                original_domain = get_article_domain(item.url)
-                filtered_sources = filter_independent_sources(validated_sources, original_domain)
-                
-                # Step 3: Determine final fact-check status
-                validated_status = determine_fact_check_status(filtered_sources)
-                
-                # Update fact_check with validated data
-                fact_check['status'] = validated_status
-                fact_check['sources'] = filtered_sources
-                gemma_result['fact_check'] = fact_check
-                
-                logger.info(f"URL validation complete: {len(filtered_sources)} verified sources, status: {validated_status}")
-            
-            # Extract verification status LAST
-            fact_check_status = fact_check.get('status', 'unverified')
-            art.fact_check = safe_capitalize(fact_check_status) # Storing only the status for simplicity
-            fact_check_results = gemma_result.get('fact_check', {
-                "status": "unverified",
-                "bd_news_found": False,
-                "sources_found": 0,
-                "sources": [],
-            })
-            gemma_sources = fact_check_results.get('sources', [])
-            # Fallback: If sources are missing or malformed
-            if not gemma_sources or not isinstance(gemma_sources, list):
-                logger.warning(f"[WARNING] Gemma sources missing or malformed for article '{item.title}'")
-            art.title = item.title
-            if getattr(item, 'published_date', None):
-                art.published_at = datetime.datetime.fromisoformat(item.published_date.replace('Z','+00:00'))
-            else:
-                art.published_at = None
-            art.author = getattr(item, 'author', None)
-            if not art.author and item.text:
-                author_match = re.search(r'By\s+([A-Za-z\s]+)', item.text)
-                if author_match:
-                    art.author = author_match.group(1).strip()
-            from urllib.parse import urlparse
-            domain = urlparse(item.url).netloc.lower() if item.url else ''
-            if domain in INDIAN_SOURCES:
-                art.source = domain
-            elif domain in BD_SOURCES:
-                art.source = domain
-            elif domain in INTL_SOURCES:
-                art.source = domain
-            else:
-                art.source = domain if domain else 'Other'
-            art.sentiment = safe_capitalize(sentiment)
-            art.category = normalize_category(category)
-            art.summary_text = summary_text
-            art.image = getattr(item, 'image', None)
-            art.favicon = getattr(item, 'favicon', None)
-            art.score = getattr(item, 'score', None)
-            extras = getattr(item, 'extras', {})
-            if extras and isinstance(extras, str):
-                try:
-                    extras = json.loads(extras)
-                except Exception:
-                    extras = {}
-            if not isinstance(extras, dict):
-                extras = {}
-            if not extras.get('links') and item.text:
-                links = re.findall(r'https?://\S+', item.text)
-                extras['links'] = list(set(links))
-            text_for_ner = f"{item.title or ''} {getattr(item, 'text', '') or ''}"
-            top_entities = []
-            if nlp:
-                try:
-                    doc = nlp(text_for_ner)
-                    entity_freq = {}
-                    for ent in doc.ents:
-                        if len(ent.text) > 2:
-                            entity_freq[ent.text] = entity_freq.get(ent.text, 0) + 1
-                    top_entities = [k for k, v in sorted(entity_freq.items(), key=lambda x: -x[1])[:10]]
-                except Exception as e:
-                    logger.warning(f"Failed to extract entities with spaCy: {e}")
-                    top_entities = []
-            else:
-                logger.warning("SpaCy model not available, skipping entity extraction")
-            extras['entities'] = top_entities
-            art.extras = json.dumps(extras)
-            art.full_text = full_text
-            fact_check_sources_json = json.dumps(gemma_sources)
-            art.fact_check_results = fact_check_sources_json
-            bd_keywords = [
-                'bangladesh', 'dhaka', 'sheikh hasina', 'bdnews24', 'thedailystar', 'prothomalo', 'dhakatribune', 'newagebd', 'financialexpress.com.bd', 'theindependentbd',
-                'padma', 'jamuna', 'chittagong', 'sylhet', 'khulna', 'rajshahi', 'barisal', 'rangpur', 'mymensingh', 'bengal', 'bengali', 'rohingya', 'cox', 'buriganga', 'ganges', 'sundarbans', 'grameen', 'brac', 'biman', 'sonar bangla', 'ekushey', 'shakib', 'mashrafe', 'mustafizur', 'mirpur', 'banani', 'gulshan', 'uttara', 'motijheel', 'narayanganj', 'gazipur', 'comilla', 'noakhali', 'feni', 'kushtia', 'pabna', 'bogura', 'tangail', 'sirajganj', 'jessore', 'khagrachari', 'bandarban', 'rangamati', 'savar', 'ashulia', 'uttar', 'dakshin', 'bimanbandar', 'agargaon', 'bd', 'bdesh', 'bdeshi', 'bengaluru', 'bengali', 'bengal', 'bdesh', 'bdeshi', 'biman', 'padma', 'jamuna', 'buriganga', 'sundarbans', 'ekushey', 'shakib', 'mashrafe', 'mustafizur', 'mirpur', 'banani', 'gulshan', 'uttara', 'motijheel', 'narayanganj', 'gazipur', 'comilla', 'noakhali', 'feni', 'kushtia', 'pabna', 'bogura', 'tangail', 'sirajganj', 'jessore', 'khagrachari', 'bandarban', 'rangamati', 'savar', 'ashulia', 'uttar', 'dakshin', 'bimanbandar', 'agargaon'
-            ]
-            text_content = f"{item.title or ''} {getattr(item, 'text', '') or ''}".lower()
-            entity_content = ' '.join(top_entities).lower()
-            bd_hits = sum(1 for kw in bd_keywords if kw in text_content or kw in entity_content)
-            total_words = max(1, len(text_content.split()) + len(entity_content.split()))
-            bd_relevance_score = min(100, int(100 * bd_hits / total_words)) if bd_hits else 0
-            # --- Save the full Gemma result to summary_json ---
-            summary_json_obj = gemma_result.copy()
-            summary_json_obj['source'] = art.source
-            summary_json_obj['score'] = art.score
-            art.summary_json = json.dumps(summary_json_obj, default=str)
-            db.session.add(art)
-            db.session.commit()
-            recent_cutoff = datetime.datetime.now() - datetime.timedelta(days=30)
-            BDMatch.query.filter_by(article_id=art.id).delete()
-            IntMatch.query.filter_by(article_id=art.id).delete()
-            bd_matches_to_store = []
-            intl_matches_to_store = []
-            for s in gemma_sources:
-                if s.get('source_country') == 'Bangladesh':
-                    bd_matches_to_store.append({'title': f"Simulated: {s.get('source_name')}", 'source': s.get('source_name'), 'url': s.get('source_url')})
-                else:
-                    intl_matches_to_store.append({'title': f"Simulated: {s.get('source_name')}", 'source': s.get('source_name'), 'url': s.get('source_url')})
-            if not bd_matches_to_store:
-                bd_matches_to_store = [
-                    {'title': a.title, 'source': a.source, 'url': a.url}
-                    for a in Article.query.filter(Article.source.in_(BD_SOURCES), Article.published_at >= recent_cutoff).all()
-                    if SequenceMatcher(None, a.title.lower(), item.title.lower()).ratio() > 0.7
-                ][:3]
-            if not intl_matches_to_store:
-                intl_matches_to_store = [
-                    {'title': a.title, 'source': a.source, 'url': a.url}
-                    for a in Article.query.filter(Article.source.in_(INTL_SOURCES), Article.published_at >= recent_cutoff).all()
-                    if SequenceMatcher(None, a.title.lower(), item.title.lower()).ratio() > 0.7
-                ][:3]
-            for m in bd_matches_to_store[:3]:
-                db.session.add(BDMatch(article_id=art.id, title=m.get('title', ''), source=m.get('source', ''), url=m.get('url', '')))
-            for m in intl_matches_to_store[:3]:
-                db.session.add(IntMatch(article_id=art.id, title=m.get('title', ''), source=m.get('source', ''), url=m.get('url', '')))
-            db.session.commit()
-            logger.info(f"Committed Article: {art.id}")
-            processed_count += 1
+            now = utc_now()
+            with engine.begin() as conn:
+                conn.execute(
+                    table.update()
+                    .where(table.c.id.in_(ids), table.c.lease_owner == owner, table.c.status == 'leased')
+                    .values(lease_expires_at=now + datetime.timedelta(seconds=WORK_LEASE_SECONDS), heartbeat_at=now)
+                )
         except Exception as e:
-            logger.error(f"Error processing article {getattr(item, 'title', None)}: {e}")
-            db.session.rollback()
-    
-    # Summary logging
-    logger.info(f"\n=== INGESTION SUMMARY ===")
-    logger.info(f"Total articles found: {len(filtered_results)}")
-    logger.info(f"Already processed (skipped): {skipped_count}")
-    logger.info(f"Newly processed: {processed_count}")
-    logger.info(f"Errors encountered: {len(filtered_results) - skipped_count - processed_count}")
-    logger.info(f"Processing completed at {datetime.datetime.now()}")
-    
-    # Additional logging: Check database state
-    total_articles_in_db = Article.query.count()
-    articles_with_analysis = Article.query.filter(Article.summary_json.isnot(None)).count()
-    logger.info(f"Database state: {total_articles_in_db} total articles, {articles_with_analysis} with Gemma analysis")
-    logger.info("Done.")
+            log_kv(logging.WARNING, 'queue.heartbeat_failed', owner=owner, error=e)
 
-@app.cli.command('fetch-exa')
-def fetch_exa():
-    run_exa_ingestion()
+@counting_run()
+def run_worker(owner=None, batch_size=1, idle_sleep=5.0, kinds=None, drain=False):
+    """
+    Claim and process work items until interrupted (or, with drain=True, until the queue is empty)
+    """
+    owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+    held_ids = set()
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_lease_heartbeat, args=(db.engine, owner, held_ids, stop), daemon=True)
+    heartbeat.start()
+    started = time.time()
+    done = 0
+    log_kv(logging.INFO, 'worker.start', owner=owner, batch_size=batch_size, lease_seconds=WORK_LEASE_SECONDS)
+    try:
+        while True:
+            items = claim_work_items(owner, batch_size, kinds)
+            if not items:
+                if drain:
+                    break
+                time.sleep(idle_sleep)
+                continue
+            held_ids.update(item.id for item in items)
+            for item in items:
+                outcome, error = run_work_item(item)
+                finish_work_item(item, owner, outcome, error)
+                held_ids.discard(item.id)
+                count_event(f'queue.{item.kind}.{outcome}')
+                done += 1
+            mark_data_changed()
+            log_sampled(logging.INFO, 'worker.progress', owner=owner, items=done,
+                        per_minute=round(60 * done / max(time.time() - started, 1e-6), 1))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        elapsed = time.time() - started
+        log_run_summary('worker.summary', owner=owner, items=done, seconds=round(elapsed, 1),
+                        per_minute=round(60 * done / max(elapsed, 1e-6), 1))
+    return done
 
-# Scheduler uses the ingestion logic directly
-def run_exa_ingestion_with_context():
-    logger.info(f"[{datetime.datetime.now()}] Scheduled Exa ingestion running...")
-    with app.app_context():
-        run_exa_ingestion()
+@counting_run()
+def retry_incomplete_articles():
+    """
+    Without ANALYSIS_QUEUE no worker claims the 'reanalyze' items queued for articles stored
+    past their deadline; this job of the scheduler holding the scheduler lock drains the
+    ones that are due. Each item finishes
+    within its article deadline, well inside the lease, so no heartbeat is needed.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}:retry"
+    outcomes = Counter()
+    while True:
+        items = claim_work_items(owner, 1, ['reanalyze'])
+        if not items:
+            break
+        for item in items:
+            outcome, error = run_work_item(item)
+            finish_work_item(item, owner, outcome, error)
+            outcomes[outcome] += 1
+    if outcomes:
+        mark_data_changed()
+        log_kv(logging.INFO, 'deadline.retried', **outcomes)
+    return outcomes
 
-scheduler = BackgroundScheduler()
-scheduler.add_job(run_exa_ingestion_with_context, 'interval', hours=12)
-scheduler.start()
+def retry_incomplete_articles_with_context():
+    with app.app_context():
+        retry_incomplete_articles()
 
-def patch_old_fact_check_data():
+def work_queue_stats(window_minutes=15):
     """
-    Patch old Article records: if summary_json exists and fact_check is a string, convert it to an object.
+    Queue depth by status/kind plus per-worker throughput over the last `window_minutes`
     """
-    with app.app_context():
-        articles = Article.query.filter(Article.summary_json.isnot(None)).all()
-        patched = 0
-        for art in articles:
-            try:
-                summary = json.loads(art.summary_json)
-                fc = summary.get('fact_check')
-                if isinstance(fc, str):
-                    # Patch to object
-                    summary['fact_check'] = {
-                        'status': fc,
-                        'bd_news_found': summary.get('bd_news_found', False),
-                        'sources_found': summary.get('sources_found', 0),
-                        'sources': summary.get('sources', [])
-                    }
-                    art.summary_json = json.dumps(summary)
-                    db.session.add(art)
-                    patched += 1
-            except Exception as e:
-                print(f"Error patching article {art.id}: {e}")
-        db.session.commit()
-        print(f"Patched {patched} articles.")
+    now = utc_now()
+    since = now - datetime.timedelta(minutes=window_minutes)
+    depth = dict(db.session.query(WorkItem.status, db.func.count(WorkItem.id)).group_by(WorkItem.status).all())
+    pending_by_kind = dict(db.session.query(WorkItem.kind, db.func.count(WorkItem.id))
+                           .filter(WorkItem.status == 'pending').group_by(WorkItem.kind).all())
+    oldest_pending = db.session.query(db.func.min(WorkItem.created_at)).filter(WorkItem.status == 'pending').scalar()
+    expired_leases = WorkItem.query.filter(WorkItem.status == 'leased', WorkItem.lease_expires_at < now).count()
+    workers = {}
+    for owner, completed, last_completed in db.session.query(
+            WorkItem.lease_owner, db.func.count(WorkItem.id), db.func.max(WorkItem.completed_at)
+    ).filter(WorkItem.completed_at >= since).group_by(WorkItem.lease_owner).all():
+        workers[owner] = {
+            'worker': owner,
+            'completed': completed,
+            'per_minute': round(completed / window_minutes, 2),
+            'last_completed_at': last_completed.isoformat() if last_completed else None,
+            'leased': 0,
+        }
+    for owner, leased, last_heartbeat in db.session.query(
+            WorkItem.lease_owner, db.func.count(WorkItem.id), db.func.max(WorkItem.heartbeat_at)
+    ).filter(WorkItem.status == 'leased').group_by(WorkItem.lease_owner).all():
+        entry = workers.setdefault(owner, {'worker': owner, 'completed': 0, 'per_minute': 0.0, 'last_completed_at': None})
+        entry['leased'] = leased
+        entry['last_heartbeat_at'] = last_heartbeat.isoformat() if last_heartbeat else None
+    return {
+        'enabled': ANALYSIS_QUEUE_ENABLED,
+        'depth': {status: depth.get(status, 0) for status in ('pending', 'leased', 'done', 'dead')},
+        'pending_by_kind': pending_by_kind,
+        'oldest_pending_age_seconds': round((now - oldest_pending).total_seconds()) if oldest_pending else None,
+        'expired_leases': expired_leases,
+        'window_minutes': window_minutes,
+        'throughput_per_minute': round(sum(w['completed'] for w in workers.values()) / window_minutes, 2),
+        'workers': sorted(workers.values(), key=lambda w: w['worker'] or ''),
+    }
 
-def reverify_old_articles_with_gemma():
+@app.cli.command('worker')
+@click.option('--batch-size', default=1, show_default=True, help='Items claimed per lease round trip.')
+@click.option('--idle-sleep', default=5.0, show_default=True, help='Seconds to wait when the queue is empty.')
+@click.option('--kind', 'kinds', multiple=True, type=click.Choice(['ingest', 'reanalyze']), help='Only claim these kinds (repeatable).')
+@click.option('--drain', is_flag=True, help='Exit once the queue is empty instead of waiting for more work.')
+def worker_command(batch_size, idle_sleep, kinds, drain):
     """
-    Reprocess all articles with Gemma and update summary_json with the latest Gemma response.
+    Process queued analysis work. Run as many of these as the Gemini rate limit allows.
+    Usage: flask worker [--batch-size 1] [--kind ingest] [--drain]
     """
-    with app.app_context():
-        articles = Article.query.all()
-        for art in articles:
-            print(f"Reprocessing: {art.title}")
-            gemma_result = call_gemma_api(art.title, art.full_text or "")
-            if gemma_result:
-                # Ensure all required fields are present in fact_check
-                fc = gemma_result.get('fact_check', {})
-                if not isinstance(fc, dict):
-                    fc = {}
-                fc.setdefault('status', 'unverified')
-                fc.setdefault('sources', [])
-                fc.setdefault('bd_news_found', False)
-                fc.setdefault('sources_found', len(fc['sources']))
-                # --- Fallback: If sources are empty, extract from text ---
-                sources = fc.get('sources', [])
-                if not sources or not isinstance(sources, list) or len(sources) == 0:
-                    fallback_sources = []
-                    if art.full_text:
-                        url_matches = re.findall(r'https?://[\w\.-]+', art.full_text)
-                        for url in set(url_matches):
-                            if any(bd in url for bd in ['bdnews24', 'thedailystar', 'prothomalo', 'dhakatribune', 'newagebd', 'financialexpress.com.bd', 'theindependentbd']):
-                                fallback_sources.append({
-                                    'source_name': url.split('//')[-1].split('/')[0],
-                                    'source_country': 'BD',
-                                    'source_url': url
-                                })
-                            elif any(intl in url for intl in ['bbc', 'cnn', 'reuters', 'aljazeera', 'nytimes', 'theguardian', 'france24', 'dw.com']):
-                                fallback_sources.append({
-                                    'source_name': url.split('//')[-1].split('/')[0],
-                                    'source_country': 'INTL',
-                                    'source_url': url
-                                })
-                        # Don't create fake sources - leave empty if no real sources found
-                    fc['sources'] = fallback_sources
-                gemma_result['fact_check'] = fc
-                art.summary_json = json.dumps(gemma_result, default=str)
-                db.session.add(art)
-        db.session.commit()
-        print("Reprocessing complete.")
+    done = run_worker(batch_size=batch_size, idle_sleep=idle_sleep, kinds=list(kinds) or None, drain=drain)
+    print(f"Worker processed {done} items.")
 
-@app.cli.command('reverify-gemma')
-def reverify_gemma():
+@app.cli.command('queue-stats')
+@click.option('--window', default=15, show_default=True, help='Throughput window in minutes.')
+def queue_stats_command(window):
     """
-    Reprocess all articles with Gemma and update summary_json with the latest Gemma response.
-    Usage: flask reverify-gemma
+    Show work queue depth and per-worker throughput.
+    Usage: flask queue-stats [--window 15]
     """
-    reverify_old_articles_with_gemma()
-    print("All articles reprocessed with Gemma.")
+    print(json.dumps(work_queue_stats(window), indent=2))
 
 @app.route('/api/articles')
 def list_articles():
@@ -2000,70 +5541,100 @@ def list_articles():
     start = request.args.get('start')  # ISO date string
     end = request.args.get('end')      # ISO date string
     search = request.args.get('search')
+    min_bd_relevance = request.args.get('min_bd_relevance', type=float)
+    sort_by = request.args.get('sort', 'date')  # date | bd_relevance
 
-    # Build query
-    query = Article.query
-    if source:
-        query = query.filter(Article.source == source)
-    if sentiment:
-        query = query.filter(Article.sentiment == sentiment)
-    if start:
-        try:
-            start_dt = datetime.datetime.fromisoformat(start)
-            query = query.filter(Article.published_at >= start_dt)
-        except Exception:
-            pass
-    if end:
-        try:
-            end_dt = datetime.datetime.fromisoformat(end)
-            query = query.filter(Article.published_at <= end_dt)
-        except Exception:
-            pass
-    if search:
-        like = f"%{search}%"
-        query = query.filter((Article.title.ilike(like)) | (Article.full_text.ilike(like)))
+    include_archived = include_archived_requested()
+
+    def apply_filters(query, model):
+        if source:
+            query = query.filter(model.source == source)
+        if sentiment:
+            query = query.filter(model.sentiment == sentiment)
+        if min_bd_relevance is not None:
+            query = query.filter(model.bd_relevance_score >= min_bd_relevance)
+        if start:
+            try:
+                start_dt = datetime.datetime.fromisoformat(start)
+                query = query.filter(model.published_at >= start_dt)
+            except Exception:
+                pass
+        if end:
+            try:
+                end_dt = datetime.datetime.fromisoformat(end)
+                query = query.filter(model.published_at <= end_dt)
+            except Exception:
+                pass
+        if search:
+            like = f"%{search}%"
+            if model is Article:
+                query = query.filter((Article.title.ilike(like)) | (text_sql(Article.full_text).ilike(like)))
+            else:
+                # Archived full text only exists inside the compressed payload
+                query = query.filter(model.title.ilike(like))
+        return query
+
+    def ordering(model):
+        if sort_by == 'bd_relevance':
+            return (model.bd_relevance_score.desc().nulls_last(), model.published_at.desc())
+        return (model.published_at.desc(),)
 
+    # Build query
+    query = apply_filters(Article.query, Article)
     total = query.count()
-    articles = query.order_by(Article.published_at.desc()).limit(limit).offset(offset).all()
+    articles = query.options(undefer_group('payload')).order_by(*ordering(Article)).limit(limit).offset(offset).all()
+    bd_matches = _match_dicts(BDMatch, [a.id for a in articles])
+    int_matches = _match_dicts(IntMatch, [a.id for a in articles])
+    results = [article_list_item(a, bd_matches[a.id], int_matches[a.id]) for a in articles]
+
+    # Archived articles are all older than the hot ones, so they page in after them
+    if include_archived:
+        archived_query = apply_filters(ArchivedArticle.query, ArchivedArticle)
+        archived_total = archived_query.count()
+        if len(results) < limit:
+            archived = (archived_query.options(undefer(ArchivedArticle.payload))
+                        .order_by(*ordering(ArchivedArticle))
+                        .limit(limit - len(results)).offset(max(0, offset - total)).all())
+            for row in archived:
+                a, bd, intl = row.to_article()
+                results.append(article_list_item(a, bd, intl, archived=True))
+        total += archived_total
 
     return jsonify({
         'total': total,
-        'count': len(articles),
-        'results': [
-            {
-                'id': a.id,
-                'title': a.title,
-                'url': a.url,
-                'publishedDate': a.published_at.isoformat() if a.published_at else None,
-                'author': a.author,
-                'score': a.score,
-                'text': a.full_text,
-                'summary': (lambda sj: json.loads(sj) if sj and isinstance(json.loads(sj), dict) else None)(a.summary_json) if a.summary_json else None,
-                'image': a.image,
-                'favicon': a.favicon,
-                'extras': json.loads(a.extras) if a.extras else None,
-                'source': a.source,
-                'sentiment': a.sentiment,
-                'fact_check': a.fact_check,
-                'bangladeshi_summary': a.bd_summary,
-                'international_summary': a.int_summary,
-                'bangladeshi_matches': [
-                    {'title': m.title, 'source': m.source, 'url': m.url}
-                    for m in BDMatch.query.filter_by(article_id=a.id)
-                ],
-                'international_matches': [
-                    {'title': m.title, 'source': m.source, 'url': m.url}
-                    for m in IntMatch.query.filter_by(article_id=a.id)
-                ]
-            }
-            for a in articles
-        ]
+        'count': len(results),
+        'results': results
     })
 
+def article_list_item(a, bd_matches, int_matches, archived=False):
+    return {
+        'id': a.id,
+        'title': a.title,
+        'url': a.url,
+        'publishedDate': a.published_at.isoformat() if a.published_at else None,
+        'author': a.author,
+        'score': a.score,
+        'text': a.full_text,
+        'summary': (lambda sj: json.loads(sj) if sj and isinstance(json.loads(sj), dict) else None)(a.summary_json) if a.summary_json else None,
+        'image': a.image,
+        'favicon': a.favicon,
+        'extras': json.loads(a.extras) if a.extras else None,
+        'source': a.source,
+        'sentiment': a.sentiment,
+        'fact_check': a.fact_check,
+        'bd_relevance_score': a.bd_relevance_score,
+        'bangladeshi_summary': a.bd_summary,
+        'international_summary': a.int_summary,
+        'bangladeshi_matches': bd_matches,
+        'international_matches': int_matches,
+        'archived': archived
+    }
+
 @app.route('/api/gemini-analyze', methods=['POST'])
 def gemini_analyze():
     """
-    Endpoint for analyzing text using Gemini AI with web search capabilities.
+    Endpoint for analyzing text using Gemini AI. Runs in the 'fast' analysis tier unless the
+    body names another ("tier": "deep" for search-grounded source verification).
     """
     try:
         data = request.get_json()
@@ -2072,88 +5643,95 @@ def gemini_analyze():
         
         text = data.get('text', '').strip()
         title = data.get('title', 'News Article').strip()
+        tier = data.get('tier') or route_analysis_tier('interactive')
         
         if not text:
             return jsonify({'error': 'No text provided for analysis'}), 400
+        if tier not in ANALYSIS_TIERS:
+            return jsonify({'error': f"Unknown tier; expected one of {', '.join(ANALYSIS_TIERS)}"}), 400
         
         if not gemini_client:
             return jsonify({'error': 'Gemini AI not available. Please check GEMINI_API_KEY configuration.'}), 503
         
-        logger.info(f"=== GEMINI ANALYZE REQUEST ===")
-        logger.info(f"Title: {title}")
-        logger.info(f"Text length: {len(text)} characters")
-        logger.info(f"=== START ANALYSIS ===")
+        log_kv(logging.INFO, 'gemini_analyze.request', title=title, tier=tier, text_length=len(text))
         
         # Perform Gemini AI analysis
-        result = call_gemini_api(title, text)
+        result = call_gemini_api(title, text, tier)
         
         if not result:
             logger.error("Gemini AI analysis returned None")
             return jsonify({'error': 'Gemini AI analysis failed'}), 500
         
-        logger.info(f"=== ANALYSIS COMPLETE ===")
-        logger.info(f"Result type: {type(result)}")
         if isinstance(result, dict):
-            logger.info(f"Fact check status: {result.get('fact_check', {}).get('status', 'unknown')}")
             sources = result.get('fact_check', {}).get('sources', [])
-            logger.info(f"Number of sources found: {len(sources)}")
-            for i, source in enumerate(sources):
-                logger.info(f"  Source {i+1}: {source.get('source_name', 'Unknown')} ({source.get('source_country', 'Unknown')})")
-        logger.info(f"=== END ANALYSIS DEBUG ===")
+            log_kv(logging.INFO, 'gemini_analyze.complete', status=result.get('fact_check', {}).get('status', 'unknown'),
+                   sources=len(sources))
+            log_kv(logging.DEBUG, 'gemini_analyze.sources',
+                   sources=[f"{x.get('source_name', 'Unknown')}|{x.get('source_country', 'Unknown')}" for x in sources])
         
         return jsonify({
             'success': True,
             'analysis': result,
             'title': title,
             'text_length': len(text),
-            'ai_provider': 'google-gemini'
+            'ai_provider': 'google-gemini',
+            'tier': tier,
+            'model': ANALYSIS_TIERS[tier]['model']
         })
         
     except Exception as e:
         logger.error(f"Error in Gemini analysis endpoint: {e}")
         return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
 
+@app.route('/api/analysis-tiers')
+def analysis_tiers():
+    """
+    Analysis tier settings with the latency and estimated cost this process has recorded for each
+    """
+    return jsonify({'tiers': analysis_tier_report()})
+
 @app.route('/api/articles/<int:article_id>')
 def get_article(article_id):
-    article = Article.query.get(article_id)
-    if not article:
+    # Check validators against the timestamp column alone, so a 304 never loads the payload
+    model, stamp_column = Article, Article.updated_at
+    row = db.session.query(stamp_column).filter(Article.id == article_id).first()
+    if row is None and include_archived_requested():
+        model, stamp_column = ArchivedArticle, ArchivedArticle.archived_at
+        row = db.session.query(stamp_column).filter(ArchivedArticle.id == article_id).first()
+    if row is None:
         return jsonify({"error": "Article not found"}), 404
+    last_modified = row[0]
+    etag = None
+    if last_modified:
+        etag = representation_etag(f"{model.__tablename__}-{article_id}-{last_modified:%Y%m%d%H%M%S%f}")
+        response = not_modified(etag, last_modified)
+        if response is not None:
+            return response
+
+    if model is Article:
+        article = db.session.get(Article, article_id, options=[undefer_group('payload')])
+    else:
+        article = db.session.get(ArchivedArticle, article_id, options=[undefer(ArchivedArticle.payload)]).to_article()[0]
     
-    # Debug logging for troubleshooting
-    print(f"\n=== DEBUG: Article {article_id} ===")
-    print(f"Title: {article.title}")
-    print(f"Fact Check (legacy): {article.fact_check}")
-    print(f"Summary JSON exists: {bool(article.summary_json)}")
-    
-    if article.summary_json:
+    # Debug logging for troubleshooting (parsing is skipped entirely unless DEBUG is enabled)
+    if logger.isEnabledFor(logging.DEBUG):
+        fields = {'id': article_id, 'fact_check_legacy': article.fact_check, 'has_summary_json': bool(article.summary_json)}
         try:
-            summary_data = json.loads(article.summary_json)
-            print(f"Summary JSON parsed successfully: {type(summary_data)}")
-            
-            if isinstance(summary_data, dict):
-                fact_check = summary_data.get('fact_check', {})
-                print(f"Fact check object: {fact_check}")
-                
-                if isinstance(fact_check, dict):
-                    print(f"Fact check status: {fact_check.get('status')}")
-                    sources = fact_check.get('sources', [])
-                    print(f"Number of sources: {len(sources)}")
-                    
-                    for i, source in enumerate(sources):
-                        if isinstance(source, dict):
-                            print(f"Source {i+1}: country='{source.get('source_country')}', name='{source.get('source_name')}', url='{source.get('source_url')}'")
-                        else:
-                            print(f"Source {i+1}: {source} (type: {type(source)})")
-                else:
-                    print(f"Fact check is not dict: {fact_check} (type: {type(fact_check)})")
+            summary_data = json.loads(article.summary_json) if article.summary_json else None
+            fact_check = summary_data.get('fact_check', {}) if isinstance(summary_data, dict) else None
+            if isinstance(fact_check, dict):
+                sources = fact_check.get('sources', [])
+                fields['fact_check_status'] = fact_check.get('status')
+                fields['sources'] = len(sources)
+                fields['source_countries'] = [x.get('source_country') for x in sources if isinstance(x, dict)]
             else:
-                print(f"Summary data is not dict: {summary_data}")
+                fields['fact_check'] = fact_check
         except Exception as e:
-            print(f"Error parsing summary JSON: {e}")
+            fields['parse_error'] = e
+        log_kv(logging.DEBUG, 'article.get', **fields)
     
-    print("=== END DEBUG ===\n")
-    
-    return jsonify(article.to_dict())
+    response = jsonify(article.to_dict())
+    return with_validators(response, etag, last_modified) if etag else response
 
 @app.route('/api/articles/<int:article_id>/debug')
 def debug_article(article_id):
@@ -2245,41 +5823,44 @@ def debug_article(article_id):
     return jsonify(debug_info)
 
 # --- IMPROVED infer_category ---
+CATEGORY_KEYWORDS = [
+    ("Health", ["covid", "health", "hospital", "doctor", "vaccine", "disease", "virus", "medicine", "medical"]),
+    ("Politics", ["election", "minister", "government", "parliament", "politics", "cabinet", "bjp", "congress", "policy", "bill", "law"]),
+    ("Economy", ["economy", "gdp", "trade", "export", "import", "inflation", "market", "investment", "finance", "stock", "business"]),
+    ("Education", ["school", "university", "education", "student", "exam", "teacher", "college", "admission"]),
+    ("Security", ["security", "terror", "attack", "military", "army", "defence", "border", "police", "crime"]),
+    ("Sports", ["cricket", "football", "olympic", "match", "tournament", "player", "goal", "score", "team", "league"]),
+    ("Technology", ["tech", "ai", "robot", "software", "hardware", "internet", "startup", "app", "digital", "cyber"]),
+    ("Environment", ["climate", "environment", "pollution", "weather", "rain", "flood", "earthquake", "disaster", "wildlife"]),
+    ("International", ["us", "china", "pakistan", "bangladesh", "united nations", "global", "foreign", "international", "world"]),
+    ("Culture", ["festival", "culture", "art", "music", "movie", "film", "heritage", "tradition", "literature"]),
+    ("Science", ["science", "research", "study", "experiment", "discovery", "space", "nasa", "isro"]),
+    ("Business", ["business", "company", "corporate", "industry", "merger", "acquisition", "startup", "entrepreneur"]),
+    ("Crime", ["crime", "theft", "murder", "fraud", "scam", "arrest", "court", "trial"]),
+]
+CATEGORY_KEYWORD_MATCHER = KeywordMatcher(kw for _, keywords in CATEGORY_KEYWORDS for kw in keywords)
+
 def infer_category(title, text):
-    title = (title or "").lower()
-    text = (text or "").lower()
-    content = f"{title} {text}"
-    category_keywords = [
-        ("Health", ["covid", "health", "hospital", "doctor", "vaccine", "disease", "virus", "medicine", "medical"]),
-        ("Politics", ["election", "minister", "government", "parliament", "politics", "cabinet", "bjp", "congress", "policy", "bill", "law"]),
-        ("Economy", ["economy", "gdp", "trade", "export", "import", "inflation", "market", "investment", "finance", "stock", "business"]),
-        ("Education", ["school", "university", "education", "student", "exam", "teacher", "college", "admission"]),
-        ("Security", ["security", "terror", "attack", "military", "army", "defence", "border", "police", "crime"]),
-        ("Sports", ["cricket", "football", "olympic", "match", "tournament", "player", "goal", "score", "team", "league"]),
-        ("Technology", ["tech", "ai", "robot", "software", "hardware", "internet", "startup", "app", "digital", "cyber"]),
-        ("Environment", ["climate", "environment", "pollution", "weather", "rain", "flood", "earthquake", "disaster", "wildlife"]),
-        ("International", ["us", "china", "pakistan", "bangladesh", "united nations", "global", "foreign", "international", "world"]),
-        ("Culture", ["festival", "culture", "art", "music", "movie", "film", "heritage", "tradition", "literature"]),
-        ("Science", ["science", "research", "study", "experiment", "discovery", "space", "nasa", "isro"]),
-        ("Business", ["business", "company", "corporate", "industry", "merger", "acquisition", "startup", "entrepreneur"]),
-        ("Crime", ["crime", "theft", "murder", "fraud", "scam", "arrest", "court", "trial"]),
-    ]
+    found = CATEGORY_KEYWORD_MATCHER.matches(f"{title or ''} {text or ''}")
     category_scores = {}
-    for cat, keywords in category_keywords:
-        score = sum(1 for kw in keywords if re.search(rf'\\b{re.escape(kw)}\\b', content))
+    for cat, keywords in CATEGORY_KEYWORDS:
+        score = sum(1 for kw in keywords if kw in found)
         if score > 0:
             category_scores[cat] = score
     if category_scores:
         return max(category_scores.items(), key=lambda x: x[1])[0]
     return "Other"
 
+# Matched as substrings, so "improve" also covers "improved" and "fail" covers "failure"
+POSITIVE_WORDS = ["progress", "growth", "success", "improve", "benefit", "positive", "win", "peace", "agreement", "support", "help", "good", "boost", "advance", "resolve", "cooperate", "strong", "stable", "hope", "opportunity"]
+NEGATIVE_WORDS = ["crisis", "conflict", "tension", "attack", "negative", "problem", "loss", "decline", "fail", "violence", "threat", "bad", "weak", "unstable", "fear", "concern", "risk", "danger", "protest", "dispute", "sanction"]
+SENTIMENT_KEYWORD_MATCHER = KeywordMatcher(POSITIVE_WORDS + NEGATIVE_WORDS, whole_words=False)
+
 def infer_sentiment(title, text):
     # Simple rule-based sentiment inference
-    positive_words = ["progress", "growth", "success", "improve", "benefit", "positive", "win", "peace", "agreement", "support", "help", "good", "boost", "advance", "resolve", "cooperate", "strong", "stable", "hope", "opportunity"]
-    negative_words = ["crisis", "conflict", "tension", "attack", "negative", "problem", "loss", "decline", "fail", "violence", "threat", "bad", "weak", "unstable", "fear", "concern", "risk", "danger", "protest", "dispute", "sanction"]
-    content = f"{title or ''} {text or ''}".lower()
-    pos = any(word in content for word in positive_words)
-    neg = any(word in content for word in negative_words)
+    found = SENTIMENT_KEYWORD_MATCHER.matches(f"{title or ''} {text or ''}")
+    pos = any(word in found for word in POSITIVE_WORDS)
+    neg = any(word in found for word in NEGATIVE_WORDS)
     if pos and not neg:
         return "Positive"
     elif neg and not pos:
@@ -2291,12 +5872,17 @@ def infer_sentiment(title, text):
 
 @app.route('/api/dashboard')
 def dashboard():
+    return cached_json_response(build_dashboard)
+
+def build_dashboard():
     # Get category and source filter from query params
     filter_category = request.args.get('category')
     filter_source = request.args.get('source')
     show_all = request.args.get('show_all', 'false').lower() == 'true'
     start_date = request.args.get('start')
     end_date = request.args.get('end')
+    min_bd_relevance = request.args.get('min_bd_relevance', type=float)
+    sort_by = request.args.get('sort', 'date')
 
     # Indian sources list
     indian_sources = [
@@ -2304,31 +5890,35 @@ def dashboard():
     ]
     indian_sources_set = set(indian_sources)
 
+    def apply_filters(query, model):
+        if filter_source:
+            # Handle both with and without www. prefix
+            if filter_source.startswith('www.'):
+                # If filter is www.ndtv.com, also include ndtv.com
+                clean_source = filter_source.replace('www.', '')
+                query = query.filter(db.or_(model.source == filter_source, model.source == clean_source))
+            else:
+                # If filter is ndtv.com, also include www.ndtv.com
+                www_source = f"www.{filter_source}"
+                query = query.filter(db.or_(model.source == filter_source, model.source == www_source))
+        if min_bd_relevance is not None:
+            query = query.filter(model.bd_relevance_score >= min_bd_relevance)
+        if start_date:
+            try:
+                start_dt = datetime.datetime.fromisoformat(start_date)
+                query = query.filter(model.published_at >= start_dt)
+            except Exception:
+                pass
+        if end_date:
+            try:
+                end_dt = datetime.datetime.fromisoformat(end_date) + datetime.timedelta(days=1)
+                query = query.filter(model.published_at < end_dt)
+            except Exception:
+                pass
+        return query
+
     # Query articles from DB
-    query = Article.query
-    if filter_source:
-        # Handle both with and without www. prefix
-        if filter_source.startswith('www.'):
-            # If filter is www.ndtv.com, also include ndtv.com
-            clean_source = filter_source.replace('www.', '')
-            query = query.filter(db.or_(Article.source == filter_source, Article.source == clean_source))
-        else:
-            # If filter is ndtv.com, also include www.ndtv.com
-            www_source = f"www.{filter_source}"
-            query = query.filter(db.or_(Article.source == filter_source, Article.source == www_source))
-    if start_date:
-        try:
-            start_dt = datetime.datetime.fromisoformat(start_date)
-            query = query.filter(Article.published_at >= start_dt)
-        except Exception:
-            pass
-    if end_date:
-        try:
-            end_dt = datetime.datetime.fromisoformat(end_date) + datetime.timedelta(days=1)
-            query = query.filter(Article.published_at < end_dt)
-        except Exception:
-            pass
-    articles = query.all()
+    articles = apply_filters(Article.query, Article).options(undefer_group('payload')).all()
 
     # Filter for Indian sources
     def get_domain(url):
@@ -2354,7 +5944,34 @@ def dashboard():
                 is_indian_source = True
         if is_indian_source:
             latest_news.append(a)
+
+    # Archived articles are never listed or decompressed here: with ?include_archived=true they
+    # only add to the counts, read from the rollup table. Rollups carry no relevance score and
+    # only the month, so min_bd_relevance leaves the archive out and start/end match whole months.
+    archived_rollups = []
+    if include_archived_requested() and min_bd_relevance is None:
+        rollups = ArticleArchiveRollup.query.filter(ArticleArchiveRollup.source.in_(indian_sources_with_www))
+        if filter_source:
+            bare_source = filter_source.replace('www.', '')
+            rollups = rollups.filter(ArticleArchiveRollup.source.in_([bare_source, f"www.{bare_source}"]))
+        if start_date:
+            try:
+                start_month = datetime.datetime.fromisoformat(start_date).strftime('%Y-%m')
+                rollups = rollups.filter(ArticleArchiveRollup.month >= start_month)
+            except Exception:
+                pass
+        if end_date:
+            try:
+                end_month = datetime.datetime.fromisoformat(end_date).strftime('%Y-%m')
+                rollups = rollups.filter(ArticleArchiveRollup.month <= end_month)
+            except Exception:
+                pass
+        archived_rollups = rollups.all()
+
     latest_news.sort(key=lambda x: x.published_at or datetime.datetime.min, reverse=True)
+    if sort_by == 'bd_relevance':
+        # Stable sort: newest first within equal scores
+        latest_news.sort(key=lambda x: x.bd_relevance_score or 0, reverse=True)
 
     # Prepare output
     latest_news_data = []
@@ -2365,6 +5982,33 @@ def dashboard():
     last_updated = None
     sources_in_latest = []
 
+    # Language per source
+    language_map = {
+        'timesofindia.indiatimes.com': 'English',
+        'hindustantimes.com': 'English',
+        'ndtv.com': 'English',
+        'thehindu.com': 'English',
+        'indianexpress.com': 'English',
+        'indiatoday.in': 'English',
+        'news18.com': 'English',
+        'zeenews.india.com': 'Hindi',
+        'aajtak.in': 'Hindi',
+        'abplive.com': 'Hindi',
+        'jagran.com': 'Hindi',
+        'bhaskar.com': 'Hindi',
+        'livehindustan.com': 'Hindi',
+        'business-standard.com': 'English',
+        'economictimes.indiatimes.com': 'English',
+        'livemint.com': 'English',
+        'scroll.in': 'English',
+        'thewire.in': 'English',
+        'wionews.com': 'English',
+        'indiatvnews.com': 'Hindi',
+        'newsnationtv.com': 'Hindi',
+        'jansatta.com': 'Hindi',
+        'india.com': 'English',
+    }
+
     for a in latest_news:
         # Use stored summary_json for category, matches, etc.
         summary_obj = None
@@ -2408,31 +6052,6 @@ def dashboard():
         extras = json.loads(a.extras) if isinstance(a.extras, str) else {}
         entities = extras.get('entities', [])
         # Language
-        language_map = {
-            'timesofindia.indiatimes.com': 'English',
-            'hindustantimes.com': 'English',
-            'ndtv.com': 'English',
-            'thehindu.com': 'English',
-            'indianexpress.com': 'English',
-            'indiatoday.in': 'English',
-            'news18.com': 'English',
-            'zeenews.india.com': 'Hindi',
-            'aajtak.in': 'Hindi',
-            'abplive.com': 'Hindi',
-            'jagran.com': 'Hindi',
-            'bhaskar.com': 'Hindi',
-            'livehindustan.com': 'Hindi',
-            'business-standard.com': 'English',
-            'economictimes.indiatimes.com': 'English',
-            'livemint.com': 'English',
-            'scroll.in': 'English',
-            'thewire.in': 'English',
-            'wionews.com': 'English',
-            'indiatvnews.com': 'Hindi',
-            'newsnationtv.com': 'Hindi',
-            'jansatta.com': 'Hindi',
-            'india.com': 'English',
-        }
         lang = language_map.get(a.source, 'Other')
         lang_dist[lang] = lang_dist.get(lang, 0) + 1
         # Extract coverage information from fact check sources (same logic as to_dict method)
@@ -2479,6 +6098,7 @@ def dashboard():
                 'international_media': int_summary
             },
             'language': lang,
+            'bd_relevance_score': a.bd_relevance_score,
             'full_text': a.full_text or ''
         }
         latest_news_data.append(news_item)
@@ -2495,6 +6115,16 @@ def dashboard():
         if not last_updated or (news_item['date'] and news_item['date'] > last_updated):
             last_updated = news_item['date']
 
+    for r in archived_rollups:
+        if filter_category and r.category != filter_category:
+            continue
+        sentiment_counts_raw[r.sentiment or 'Neutral'] += r.article_count
+        lang = language_map.get(r.source, 'Other')
+        lang_dist[lang] = lang_dist.get(lang, 0) + r.article_count
+        v = r.fact_check.lower() if r.fact_check.lower() in verdict_counts else 'unverified'
+        verdict_counts[v] += r.article_count
+        sources_in_latest.append(r.source.replace('www.', ''))
+
     # Timeline of Key Events
     timeline_events = [
         {'date': item['date'], 'event': item['headline']} for item in latest_news_data[:20]
@@ -2557,7 +6187,7 @@ def dashboard():
             'details': f'Economic outlook: {"Positive" if pos_ratio > 0.5 else "Cautious"}. Based on recent sentiment.'
         }
     ]
-    return jsonify({
+    return {
         'latestIndianNews': latest_news_data,
         'timelineEvents': timeline_events,
         'languageDistribution': lang_dist,
@@ -2573,26 +6203,143 @@ def dashboard():
         'toneSentiment': sentiment_counts,
         'implications': implications,
         'predictions': predictions,
-        'totalArticlesInDB': len(latest_news)  # Total news count for media coverage chart
-    })
+        'totalArticlesInDB': len(latest_news) + sum(r.article_count for r in archived_rollups)  # Total news count for media coverage chart
+    }
 
 @app.route('/api/fetch-latest', methods=['POST'])
 def fetch_latest_api():
     run_exa_ingestion()
     return jsonify({'status': 'success', 'message': 'Fetched latest news from Exa.'})
 
+@article_deadline()
+def reanalyze_article(article, idx=0, total=0, analysis=None):
+    """
+    Re-run the Gemini analysis for one stored article (payload columns loaded) and save it,
+    within one article deadline. Returns 'processed', 'incomplete' (deadline hit, retry
+    queued), 'skipped' (too little text) or 'failed'.
+    `analysis` is a call_gemma_api() result already fetched in a batch.
+    Used by /api/reanalyze-all inline and by `flask worker` for queued 'reanalyze' items.
+    """
+    try:
+        log_sampled(logging.INFO, 'reanalyze.article', idx=idx + 1, total=total, id=article.id)
+        
+        # Skip if no content to analyze
+        if not article.full_text or len(article.full_text.strip()) < 100:
+            count_event('reanalyze.insufficient_content')
+            return 'skipped'
+        
+        # Call Gemma API for analysis
+        try:
+            gemma_result_raw = analysis or call_gemma_api(article.title, article.full_text, route_article_tier(article))
+        except DeadlineExceeded as e:
+            # The stored analysis is kept until the retry
+            retry_incomplete_article(article.id, [e.stage])
+            return 'incomplete'
+        incomplete = []
+        
+        if not gemma_result_raw:
+            log_kv(logging.WARNING, 'reanalyze.gemma_failed', id=article.id)
+            return 'failed'
+        
+        gemma_result = gemma_result_raw
+        
+        # Extract summary FIRST (as per processing order)
+        summary_text = gemma_result.get('summary', '')
+        sentiment = gemma_result.get('sentiment', 'neutral')
+        category = gemma_result.get('category', 'others')
+        
+        # Extract and validate fact-check
+        fact_check = gemma_result.get('fact_check', {})
+        if not isinstance(fact_check, dict):
+            fact_check = {'status': 'unverified', 'sources': []}
+        
+        # Apply fact-check validation logic with URL verification
+        original_domain = get_article_domain(article.url)
+        if 'sources' in fact_check and fact_check['sources']:
+            # Step 1: Validate URLs actually exist
+            try:
+                validated_sources = validate_and_filter_sources(fact_check['sources'])
+            except DeadlineExceeded as e:
+                incomplete.append(e.stage)
+                validated_sources = e.partial
+            
+            # Step 2: Filter out self-referencing sources
+            filtered_sources = filter_independent_sources(validated_sources, original_domain)
+            
+            # Step 3: Determine final fact-check status
+            validated_status = determine_fact_check_status(filtered_sources)
+            fact_check['status'] = validated_status
+            fact_check['sources'] = filtered_sources
+            
+            log_kv(logging.DEBUG, 'reanalyze.sources_validated', id=article.id,
+                   sources=len(fact_check['sources']), status=validated_status)
+        else:
+            fact_check['status'] = 'unverified'
+            fact_check['sources'] = []
+        
+        # Analyze sentiment locally with VADER
+        sentiment_analysis = analyze_sentiment_locally(article.full_text)
+        
+        # Create summary JSON
+        summary_json = {
+            'summary': summary_text,
+            'sentiment': sentiment,
+            'category': category,
+            'fact_check': fact_check,
+            'sentiment_analysis': sentiment_analysis
+        }
+        if incomplete:
+            summary_json['incomplete'] = incomplete
+        
+        # Update article in database
+        article.summary_json = json.dumps(summary_json)
+        article.summary_text = summary_text
+        article.set_sentiment_breakdown(sentiment_analysis)
+        
+        db.session.commit()
+        
+        if incomplete:
+            retry_incomplete_article(article.id, incomplete)
+            return 'incomplete'
+        return 'processed'
+        
+    except Exception as e:
+        log_kv(logging.ERROR, 'reanalyze.article_failed', id=article.id, error=e)
+        db.session.rollback()
+        return 'failed'
+
 @app.route('/api/reanalyze-all', methods=['POST'])
+@counting_run()
 def reanalyze_all_api():
     """
     Re-analyze ALL existing articles in database with Gemma API
     This bypasses the skip logic and reprocesses everything
+    ?mode=batch submits a Gemini batch job instead; the scheduler applies it when it finishes
     """
     try:
+        if request.args.get('mode') == 'batch':
+            jobs = submit_gemini_batch_jobs(Article.query, 'reanalyze')
+            total = sum(batch_job.articles for batch_job in jobs)
+            return jsonify({
+                'status': 'submitted',
+                'message': f"Submitted {len(jobs)} batch jobs for {total} articles",
+                'jobs': [{'job': j.job, 'tier': j.tier, 'articles': j.articles} for j in jobs],
+                'stats': {'total_articles': total}
+            }), 202
+
+        if ANALYSIS_QUEUE_ENABLED:
+            queued = enqueue_reanalysis()
+            log_kv(logging.INFO, 'reanalyze.queued', articles=queued)
+            return jsonify({
+                'status': 'queued',
+                'message': f'Queued {queued} articles for reanalysis by workers',
+                'stats': {'total_articles': queued, 'queued': queued}
+            })
+
         logger.info("Starting reanalysis of all articles in database...")
         
         # Get all articles from database
-        all_articles = Article.query.all()
-        total_articles = len(all_articles)
+        total_articles = Article.query.count()
         
         if total_articles == 0:
             return jsonify({
@@ -2607,88 +6354,41 @@ def reanalyze_all_api():
             })
         
         logger.info(f"Found {total_articles} articles to reanalyze")
+        run_started = time.time()
         
         processed_count = 0
+        incomplete_count = 0
         failed_count = 0
         skipped_count = 0
         
-        for idx, article in enumerate(all_articles):
-            try:
-                logger.info(f"Reanalyzing article {idx + 1}/{total_articles}: {article.title}")
-                
-                # Skip if no content to analyze
-                if not article.full_text or len(article.full_text.strip()) < 100:
-                    logger.warning(f"Skipping article {idx + 1} - insufficient content")
-                    skipped_count += 1
-                    continue
-                
-                # Call Gemma API for analysis
-                gemma_result_raw = call_gemma_api(article.title, article.full_text)
-                
-                if not gemma_result_raw:
-                    logger.error(f"Gemma API failed for article {idx + 1}: {article.title}")
-                    failed_count += 1
-                    continue
-                
-                gemma_result = gemma_result_raw
-                
-                # Extract summary FIRST (as per processing order)
-                summary_text = gemma_result.get('summary', '')
-                sentiment = gemma_result.get('sentiment', 'neutral')
-                category = gemma_result.get('category', 'others')
-                
-                # Extract and validate fact-check
-                fact_check = gemma_result.get('fact_check', {})
-                if not isinstance(fact_check, dict):
-                    fact_check = {'status': 'unverified', 'sources': []}
-                
-                # Apply fact-check validation logic with URL verification
-                original_domain = get_article_domain(article.url)
-                if 'sources' in fact_check and fact_check['sources']:
-                    # Step 1: Validate URLs actually exist
-                    validated_sources = validate_and_filter_sources(fact_check['sources'])
-                    
-                    # Step 2: Filter out self-referencing sources
-                    filtered_sources = filter_independent_sources(validated_sources, original_domain)
-                    
-                    # Step 3: Determine final fact-check status
-                    validated_status = determine_fact_check_status(filtered_sources)
-                    fact_check['status'] = validated_status
-                    fact_check['sources'] = filtered_sources
-                    
-                    logger.info(f"Fact-check validation complete: {len(fact_check['sources'])} verified sources, status: {validated_status}")
-                else:
-                    fact_check['status'] = 'unverified'
-                    fact_check['sources'] = []
-                
-                # Analyze sentiment locally with VADER
-                sentiment_analysis = analyze_sentiment_locally(article.full_text)
-                
-                # Create summary JSON
-                summary_json = {
-                    'summary': summary_text,
-                    'sentiment': sentiment,
-                    'category': category,
-                    'fact_check': fact_check,
-                    'sentiment_analysis': sentiment_analysis
-                }
-                
-                # Update article in database
-                article.summary_json = json.dumps(summary_json)
-                article.summary_text = summary_text
-                
-                db.session.commit()
-                
-                processed_count += 1
-                logger.info(f"Successfully reanalyzed article {idx + 1}: {article.title}")
-                
-            except Exception as e:
-                logger.error(f"Error reanalyzing article {idx + 1}: {str(e)}")
-                failed_count += 1
-                db.session.rollback()
-                continue
+        # reanalyze_article() commits each article; chunks only bound what the session holds
+        idx = 0
+        group_size = GEMINI_BATCH_SIZE if gemini_batching_enabled() else 1
+        for chunk in iter_article_chunks(Article.query.options(undefer_group('payload'))):
+            for start in range(0, len(chunk), group_size):
+                group = chunk[start:start + group_size]
+                # Batched mode: one Gemini request analyzes the group, then each article is saved;
+                # articles the batches did not cover are analyzed by reanalyze_article() itself
+                analyses = call_gemma_api_batch([
+                    (article.id, article.title, article.full_text, route_article_tier(article)) for article in group
+                    if article.full_text and len(article.full_text.strip()) >= 100
+                ], individual=False) if group_size > 1 else {}
+                for article in group:
+                    outcome = reanalyze_article(article, idx, total_articles, analysis=analyses.get(article.id))
+                    idx += 1
+                    if outcome == 'processed':
+                        processed_count += 1
+                    elif outcome == 'incomplete':
+                        incomplete_count += 1
+                    elif outcome == 'skipped':
+                        skipped_count += 1
+                    else:
+                        failed_count += 1
         
-        logger.info(f"Reanalysis complete. Processed: {processed_count}, Failed: {failed_count}, Skipped: {skipped_count}")
+        log_run_summary('reanalyze.summary', total=total_articles, processed=processed_count,
+                        incomplete=incomplete_count, failed=failed_count, skipped=skipped_count,
+                        seconds=round(time.time() - run_started, 1))
+        mark_data_changed()
         
         return jsonify({
             'status': 'success',
@@ -2696,6 +6396,7 @@ def reanalyze_all_api():
             'stats': {
                 'total_articles': total_articles,
                 'processed': processed_count,
+                'incomplete': incomplete_count,
                 'failed': failed_count,
                 'skipped': skipped_count
             }
@@ -2710,6 +6411,9 @@ def reanalyze_all_api():
 
 @app.route('/api/indian-sources')
 def indian_sources_api():
+    return cached_json_response(build_indian_sources)
+
+def build_indian_sources():
     # Get all unique sources from database that are Indian sources
     indian_sources_set = {
         "timesofindia.indiatimes.com", "hindustantimes.com", "ndtv.com", "thehindu.com", 
@@ -2775,7 +6479,12 @@ def indian_sources_api():
             "name": f"{name} ({count})"
         })
     
-    return jsonify(result)
+    return result
+
+@app.route('/api/queue-stats')
+def queue_stats_api():
+    window = request.args.get('window', default=15, type=int)
+    return jsonify(work_queue_stats(max(1, window)))
 
 @app.route('/api/health')
 def health_check():
@@ -2827,13 +6536,16 @@ def database_stats():
         intl_articles = Article.query.filter(Article.source.in_(intl_sources)).count()
         other_articles = total_articles - (indian_articles + bd_articles + intl_articles)
         
-        # Count articles with Bangladesh mentions
+        # Count Bangladesh-related articles from the stored relevance score (any BD keyword in
+        # the title, text or entities) instead of decompressing every full_text; rows not
+        # scored yet (backfill-bd-relevance) count by their title
         bangladesh_articles = Article.query.filter(
             db.or_(
-                Article.title.contains('Bangladesh'),
-                Article.title.contains('bangladesh'),
-                Article.full_text.contains('Bangladesh'),
-                Article.full_text.contains('bangladesh')
+                Article.bd_relevance_score > 0,
+                db.and_(
+                    Article.bd_relevance_score.is_(None),
+                    db.or_(Article.title.contains('Bangladesh'), Article.title.contains('bangladesh')),
+                ),
             )
         ).count()
         
@@ -2857,6 +6569,25 @@ def database_stats():
         # Count articles with summary_json
         articles_with_summary = Article.query.filter(Article.summary_json.isnot(None), Article.summary_json != '').count()
         
+        # Archived articles are counted from the rollup table, never decompressed
+        def archived_count(*filters):
+            return db.session.query(
+                db.func.coalesce(db.func.sum(ArticleArchiveRollup.article_count), 0)
+            ).filter(*filters).scalar()
+        archived_articles = archived_count()
+        if include_archived_requested():
+            total_articles += archived_articles
+            indian_articles += archived_count(ArticleArchiveRollup.source.in_(indian_sources))
+            bd_articles += archived_count(ArticleArchiveRollup.source.in_(bd_sources))
+            intl_articles += archived_count(ArticleArchiveRollup.source.in_(intl_sources))
+            other_articles = total_articles - (indian_articles + bd_articles + intl_articles)
+            archived_sentiments = db.session.query(
+                ArticleArchiveRollup.sentiment, db.func.sum(ArticleArchiveRollup.article_count)
+            ).group_by(ArticleArchiveRollup.sentiment).all()
+            for sentiment, count in archived_sentiments:
+                key = sentiment or 'Unknown'
+                sentiment_counts[key] = sentiment_counts.get(key, 0) + count
+        
         return jsonify({
             'total_articles': total_articles,
             'articles_by_source_type': {
@@ -2880,17 +6611,37 @@ def database_stats():
                 'articles_with_summary': articles_with_summary,
                 'articles_without_text': total_articles - articles_with_text
             },
-            'database_path': app.config['SQLALCHEMY_DATABASE_URI'],
+            'archive': {
+                'archived_articles': archived_articles,
+                'archive_after_days': ARCHIVE_AFTER_DAYS,
+                'included_in_counts': include_archived_requested()
+            },
+            'database_path': db.engine.url.render_as_string(hide_password=True),
             'timestamp': datetime.datetime.now().isoformat()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/export')
+def export_corpus_api():
+    """
+    Stream the corpus as an NDJSON snapshot (same format as `flask export-corpus`).
+    Gzipped by default; ?compress=false returns plain NDJSON, ?include_archived=true adds the archive.
+    """
+    records = iter_corpus_records(include_archived=include_archived_requested())
+    filename = f"sims-corpus-{datetime.datetime.now():%Y%m%d-%H%M%S}.ndjson"
+    if request.args.get('compress', 'true').lower() == 'false':
+        body, mimetype = iter_ndjson(records), 'application/x-ndjson'
+    else:
+        body, mimetype, filename = iter_gzip(iter_ndjson(records)), 'application/gzip', filename + '.gz'
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
 @app.route('/api/clear-database', methods=['POST'])
 def clear_database_api():
     """
     Clear ALL data from the database
-    WARNING: This will delete all articles, BD matches, and international matches
+    WARNING: This will delete all articles, BD matches, international matches and the archive
     """
     try:
         logger.info("Starting database cleanup...")
@@ -2899,6 +6650,7 @@ def clear_database_api():
         total_articles = Article.query.count()
         total_bd_matches = BDMatch.query.count()
         total_int_matches = IntMatch.query.count()
+        total_archived = ArchivedArticle.query.count()
         
         # Delete all records (order matters due to foreign keys)
         # Delete child records first
@@ -2907,11 +6659,14 @@ def clear_database_api():
         
         # Then delete parent records
         db.session.query(Article).delete()
+        db.session.query(ArchivedArticle).delete()
+        db.session.query(ArticleArchiveRollup).delete()
         
         # Commit the transaction
         db.session.commit()
+        mark_data_changed()
         
-        logger.info(f"Database cleared successfully. Deleted: {total_articles} articles, {total_bd_matches} BD matches, {total_int_matches} international matches")
+        logger.info(f"Database cleared successfully. Deleted: {total_articles} articles, {total_bd_matches} BD matches, {total_int_matches} international matches, {total_archived} archived articles")
         
         return jsonify({
             'status': 'success',
@@ -2920,7 +6675,8 @@ def clear_database_api():
                 'articles': total_articles,
                 'bd_matches': total_bd_matches,
                 'int_matches': total_int_matches,
-                'total_records': total_articles + total_bd_matches + total_int_matches
+                'archived_articles': total_archived,
+                'total_records': total_articles + total_bd_matches + total_int_matches + total_archived
             }
         })
         
@@ -2932,5 +6688,91 @@ def clear_database_api():
             'message': f'Failed to clear database: {str(e)}'
         }), 500
 
+# --- Scheduler ---
+# SCHEDULER_MODE=embedded (default) runs the periodic jobs on a thread inside the dev server,
+# started by the first request it serves; CLI commands that only import the app (fetch-exa,
+# worker, backfill-sentiment, ...) never start it. Under gunicorn (see gunicorn.conf.py) it is
+# "off" and `flask run-scheduler` runs the jobs in one dedicated process instead. Whichever
+# scheduler takes the scheduler lock (acquire_scheduler_lock) also drains the retries of
+# incomplete articles, so exactly one process does, in either mode.
+SCHEDULER_MODE = os.getenv('SCHEDULER_MODE', 'embedded').lower()
+SCHEDULER_LOCK_KEY = 0x51A5  # pg advisory lock id
+
+def register_scheduled_jobs(sched, holds_lock=False):
+    """
+    Add the periodic jobs to `sched`. Batch job polling is safe in every scheduler, since a
+    finished job is applied by whichever poller claims it (claim_gemini_batch_job). Queued
+    retries of incomplete articles are drained only by the scheduler that holds the
+    scheduler lock: `flask run-scheduler`, or the first embedded scheduler to start.
+    """
+    sched.add_job(run_exa_ingestion_with_context, 'interval', hours=12, id='exa_ingestion')
+    if ARCHIVE_AFTER_DAYS > 0:
+        sched.add_job(run_article_archival_with_context, 'interval', hours=ARCHIVE_INTERVAL_HOURS, id='article_archival')
+    sched.add_job(poll_gemini_batch_jobs_with_context, 'interval', minutes=GEMINI_BATCH_POLL_MINUTES, id='gemini_batch_poll')
+    if holds_lock:
+        register_locked_jobs(sched)
+    return sched
+
+def register_locked_jobs(sched):
+    """
+    Jobs for the one scheduler that holds the scheduler lock
+    """
+    if not ANALYSIS_QUEUE_ENABLED and ARTICLE_DEADLINE_SECONDS > 0:
+        sched.add_job(retry_incomplete_articles_with_context, 'interval', minutes=ARTICLE_RETRY_MINUTES, id='incomplete_retry')
+
+def acquire_scheduler_lock():
+    """
+    Take a lock held for the life of this process so a second run-scheduler (another
+    container, a restart overlapping the old one) can't run the jobs twice.
+    Returns the lock handle, or None if another scheduler already holds it.
+    """
+    if IS_POSTGRES:
+        conn = db.engine.connect().execution_options(isolation_level='AUTOCOMMIT')
+        if conn.execute(text('SELECT pg_try_advisory_lock(:key)'), {'key': SCHEDULER_LOCK_KEY}).scalar():
+            return conn
+        conn.close()
+        return None
+    import fcntl
+    handle = open(os.path.join(instance_path, 'scheduler.lock'), 'w')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+scheduler = register_scheduled_jobs(BackgroundScheduler())
+_scheduler_start_lock = threading.Lock()
+_embedded_scheduler_lock = None   # held for the life of the process once taken
+
+@app.before_request
+def start_embedded_scheduler():
+    global _embedded_scheduler_lock
+    if SCHEDULER_MODE == 'embedded' and not scheduler.running:
+        with _scheduler_start_lock:
+            if not scheduler.running:
+                _embedded_scheduler_lock = acquire_scheduler_lock()
+                if _embedded_scheduler_lock is not None:
+                    register_locked_jobs(scheduler)
+                scheduler.start()
+
+@app.cli.command('run-scheduler')
+def run_scheduler_command():
+    """
+    Run the periodic jobs (Exa ingestion, archival, batch job polling, incomplete article retries) in this process until interrupted.
+    Usage: flask run-scheduler
+    """
+    with app.app_context():
+        lock = acquire_scheduler_lock()
+    if lock is None:
+        print("Another scheduler process is already running; exiting.")
+        return
+    blocking = register_scheduled_jobs(BlockingScheduler(), holds_lock=True)
+    print(f"Scheduler running jobs: {', '.join(job.id for job in blocking.get_jobs())}")
+    try:
+        blocking.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
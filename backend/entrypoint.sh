@@ -1,14 +1,40 @@
 #!/bin/bash
 set -e
 
-# Start cron service
-service cron start
+# SERVER_MODE=development (default): Flask dev server with the scheduler on a thread inside it.
+# SERVER_MODE=production: gunicorn workers (no scheduler) plus one dedicated scheduler process.
+SERVER_MODE=${SERVER_MODE:-development}
 
 # Run database migrations
 flask db upgrade
 
+# Only the dev server (SCHEDULER_MODE=embedded below) or `flask run-scheduler` runs the periodic
+# jobs; every other process started here keeps them off
+export SCHEDULER_MODE=off
+
+# Fill stored sentiment breakdowns and BD relevance scores for rows that predate them (no-op once done)
+flask backfill-sentiment &
+flask backfill-bd-relevance &
+
+if [ "$SERVER_MODE" = "production" ]; then
+    # Shared by gunicorn workers and the scheduler process so /metrics covers both
+    export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/sims_metrics}
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+    # Periodic jobs (Exa ingestion every 12h, archival) run here and only here
+    flask run-scheduler &
+
+    # Run initial data fetch in background (non-blocking)
+    flask fetch-exa &
+
+    exec gunicorn -c gunicorn.conf.py app:app
+fi
+
+# Start cron service
+service cron start
+
 # Start the Flask server immediately
-flask run --host=0.0.0.0 --port=5000 &
+SCHEDULER_MODE=embedded flask run --host=0.0.0.0 --port=5000 &
 
 # Store the Flask server PID
 FLASK_PID=$!
@@ -17,4 +43,4 @@ FLASK_PID=$!
 flask fetch-exa &
 
 # Wait for the Flask server process
-wait $FLASK_PID 
\ No newline at end of file
+wait $FLASK_PID
@@ -0,0 +1,306 @@
+"""
+Offline stand-in for the Gemini client, and the analysis benchmark that runs on it.
+
+LocalGeminiStandIn imitates models.generate_content_stream(). It reads the articles out of
+the prompts app.py builds (single or batched, JSON or markdown) and answers with the
+`analyze` callable's results in the requested format (app.py passes standin_analysis(),
+built on local_analysis()). Each request sleeps for a simple latency model: a fixed
+per-request cost (queueing, time to first token), prefill time per 1k prompt tokens,
+GEMINI_STANDIN_SEARCH_MS when grounded, and decode time per output token, which includes
+thinking tokens. Thinking uses up to GEMINI_STANDIN_THINKING_TOKENS, capped by the
+request's thinking budget. A fraction of responses can be cut short to exercise the
+malformed-response paths, and a fraction can stall (GEMINI_STANDIN_STALL_RATE) until the
+request's http_options timeout, which every wait honors like a read timeout.
+
+The stand-in also emulates the Batch API endpoints used by batch jobs: files.upload,
+files.download, batches.create and batches.get. Files and jobs are kept under
+GEMINI_STANDIN_DIR, so a job submitted by one process can be polled by another. A job
+finishes GEMINI_STANDIN_BATCH_SECONDS after creation and answers every request line.
+
+    GEMINI_STANDIN=true flask run        # app.py answers Gemini requests with the stand-in
+    python gemini_standin.py --limit 48 --batch-sizes 1,4,8 --tiers standard,routed
+
+The benchmark compares analysis throughput, latency and estimated cost by batch size and
+tier. It analyzes the most recent stored articles of the database DATABASE_URL points at,
+with a fresh stand-in per run passed to app.call_gemma_api_batch(); nothing is written.
+Times are reported at the stand-in's full latency (divided by --time-scale).
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from google.genai import types
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+GEMINI_STANDIN_REQUEST_MS = float(os.getenv('GEMINI_STANDIN_REQUEST_MS', '1500'))
+GEMINI_STANDIN_PROMPT_MS_PER_1K = float(os.getenv('GEMINI_STANDIN_PROMPT_MS_PER_1K', '40'))
+GEMINI_STANDIN_OUTPUT_MS = float(os.getenv('GEMINI_STANDIN_OUTPUT_MS', '4'))
+GEMINI_STANDIN_THINKING_TOKENS = int(os.getenv('GEMINI_STANDIN_THINKING_TOKENS', '600'))
+GEMINI_STANDIN_SEARCH_MS = float(os.getenv('GEMINI_STANDIN_SEARCH_MS', '1200'))
+GEMINI_STANDIN_MALFORMED_RATE = float(os.getenv('GEMINI_STANDIN_MALFORMED_RATE', '0'))
+GEMINI_STANDIN_STALL_RATE = float(os.getenv('GEMINI_STANDIN_STALL_RATE', '0'))
+GEMINI_STANDIN_DIR = os.getenv('GEMINI_STANDIN_DIR', os.path.join(BASE_DIR, 'instance', 'gemini_standin'))
+GEMINI_STANDIN_BATCH_SECONDS = float(os.getenv('GEMINI_STANDIN_BATCH_SECONDS', '10'))
+
+
+def utc_now():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def write_atomic(path, data):
+    # Pollers in other threads or processes read these files while a job finishes
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class LocalGeminiStandIn:
+    """
+    Offline stand-in for genai.Client: models.generate_content_stream() and the batch job endpoints.
+    `analyze(title, text)` gives one article's analysis as a JSON-format response dict and
+    `count_tokens(text)` the estimated tokens of a prompt or response.
+    """
+    ARTICLE_RE = re.compile(
+        r'(?:### Article (\S+)\s+)?\*\*Title:\*\*[ \t]*(.*?)\s*\*\*Content:\*\*\s*(.*?)'
+        r'(?=\s*### Article |\n\s*(?:Respond with|Please provide)|\Z)', re.S)
+
+    def __init__(self, analyze, count_tokens, request_ms=None, prompt_ms_per_1k=None, output_ms=None,
+                 malformed_rate=None, stall_rate=None, time_scale=1.0, seed=None):
+        self.models = self
+        self.files = LocalGeminiStandInFiles()
+        self.batches = LocalGeminiStandInBatches(self)
+        self.analysis = analyze
+        self.count_tokens = count_tokens
+        self.request_ms = GEMINI_STANDIN_REQUEST_MS if request_ms is None else request_ms
+        self.prompt_ms_per_1k = GEMINI_STANDIN_PROMPT_MS_PER_1K if prompt_ms_per_1k is None else prompt_ms_per_1k
+        self.output_ms = GEMINI_STANDIN_OUTPUT_MS if output_ms is None else output_ms
+        self.malformed_rate = GEMINI_STANDIN_MALFORMED_RATE if malformed_rate is None else malformed_rate
+        self.stall_rate = GEMINI_STANDIN_STALL_RATE if stall_rate is None else stall_rate
+        self.time_scale = time_scale
+        self.rng = random.Random(seed)
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+    def respond(self, prompt, json_mode):
+        articles = self.ARTICLE_RE.findall(prompt)
+        if not articles:
+            return '{}' if json_mode else ''
+        if not json_mode:
+            analysis = self.analysis(articles[0][1], articles[0][2])
+            return (f"**SUMMARY:**\n{analysis['summary']}\n\n**SENTIMENT:** {analysis['sentiment']}\n\n"
+                    f"**CATEGORY:** {analysis['category']}\n\nNO VERIFIED SOURCES FOUND\n")
+        if articles[0][0]:
+            return json.dumps({'analyses': [dict(article_id=article_id, **self.analysis(title, text))
+                                            for article_id, title, text in articles]})
+        return json.dumps(self.analysis(articles[0][1], articles[0][2]))
+
+    @staticmethod
+    def wants_json(prompt, mime_type):
+        # Grounded requests ask for JSON in the prompt only (see app.stream_gemini)
+        return mime_type == 'application/json' or 'Respond with a JSON object' in prompt
+
+    @staticmethod
+    def thinking_tokens(budget):
+        if budget is None or budget < 0:
+            return GEMINI_STANDIN_THINKING_TOKENS
+        return min(budget, GEMINI_STANDIN_THINKING_TOKENS)
+
+    def generate_content_stream(self, model, contents, config=None):
+        prompt = ''.join(part.text or '' for content in contents for part in content.parts)
+        text = self.maybe_malformed(self.respond(prompt, self.wants_json(prompt, getattr(config, 'response_mime_type', None))))
+        thinking_config = getattr(config, 'thinking_config', None)
+        thinking_tokens = self.thinking_tokens(getattr(thinking_config, 'thinking_budget', None))
+        grounded = bool(getattr(config, 'tools', None))
+        prompt_tokens, output_tokens = self.count_tokens(prompt), self.count_tokens(text)
+        http_options = getattr(config, 'http_options', None)
+        timeout = http_options.timeout / 1000 if http_options and http_options.timeout else None
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['prompt_tokens'] += prompt_tokens
+            self.stats['output_tokens'] += output_tokens
+            self.stats['thinking_tokens'] += thinking_tokens
+            stalled = self.rng.random() < self.stall_rate
+            self.stats['stalled'] += stalled
+        first_token_seconds = float('inf') if stalled else (
+            (self.request_ms + prompt_tokens / 1000 * self.prompt_ms_per_1k
+             + (GEMINI_STANDIN_SEARCH_MS if grounded else 0)
+             + thinking_tokens * self.output_ms) / 1000 * self.time_scale)
+        self.wait(first_token_seconds, timeout)
+        pieces = [text[i:i + 400] for i in range(0, len(text), 400)] or ['']
+        for n, piece in enumerate(pieces):
+            self.wait(self.count_tokens(piece) * self.output_ms / 1000 * self.time_scale, timeout)
+            usage = SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=output_tokens,
+                                    thoughts_token_count=thinking_tokens) if n == len(pieces) - 1 else None
+            yield SimpleNamespace(text=piece, usage_metadata=usage)
+
+    @staticmethod
+    def wait(seconds, timeout):
+        if timeout is not None and seconds > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"stand-in read timed out after {timeout:.1f}s")
+        time.sleep(seconds)
+
+    def maybe_malformed(self, text):
+        with self.lock:
+            malformed = self.rng.random() < self.malformed_rate
+            self.stats['malformed'] += malformed
+        return text[:len(text) // 2] if malformed else text
+
+
+class LocalGeminiStandInFiles:
+    """
+    files.upload / files.download for the stand-in, stored under GEMINI_STANDIN_DIR/files
+    """
+    def path(self, name):
+        return os.path.join(GEMINI_STANDIN_DIR, 'files', name.split('/', 1)[-1])
+
+    def write(self, data):
+        name = f"files/{hashlib.sha256(data).hexdigest()[:16]}"
+        write_atomic(self.path(name), data)
+        return name
+
+    def upload(self, file, config=None):
+        with open(file, 'rb') as f:
+            data = f.read()
+        return types.File(name=self.write(data), size_bytes=len(data), mime_type=getattr(config, 'mime_type', None))
+
+    def download(self, file, config=None):
+        with open(self.path(getattr(file, 'name', file)), 'rb') as f:
+            return f.read()
+
+
+class LocalGeminiStandInBatches:
+    """
+    batches.create / batches.get for the stand-in, stored under GEMINI_STANDIN_DIR/batches
+    """
+    def __init__(self, client):
+        self.client = client
+
+    def path(self, name):
+        return os.path.join(GEMINI_STANDIN_DIR, 'batches', f"{name.split('/', 1)[-1]}.json")
+
+    def save(self, job):
+        write_atomic(self.path(job.name), job.model_dump_json(exclude_none=True).encode('utf-8'))
+
+    def create(self, model, src, config=None):
+        job = types.BatchJob(
+            name=f"batches/standin-{os.urandom(6).hex()}",
+            display_name=(config or {}).get('display_name') if isinstance(config, dict) else None,
+            model=model,
+            state=types.JobState.JOB_STATE_PENDING,
+            src=types.BatchJobSource(file_name=src),
+            create_time=utc_now(),
+        )
+        self.save(job)
+        return job
+
+    def get(self, name, config=None):
+        with open(self.path(name)) as f:
+            job = types.BatchJob.model_validate_json(f.read())
+        due = job.create_time + datetime.timedelta(seconds=GEMINI_STANDIN_BATCH_SECONDS)
+        if job.state == types.JobState.JOB_STATE_PENDING and utc_now() >= due:
+            job.dest = types.BatchJobDestination(file_name=self.client.files.write(self.run(job.src.file_name)))
+            job.state = types.JobState.JOB_STATE_SUCCEEDED
+            job.end_time = utc_now()
+            self.save(job)
+        return job
+
+    def run(self, file_name):
+        """
+        Answer every request line of an input file; a line without articles gets an error
+        """
+        count_tokens = self.client.count_tokens
+        output = []
+        for line in self.client.files.download(file=file_name).decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            request_body = entry.get('request') or {}
+            prompt = ''.join(part.get('text', '') for content in request_body.get('contents', [])
+                             for part in content.get('parts', []))
+            generation_config = request_body.get('generation_config') or {}
+            json_mode = self.client.wants_json(prompt, generation_config.get('response_mime_type'))
+            if not self.client.ARTICLE_RE.search(prompt):
+                output.append({'key': entry.get('key'), 'error': {'code': 400, 'message': 'no article in request'}})
+                continue
+            text = self.client.maybe_malformed(self.client.respond(prompt, json_mode))
+            thinking_budget = (generation_config.get('thinking_config') or {}).get('thinking_budget')
+            output.append({'key': entry.get('key'), 'response': {
+                'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}, 'finishReason': 'STOP'}],
+                'usageMetadata': {'promptTokenCount': count_tokens(prompt), 'candidatesTokenCount': count_tokens(text),
+                                  'thoughtsTokenCount': self.client.thinking_tokens(thinking_budget)},
+            }})
+            with self.client.lock:
+                self.client.stats['batch_requests'] += 1
+        return ''.join(json.dumps(line) + '\n' for line in output).encode('utf-8')
+
+
+def analysis_bench(sims, limit, batch_sizes, tiers, time_scale, malformed_rate):
+    """
+    Analyze the `limit` most recent stored articles once per tier and batch size, each run
+    with its own stand-in, and print one line of measurements per run
+    """
+    stored = [a for a in sims.Article.query.options(sims.undefer_group('payload'))
+              .filter(sims.Article.full_text.isnot(None)).order_by(sims.Article.id.desc()).limit(limit)
+              if len(a.full_text.strip()) >= 100]
+    if not stored:
+        print("No articles with text.")
+        return
+    routed = {a.id: sims.route_article_tier(a) for a in stored}
+    print(f"Articles: {len(stored)}  routed: {dict(Counter(routed.values()))}")
+    for tier in tiers:
+        articles = [(a.id, a.title, a.full_text, routed[a.id] if tier == 'routed' else tier) for a in stored]
+        for size in batch_sizes:
+            client = LocalGeminiStandIn(sims.standin_analysis, sims.estimate_tokens,
+                                        malformed_rate=malformed_rate, time_scale=time_scale, seed=0)
+            retried = sims.run_counters()['gemini.batch.retried_individually']
+            cost_before = sum(totals['cost_microusd'] for totals in sims.tier_totals.values())
+            started = time.perf_counter()
+            results = sims.call_gemma_api_batch(articles, client=client, batch_size=size, response_format='json')
+            seconds = (time.perf_counter() - started) / time_scale
+            cost = (sum(totals['cost_microusd'] for totals in sims.tier_totals.values()) - cost_before) / 1_000_000
+            stats = client.stats
+            print(f"tier={tier:<8} batch={size:<3} requests={stats['requests']:<4} "
+                  f"analyzed={sum(1 for r in results.values() if r)}/{len(articles)}  "
+                  f"retried={sims.run_counters()['gemini.batch.retried_individually'] - retried:<3} "
+                  f"prompt_tokens/article={stats['prompt_tokens'] / len(articles):6.0f}  "
+                  f"{seconds / stats['requests']:5.1f} s/request  {len(articles) / seconds * 60:6.1f} articles/min  "
+                  f"${cost / len(articles) * 1000:.3f}/1k articles")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Gemini analysis on the local stand-in.')
+    parser.add_argument('--limit', type=int, default=48, help='Most recent articles to analyze.')
+    parser.add_argument('--batch-sizes', default='1,4,8', help='Comma-separated articles per request to compare.')
+    parser.add_argument('--tiers', default='standard',
+                        help="Comma-separated analysis tiers to compare; 'routed' applies route_article_tier() per article.")
+    parser.add_argument('--time-scale', type=float, default=0.1, help='Multiplier on the stand-in latencies.')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='Fraction of stand-in responses cut short.')
+    args = parser.parse_args()
+
+    # app.py reads its configuration at import time; the benchmark never runs the periodic jobs
+    os.environ.setdefault('SCHEDULER_MODE', 'off')
+    import app as sims
+
+    tiers = [t for t in args.tiers.split(',') if t]
+    unknown = set(tiers) - set(sims.ANALYSIS_TIERS) - {'routed'}
+    if unknown:
+        parser.error(f"unknown tiers: {', '.join(sorted(unknown))}")
+    batch_sizes = [int(s) for s in args.batch_sizes.split(',') if s]
+    with sims.app.app_context(), sims.counting_run():
+        analysis_bench(sims, args.limit, batch_sizes, tiers, args.time_scale, args.malformed_rate)
+
+
+if __name__ == '__main__':
+    main()
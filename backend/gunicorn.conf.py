@@ -0,0 +1,61 @@
+# Gunicorn settings for SERVER_MODE=production (see entrypoint.sh).
+#   gunicorn -c gunicorn.conf.py app:app
+import gc
+import multiprocessing
+import os
+
+# Web workers never run the periodic jobs; `flask run-scheduler` does, in one process.
+# Set before the app is imported (preload below), since app.py reads it at import time.
+os.environ.setdefault('SCHEDULER_MODE', 'off')
+# Workers write their /metrics samples here and any worker serves the merged view. The
+# directory must be emptied before the first process starts (entrypoint.sh does that).
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/sims_metrics')
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Import app.py (spaCy model, VADER lexicon, Gemini client) once in the master and fork the
+# workers from it, so those read-only structures are shared copy-on-write
+preload_app = True
+
+# Requests mostly wait on the database and outbound HTTP (Exa, Gemini, URL validation),
+# so use a few processes with several threads each rather than many single-threaded ones
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', str(min(4, multiprocessing.cpu_count() * 2))))
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# /api/reanalyze-all and /api/fetch-latest run synchronously inside the request
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '900'))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to bound slow leaks in long-lived processes
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = 1000
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
+
+
+def when_ready(server):
+    # Move everything allocated during preload out of the GC's tracked generations: collections
+    # in the workers would otherwise touch (and copy) every shared page
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Connections opened in the master during preload (db.create_all) must not be shared
+    # across processes; give each worker a fresh pool
+    from app import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    # Fold the dead worker's live samples away so they are not reported twice after a restart
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
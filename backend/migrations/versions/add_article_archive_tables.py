@@ -0,0 +1,54 @@
+"""Add article_archive and article_archive_rollup tables for hot/cold tiering
+
+Revision ID: add_article_archive_tables
+Revises: compress_article_payload_columns
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_article_archive_tables'
+down_revision = 'compress_article_payload_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('article_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('url', sa.String(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('published_at', sa.DateTime(), nullable=True),
+    sa.Column('source', sa.String(), nullable=True),
+    sa.Column('sentiment', sa.String(), nullable=True),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('fact_check', sa.String(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('url')
+    )
+    op.create_index('ix_article_archive_published_at', 'article_archive', ['published_at'])
+    op.create_table('article_archive_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('sentiment', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('fact_check', sa.String(), nullable=False),
+    sa.Column('article_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('month', 'source', 'sentiment', 'category', 'fact_check', name='uq_article_archive_rollup_key')
+    )
+    # The archive job selects by age, so index the hot table's published_at too
+    op.create_index('ix_article_published_at', 'article', ['published_at'])
+
+
+def downgrade():
+    op.drop_index('ix_article_published_at', table_name='article')
+    op.drop_table('article_archive_rollup')
+    op.drop_index('ix_article_archive_published_at', table_name='article_archive')
+    op.drop_table('article_archive')
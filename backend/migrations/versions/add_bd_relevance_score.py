@@ -0,0 +1,34 @@
+"""Persist the Bangladesh relevance score on article and article_archive
+
+Revision ID: add_bd_relevance_score
+Revises: add_exa_watermark
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_bd_relevance_score'
+down_revision = 'add_exa_watermark'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('bd_relevance_score', sa.Float(), nullable=True))
+        batch_op.create_index('ix_article_bd_relevance_score', ['bd_relevance_score'])
+    with op.batch_alter_table('article_archive', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('bd_relevance_score', sa.Float(), nullable=True))
+
+    # Existing rows are filled with `flask backfill-bd-relevance`
+
+
+def downgrade():
+    with op.batch_alter_table('article_archive', schema=None) as batch_op:
+        batch_op.drop_column('bd_relevance_score')
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.drop_index('ix_article_bd_relevance_score')
+        batch_op.drop_column('bd_relevance_score')
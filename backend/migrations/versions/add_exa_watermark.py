@@ -0,0 +1,34 @@
+"""Add exa_watermark table for incremental per-query/per-shard Exa searches
+
+Revision ID: add_exa_watermark
+Revises: add_work_item_queue
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_exa_watermark'
+down_revision = 'add_work_item_queue'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('exa_watermark',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('query_key', sa.String(), nullable=False),
+    sa.Column('profile', sa.String(), nullable=False),
+    sa.Column('domains', sa.Text(), nullable=False),
+    sa.Column('start_published_date', sa.DateTime(), nullable=True),
+    sa.Column('last_run_at', sa.DateTime(), nullable=True),
+    sa.Column('last_result_count', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('query_key')
+    )
+
+
+def downgrade():
+    op.drop_table('exa_watermark')
@@ -0,0 +1,42 @@
+"""Add gemini_batch_job table for Gemini Batch API jobs
+
+Revision ID: add_gemini_batch_job_table
+Revises: rescale_bd_relevance_score
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_gemini_batch_job_table'
+down_revision = 'rescale_bd_relevance_score'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('gemini_batch_job',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job', sa.String(), nullable=False),
+    sa.Column('target', sa.String(length=16), nullable=False),
+    sa.Column('tier', sa.String(length=16), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('state', sa.String(length=32), nullable=False),
+    sa.Column('articles', sa.Integer(), nullable=False),
+    sa.Column('input_path', sa.Text(), nullable=True),
+    sa.Column('input_file', sa.String(), nullable=True),
+    sa.Column('submitted_at', sa.DateTime(), nullable=False),
+    sa.Column('claimed_by', sa.String(), nullable=True),
+    sa.Column('claim_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('applied_at', sa.DateTime(), nullable=True),
+    sa.Column('stats', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job')
+    )
+
+
+def downgrade():
+    op.drop_table('gemini_batch_job')
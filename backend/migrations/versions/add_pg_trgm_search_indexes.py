@@ -0,0 +1,34 @@
+"""Add trigram GIN search indexes on Article title/full_text (PostgreSQL only)
+
+Revision ID: add_pg_trgm_search_indexes
+Revises: add_category_summary_factcheck
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_pg_trgm_search_indexes'
+down_revision = 'add_category_summary_factcheck'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # /api/articles?search= filters with ILIKE '%term%', which pg_trgm GIN indexes can serve.
+    # SQLite has no equivalent index type, so this revision is a no-op there.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_article_title_trgm', 'article', ['title'],
+                    postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_article_full_text_trgm', 'article', ['full_text'],
+                    postgresql_using='gin', postgresql_ops={'full_text': 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_article_full_text_trgm', table_name='article')
+    op.drop_index('ix_article_title_trgm', table_name='article')
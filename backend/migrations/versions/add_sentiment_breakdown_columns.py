@@ -0,0 +1,34 @@
+"""Add stored VADER sentiment breakdown columns to Article
+
+Revision ID: add_sentiment_breakdown_columns
+Revises: add_pg_trgm_search_indexes
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_sentiment_breakdown_columns'
+down_revision = 'add_pg_trgm_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sentiment_positive', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('sentiment_negative', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('sentiment_neutral', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('sentiment_cautious', sa.Float(), nullable=True))
+
+    # Existing rows are filled with `flask backfill-sentiment`
+
+
+def downgrade():
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.drop_column('sentiment_cautious')
+        batch_op.drop_column('sentiment_neutral')
+        batch_op.drop_column('sentiment_negative')
+        batch_op.drop_column('sentiment_positive')
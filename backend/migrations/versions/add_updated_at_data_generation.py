@@ -0,0 +1,38 @@
+"""Add Article.updated_at and the data_generation counter for conditional GETs
+
+Revision ID: add_updated_at_data_generation
+Revises: add_article_archive_tables
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_updated_at_data_generation'
+down_revision = 'add_article_archive_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # Existing rows start from the migration time (UTC, like utc_now() in app.py)
+    op.execute("UPDATE article SET updated_at = CURRENT_TIMESTAMP")
+
+    data_generation = op.create_table('data_generation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('generation', sa.Integer(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(data_generation.insert().values(id=1, generation=1, changed_at=sa.func.current_timestamp()))
+
+
+def downgrade():
+    op.drop_table('data_generation')
+    with op.batch_alter_table('article', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,45 @@
+"""Add work_item table for the lease-based analysis work queue
+
+Revision ID: add_work_item_queue
+Revises: add_updated_at_data_generation
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_work_item_queue'
+down_revision = 'add_updated_at_data_generation'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('work_item',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=32), nullable=False),
+    sa.Column('dedupe_key', sa.String(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('lease_owner', sa.String(), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('outcome', sa.String(length=16), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('kind', 'dedupe_key', name='uq_work_item_kind_dedupe_key')
+    )
+    op.create_index('ix_work_item_claim', 'work_item', ['status', 'available_at'])
+    op.create_index('ix_work_item_completed_at', 'work_item', ['completed_at'])
+
+
+def downgrade():
+    op.drop_index('ix_work_item_completed_at', table_name='work_item')
+    op.drop_index('ix_work_item_claim', table_name='work_item')
+    op.drop_table('work_item')
@@ -0,0 +1,67 @@
+"""Compress Article full_text/summary_json/extras/fact_check_results in place (SQLite only)
+
+Revision ID: compress_article_payload_columns
+Revises: add_sentiment_breakdown_columns
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import zlib
+
+
+# revision identifiers, used by Alembic.
+revision = 'compress_article_payload_columns'
+down_revision = 'add_sentiment_breakdown_columns'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('full_text', 'summary_json', 'extras', 'fact_check_results')
+CHUNK_SIZE = 200
+
+# Mirrors compress_text/decompress_text in app.py (zlib codec, b'Z' marker). SQLite stores
+# the resulting BLOBs in the existing TEXT-declared columns, so no table rebuild is needed.
+# PostgreSQL keeps plain text (TOAST compresses it), so this revision is a no-op there.
+
+
+def _compress(value):
+    if value is None or value == '' or not isinstance(value, str):
+        return value
+    return b'Z' + zlib.compress(value.encode('utf-8'), 6)
+
+
+def _decompress(value):
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    if value[:1] == b'Z':
+        return zlib.decompress(value[1:]).decode('utf-8')
+    return value.decode('utf-8')
+
+
+def _rewrite(convert):
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    cols = ', '.join(COLUMNS)
+    sets = ', '.join(f'{c} = :{c}' for c in COLUMNS)
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            f'SELECT id, {cols} FROM article WHERE id > :last_id ORDER BY id LIMIT :limit'
+        ), {'last_id': last_id, 'limit': CHUNK_SIZE}).fetchall()
+        if not rows:
+            break
+        bind.execute(sa.text(f'UPDATE article SET {sets} WHERE id = :id'), [
+            dict({'id': row[0]}, **{c: convert(row[i + 1]) for i, c in enumerate(COLUMNS)})
+            for row in rows
+        ])
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    _rewrite(_compress)
+
+
+def downgrade():
+    _rewrite(_decompress)
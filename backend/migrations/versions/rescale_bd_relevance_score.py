@@ -0,0 +1,28 @@
+"""Clear stored Bangladesh relevance scores computed with the old per-word formula
+
+Revision ID: rescale_bd_relevance_score
+Revises: add_bd_relevance_score
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'rescale_bd_relevance_score'
+down_revision = 'add_bd_relevance_score'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The score is now keyword density on a saturating curve plus a title share; the old
+    # values (distinct keywords per 100 words) are on another scale. Cleared rows are
+    # recomputed by `flask backfill-bd-relevance`, which entrypoint.sh runs on start.
+    op.execute('UPDATE article SET bd_relevance_score = NULL')
+    op.execute('UPDATE article_archive SET bd_relevance_score = NULL')
+
+
+def downgrade():
+    # The old scores can be recomputed with the old code's `flask backfill-bd-relevance`
+    pass
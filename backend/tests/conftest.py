@@ -0,0 +1,88 @@
+"""
+Shared fixtures. app.py reads its configuration when it is imported, so the environment is
+set here first: a throwaway SQLite file, no scheduler, no Exa cache and no Gemini key.
+
+Setting DATABASE_URL to a PostgreSQL URL before running pytest (a scratch database - its
+tables are created and emptied) adds the PostgreSQL half of the `backend` fixture.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POSTGRES_URL = os.environ.get('DATABASE_URL') if os.environ.get('DATABASE_URL', '').startswith('postgres') else None
+TEST_DIR = tempfile.mkdtemp(prefix='sims-tests-')
+
+os.environ.update({
+    'DATABASE_URL': f"sqlite:///{os.path.join(TEST_DIR, 'sims.db')}",
+    'SCHEDULER_MODE': 'off',
+    'EXA_CACHE': 'off',
+    'GEMINI_API_KEY': '',
+    'RESPONSE_CACHE_TTL': '0',
+    'GEMINI_BATCH_JOB_DIR': os.path.join(TEST_DIR, 'gemini_batch_jobs'),
+    'LOG_LEVEL': 'WARNING',
+})
+os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+sys.path.insert(0, BACKEND_DIR)
+
+import app as sims  # noqa: E402
+
+
+def empty_tables(db):
+    for table in reversed(db.metadata.sorted_tables):
+        db.session.execute(table.delete())
+    db.session.commit()
+
+
+@pytest.fixture(scope='session')
+def sims_app():
+    with sims.app.app_context():
+        sims.db.create_all()
+    return sims
+
+
+@pytest.fixture
+def db(sims_app):
+    """
+    The SQLite test database inside an app context, emptied after the test
+    """
+    with sims.app.app_context():
+        yield sims.db
+        sims.db.session.rollback()
+        empty_tables(sims.db)
+        sims.db.session.remove()
+
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def backend(request, sims_app):
+    """
+    An app context on each database engine; PostgreSQL only when DATABASE_URL pointed at one
+    """
+    if request.param == 'sqlite':
+        target = sims.app
+    else:
+        if not POSTGRES_URL:
+            pytest.skip('set DATABASE_URL=postgresql://... to run the PostgreSQL tests')
+        from flask import Flask
+        target = Flask('sims_postgres_tests')
+        target.config.update(SQLALCHEMY_DATABASE_URI=POSTGRES_URL.replace('postgres://', 'postgresql://', 1),
+                             SQLALCHEMY_TRACK_MODIFICATIONS=False)
+        sims.db.init_app(target)
+    with target.app_context():
+        sims.db.create_all()
+        empty_tables(sims.db)
+        yield sims.db
+        sims.db.session.rollback()
+        empty_tables(sims.db)
+        sims.db.session.remove()
+
+
+def article_rows(count, start=0, seed=0):
+    """
+    Article column dicts for bulk_upsert_articles(), from the synthetic corpus generator
+    """
+    columns = [c.name for c in sims.Article.__table__.columns if c.name != 'id']
+    return [{c: sims._corpus_row(r['article']).get(c) for c in columns}
+            for r in sims.synthetic_records(count, seed=seed, start=start)]
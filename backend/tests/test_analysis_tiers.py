@@ -0,0 +1,43 @@
+"""
+route_analysis_tier() keeps search-grounded analysis for every article whose sources still
+need verification
+"""
+import json
+
+import pytest
+
+from conftest import sims
+
+REGISTERED = 'https://www.thedailystar.net/news/bangladesh/talks'
+VALIDATED = [
+    {'source_name': 'bdnews24', 'source_country': 'Bangladesh', 'source_url': 'https://bdnews24.com/a'},
+    {'source_name': 'Reuters', 'source_country': 'International', 'source_url': 'https://www.reuters.com/b'},
+]
+
+
+def test_interactive_requests_are_fast():
+    assert sims.route_analysis_tier('interactive') == 'fast'
+
+
+def test_new_articles_are_verified_with_search():
+    assert sims.route_analysis_tier('ingest', REGISTERED) == 'deep'
+    assert sims.route_analysis_tier('ingest', 'https://unknown-outlet.example/story') == 'deep'
+
+
+@pytest.mark.parametrize('url, fact_check, sources, expected', [
+    (REGISTERED, 'Verified', VALIDATED, 'standard'),
+    (REGISTERED, 'Verified', [], 'deep'),               # verdict without validated sources
+    (REGISTERED, 'Unverified', VALIDATED, 'deep'),
+    (REGISTERED, 'True', VALIDATED, 'deep'),            # legacy verdicts
+    ('https://unknown-outlet.example/story', 'Verified', VALIDATED, 'deep'),
+])
+def test_stored_articles_route_on_their_fact_check(url, fact_check, sources, expected):
+    article = sims.Article(url=url, title='Talks', fact_check=fact_check,
+                           fact_check_results=json.dumps(sources))
+    assert sims.route_article_tier(article) == expected
+
+
+def test_unreadable_fact_check_results_need_verification():
+    for results in (None, 'not json'):
+        article = sims.Article(url=REGISTERED, title='Talks', fact_check='Verified', fact_check_results=results)
+        assert sims.route_article_tier(article) == 'deep'
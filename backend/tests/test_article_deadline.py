@@ -0,0 +1,60 @@
+"""
+An article whose Gemini stream stalls past ARTICLE_DEADLINE_SECONDS is stored with its
+'incomplete' stages and one deduped 'reanalyze' work item (retry_incomplete_article)
+"""
+import json
+from types import SimpleNamespace
+
+import gemini_standin
+import pytest
+
+from conftest import sims
+
+DEADLINE_SECONDS = 0.5
+ITEM = SimpleNamespace(
+    url='https://www.thehindu.com/news/dhaka-delhi-talks-1',
+    title='Bangladesh and India resume border talks',
+    text='Officials from Dhaka and Delhi met to discuss the Bangladesh border and trade. ' * 20,
+    published_date=None,
+)
+
+
+@pytest.fixture
+def stalled_gemini(monkeypatch):
+    """
+    A stand-in whose every stream stalls until its read timeout
+    """
+    client = gemini_standin.LocalGeminiStandIn(sims.standin_analysis, sims.estimate_tokens, stall_rate=1.0, seed=0)
+    monkeypatch.setattr(sims, 'gemini_client', client)
+    monkeypatch.setattr(sims, 'ARTICLE_DEADLINE_SECONDS', DEADLINE_SECONDS)
+    return client
+
+
+def reanalyze_items():
+    return sims.WorkItem.query.filter_by(kind='reanalyze').all()
+
+
+def test_stalled_stream_raises_deadline_exceeded(db, stalled_gemini):
+    with sims.article_deadline(), pytest.raises(sims.DeadlineExceeded) as raised:
+        sims.call_gemma_api(ITEM.title, ITEM.text)
+    assert raised.value.stage == 'gemini'
+    assert stalled_gemini.stats['stalled'] == 1
+
+
+def test_stalled_article_is_stored_incomplete_with_one_retry(db, stalled_gemini):
+    with sims.counting_run() as counters:
+        assert sims.process_exa_item(ITEM, plan='full') == 'incomplete'
+    article = sims.Article.query.filter_by(url=ITEM.url).one()
+    summary = json.loads(article.summary_json)
+    assert summary['incomplete'][0] == 'gemini'
+    assert summary['summary']   # the local analysis is stored until the retry
+    assert counters['deadline.exceeded.gemini'] == 1
+    [item] = reanalyze_items()
+    assert item.status == 'pending'
+    assert json.loads(item.payload) == {'article_id': article.id}
+    assert item.dedupe_key == str(article.id)
+
+    # Running out of time again while the retry is pending queues nothing new
+    assert sims.process_exa_item(ITEM, plan='full') == 'incomplete'
+    assert sims.reanalyze_article(sims.db.session.get(sims.Article, article.id)) == 'incomplete'
+    assert len(reanalyze_items()) == 1
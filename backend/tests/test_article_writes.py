@@ -0,0 +1,54 @@
+"""
+Article upserts (INSERT ... ON CONFLICT) and bulk loads (COPY on PostgreSQL, executemany
+upserts elsewhere) on each database engine
+"""
+from conftest import article_rows, sims
+
+
+def test_upsert_article_inserts_then_updates(backend):
+    row = article_rows(1)[0]
+    first_id = sims.upsert_article(dict(row))
+    backend.session.commit()
+
+    second_id = sims.upsert_article({'url': row['url'], 'title': 'Retitled'})
+    backend.session.commit()
+
+    assert second_id == first_id
+    article = backend.session.get(sims.Article, first_id)
+    assert article.title == 'Retitled'
+    # Columns missing from the second upsert keep their values
+    assert article.source == row['source']
+    assert article.summary_text == row['summary_text']
+    assert backend.session.query(sims.Article).count() == 1
+
+
+def test_bulk_upsert_articles_chunks_and_merges(backend, monkeypatch):
+    copied = []
+    copy_article_chunk = sims._copy_article_chunk
+    monkeypatch.setattr(sims, '_copy_article_chunk',
+                        lambda chunk, columns: copied.append(len(chunk)) or copy_article_chunk(chunk, columns))
+    rows = article_rows(250)
+
+    assert sims.bulk_upsert_articles(rows, chunk_size=100) == 250
+    assert backend.session.query(sims.Article).count() == 250
+
+    changed = [dict(row, title=f"Updated {i}", sentiment='Positive') for i, row in enumerate(rows[:120])]
+    assert sims.bulk_upsert_articles(changed, chunk_size=100) == 120
+    backend.session.expire_all()
+    assert backend.session.query(sims.Article).count() == 250
+    assert backend.session.query(sims.Article).filter(sims.Article.title.like('Updated %')).count() == 120
+    stored = backend.session.query(sims.Article).filter_by(url=rows[0]['url']).one()
+    assert (stored.title, stored.sentiment, stored.full_text) == ('Updated 0', 'Positive', rows[0]['full_text'])
+    assert stored.updated_at is not None
+
+    # COPY into a staging table on PostgreSQL, executemany upserts elsewhere
+    if backend.engine.dialect.name == 'postgresql':
+        assert copied == [100, 100, 50, 100, 20]
+    else:
+        assert copied == []
+
+
+def test_copy_value_encodes_nulls_and_datetimes():
+    assert sims._copy_value(None) == '\\N'
+    assert sims._copy_value(sims.datetime.datetime(2026, 1, 2, 3, 4, 5)) == '2026-01-02 03:04:05'
+    assert sims._copy_value('text') == 'text'
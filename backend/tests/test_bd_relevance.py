@@ -0,0 +1,71 @@
+"""
+KeywordMatcher whole-word matching and the bd_relevance() score built on it
+"""
+import pytest
+
+from conftest import article_rows, sims
+
+
+@pytest.fixture(params=['automaton', 'pure_python'])
+def matcher(request, monkeypatch):
+    if request.param == 'pure_python':
+        monkeypatch.setattr(sims, 'ahocorasick', None)
+    elif sims.ahocorasick is None:
+        pytest.skip('pyahocorasick is not installed')
+    return sims.KeywordMatcher(sims.BD_RELEVANCE_KEYWORDS)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("Bangladesh's exports rose", {'bangladesh'}),
+    ("BANGLADESH, India sign deal", {'bangladesh'}),
+    ("Bangladeshi workers return home", {'bangladeshi'}),
+    ("Bangladeshis abroad", {'bangladeshis'}),
+    ("Protests in Dhaka-based groups and in Sylhet.", {'dhaka', 'sylhet'}),
+    ("Sheikh Hasina spoke", {'sheikh hasina'}),
+    ("Sheikh Hasinas", set()),
+])
+def test_matches_whole_words_only(matcher, text, expected):
+    assert matcher.matches(text) == expected
+
+
+def test_counts_every_occurrence(matcher):
+    assert matcher.counts("Dhaka said Dhaka's Bangladeshi traders in Dhaka") == {'dhaka': 3, 'bangladeshi': 1}
+
+
+def test_demonym_only_articles_are_relevant():
+    score = sims.bd_relevance('Bangladeshi migrants pushed back at border',
+                              'Police detained Bangladeshi nationals near the border crossing on Monday. ' * 5)
+    assert score >= sims.TRIAGE_FULL_RELEVANCE
+
+
+def test_indian_false_positives_are_not_keywords():
+    for word in ('bengaluru', 'uttar', 'dakshin'):
+        assert word not in sims.BD_RELEVANCE_KEYWORDS
+    assert sims.bd_relevance('Bengaluru rain', 'Uttar Pradesh and Dakshin Kannada brace for storms. ' * 5) == 0.0
+
+
+def test_relevance_does_not_fall_with_length():
+    paragraph = 'Dhaka and Delhi held talks on trade and water sharing at the border. ' * 3
+    short = sims.bd_relevance('Border talks', paragraph)
+    long = sims.bd_relevance('Border talks', paragraph * 40)
+    assert short == long > 0
+
+
+def test_title_hit_counts_separately():
+    body = 'Officials discussed regional security and trade. ' * 300
+    assert sims.bd_relevance('Bangladesh convergence may impact India', body) == pytest.approx(
+        100 * sims.BD_RELEVANCE_TITLE_WEIGHT)
+    assert sims.bd_relevance('Regional convergence may impact India', body) == 0.0
+    assert 0 < sims.bd_relevance('Bangladesh', 'Dhaka ' * 50) <= 100
+
+
+def test_backfill_changes_the_dashboard_etag(db):
+    sims.bulk_upsert_articles(article_rows(5))
+    sims.db.session.execute(sims.db.update(sims.Article).values(bd_relevance_score=None))
+    sims.db.session.commit()
+    client = sims.app.test_client()
+    etag = client.get('/api/dashboard').headers['ETag']
+    assert client.get('/api/dashboard', headers={'If-None-Match': etag}).status_code == 304
+    assert sims.backfill_bd_relevance() == 5
+    assert client.get('/api/dashboard', headers={'If-None-Match': etag}).status_code == 200
+    assert sims.backfill_bd_relevance() == 0
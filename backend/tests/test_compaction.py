@@ -0,0 +1,48 @@
+"""
+compact_article_text() on article texts recorded in the Exa response store format
+(tests/fixtures/exa_cache, replayed with ReplayExa as `flask fetch-exa --replay` does)
+"""
+import os
+
+import pytest
+
+from conftest import sims
+
+FIXTURE_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'exa_cache')
+EARTHQUAKE = 'bangladesh-feels-tremors'
+TARIFF_TALKS = 'tariff-talks-between-bangladesh-and-us'
+LEADS = {
+    EARTHQUAKE: 'An earthquake of magnitude 7.3 was felt in various parts of Bangladesh, including Dhaka and Chattogram, on Friday.',
+    TARIFF_TALKS: 'Trade discussions between Bangladesh and the United States concluded without a resolution.',
+}
+BOILERPLATE = ['Also read', 'Published on', 'Stories you might be interested in', 'Live Events',
+               'Get the latest headlines', 'Privacy Preference Center', 'cookies', 'Cookie List']
+
+
+@pytest.fixture(scope='module')
+def recorded():
+    exa = sims.ReplayExa(sims.load_exa_run('latest', root=FIXTURE_CACHE), root=FIXTURE_CACHE)
+    results = exa.get_contents(list(exa.contents)).results
+    return {key: next(r for r in results if key in r.url) for key in LEADS}
+
+
+@pytest.mark.parametrize('key', list(LEADS))
+@pytest.mark.parametrize('budget', [sims.GEMINI_TEXT_TOKEN_BUDGET, 250])
+def test_compaction_keeps_the_lead_and_drops_boilerplate(recorded, key, budget):
+    article = recorded[key]
+    for marker in BOILERPLATE[:1] if key == EARTHQUAKE else BOILERPLATE[2:4]:
+        assert marker in article.text   # the recording really has it
+    text = sims.compact_article_text(article.title, article.text, budget)
+    assert LEADS[key] in text
+    for marker in BOILERPLATE:
+        assert marker.lower() not in text.lower()
+    assert sims.estimate_tokens(text) <= budget
+    assert sims.estimate_tokens(text) < sims.estimate_tokens(article.text)
+
+
+def test_repeated_paragraphs_are_sent_once(recorded):
+    article = recorded[EARTHQUAKE]
+    assert article.text.count('Vance Luther Boelter') == 2
+    text = sims.compact_article_text(article.title, article.text)
+    assert 'the epicentre was 16 kilometres' in text
+    assert text.count('Vance Luther Boelter') <= 1
@@ -0,0 +1,61 @@
+"""
+/api/dashboard?include_archived=true counts archived articles from article_archive_rollup
+without listing or decompressing them
+"""
+from conftest import article_rows, sims
+
+AGGREGATES = ('toneSentiment', 'languageDistribution', 'keySources', 'totalArticlesInDB')
+
+
+def dashboard(query=''):
+    response = sims.app.test_client().get(f'/api/dashboard{query}')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_archived_articles_count_from_rollups(db, monkeypatch):
+    sims.bulk_upsert_articles(article_rows(300))
+    before = dashboard()
+    older = db.session.query(sims.Article).filter(
+        sims.Article.published_at < sims.utc_now() - sims.datetime.timedelta(days=120)).count()
+    assert 0 < older < 300
+
+    monkeypatch.setattr(sims, 'ARCHIVE_CHUNK_PAUSE', 0)
+    assert sims.archive_old_articles(days=120) == older
+    monkeypatch.setattr(sims.ArchivedArticle, 'load_payload',
+                        lambda self: (_ for _ in ()).throw(AssertionError('archive payload decompressed')))
+
+    hot = dashboard()
+    combined = dashboard('?include_archived=true')
+    assert hot['totalArticlesInDB'] < before['totalArticlesInDB']
+    assert {k: combined[k] for k in AGGREGATES} == {k: before[k] for k in AGGREGATES}
+    assert sum(combined['factChecking']['verdictCounts'].values()) == before['totalArticlesInDB']
+    # Only hot articles are listed
+    assert len(combined['latestIndianNews']) == len(hot['latestIndianNews'])
+
+
+def test_relevance_filter_leaves_the_archive_out(db, monkeypatch):
+    sims.bulk_upsert_articles(article_rows(100))
+    monkeypatch.setattr(sims, 'ARCHIVE_CHUNK_PAUSE', 0)
+    sims.archive_old_articles(days=120)
+    assert (dashboard('?include_archived=true&min_bd_relevance=0')['totalArticlesInDB']
+            == dashboard('?min_bd_relevance=0')['totalArticlesInDB'])
+
+
+def test_archive_timestamps_are_utc(db, monkeypatch):
+    # A zone far from UTC, so naive local time would show up in the cutoff and Last-Modified
+    monkeypatch.setenv('TZ', 'Asia/Dhaka')
+    sims.time.tzset()
+    monkeypatch.setattr(sims, 'ARCHIVE_CHUNK_PAUSE', 0)
+    try:
+        row = article_rows(1)[0]
+        row['published_at'] = sims.utc_now() - sims.datetime.timedelta(days=1, hours=3)
+        sims.bulk_upsert_articles([row])
+        assert sims.archive_old_articles(days=1) == 1
+        archived = db.session.query(sims.ArchivedArticle).one()
+        response = sims.app.test_client().get(f'/api/articles/{archived.id}?include_archived=true')
+    finally:
+        monkeypatch.delenv('TZ')
+        sims.time.tzset()
+    assert response.status_code == 200
+    assert abs(response.last_modified.replace(tzinfo=None) - sims.utc_now()) < sims.datetime.timedelta(minutes=1)
@@ -0,0 +1,28 @@
+"""
+/api/database-stats counts Bangladesh-related articles from the stored relevance score,
+without decompressing full_text
+"""
+from conftest import article_rows, sims
+
+
+def test_bangladesh_related_count_uses_the_stored_score(db):
+    rows = article_rows(4)
+    rows[0].update(bd_relevance_score=40.0)
+    rows[1].update(bd_relevance_score=0.0, title='Bangladesh in the title but scored 0')
+    rows[2].update(bd_relevance_score=None, title='Bangladesh talks, not scored yet')
+    rows[3].update(bd_relevance_score=None, title='Unrelated and not scored yet')
+    sims.bulk_upsert_articles(rows)
+
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sims.event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        response = sims.app.test_client().get('/api/database-stats')
+    finally:
+        sims.event.remove(db.engine, 'before_cursor_execute', capture)
+    assert response.status_code == 200
+    assert response.get_json()['bangladesh_related_articles'] == 2
+    assert not [s for s in statements if 'text_decompress' in s]
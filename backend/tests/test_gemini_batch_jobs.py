@@ -0,0 +1,93 @@
+"""
+A finished Gemini batch job's output is applied exactly once, however many pollers see it
+finish (claim_gemini_batch_job)
+"""
+import threading
+
+import gemini_standin
+import pytest
+
+from conftest import article_rows, sims
+
+ARTICLES = 6
+POLLERS = 4
+
+
+@pytest.fixture
+def finished_job(db, monkeypatch, tmp_path):
+    """
+    A 'reanalyze' job on the stand-in that has already succeeded, and a list collecting
+    the article ids reanalyze_article() is called for
+    """
+    monkeypatch.setattr(gemini_standin, 'GEMINI_STANDIN_DIR', str(tmp_path / 'standin'))
+    monkeypatch.setattr(gemini_standin, 'GEMINI_STANDIN_BATCH_SECONDS', 0)
+    monkeypatch.setattr(sims, 'GEMINI_BATCH_JOB_DIR', str(tmp_path / 'jobs'))
+    monkeypatch.setattr(sims, 'gemini_client', gemini_standin.LocalGeminiStandIn(sims.standin_analysis, sims.estimate_tokens))
+    applied = []
+    reanalyze_article = sims.reanalyze_article
+
+    def spy(article, *args, **kwargs):
+        applied.append(article.id)
+        return reanalyze_article(article, *args, **kwargs)
+
+    monkeypatch.setattr(sims, 'reanalyze_article', spy)
+    sims.bulk_upsert_articles(article_rows(ARTICLES))
+    [batch_job] = sims.submit_gemini_batch_jobs(sims.Article.query, 'reanalyze')
+    return batch_job.job, applied
+
+
+def test_job_is_applied_once(finished_job):
+    job_name, applied = finished_job
+    polled = sims.poll_gemini_batch_jobs()
+    assert [j.job for j in polled] == [job_name]
+    assert polled[0].applied_at and polled[0].claimed_by is None
+    assert len(applied) == ARTICLES
+    assert sims.poll_gemini_batch_jobs() == []
+    # Polling the applied row directly loses the claim instead of applying it again
+    sims.poll_gemini_batch_job(sims.GeminiBatchJob.query.filter_by(job=job_name).one())
+    assert len(applied) == ARTICLES
+
+
+def test_concurrent_pollers_apply_once(finished_job):
+    job_name, applied = finished_job
+    errors = []
+
+    def poller(n):
+        try:
+            with sims.app.app_context():
+                sims.poll_gemini_batch_job(sims.GeminiBatchJob.query.filter_by(job=job_name).one(), owner=f'poller-{n}')
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=poller, args=(n,)) for n in range(POLLERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=120)
+    assert not errors
+    assert sorted(applied) == sorted(set(applied)) and len(applied) == ARTICLES
+    assert sims.GeminiBatchJob.query.filter_by(job=job_name).one().applied_at
+
+
+def test_claims_are_exclusive_until_they_expire(finished_job):
+    job_name, _ = finished_job
+    assert sims.claim_gemini_batch_job(job_name, 'a')
+    assert not sims.claim_gemini_batch_job(job_name, 'b')
+    expired = sims.utc_now() - sims.datetime.timedelta(seconds=1)
+    sims.db.session.execute(sims.db.update(sims.GeminiBatchJob).values(claim_expires_at=expired))
+    sims.db.session.commit()
+    assert sims.claim_gemini_batch_job(job_name, 'b')
+
+
+def test_failed_apply_releases_the_claim(finished_job, monkeypatch):
+    job_name, applied = finished_job
+
+    def broken(*args):
+        raise RuntimeError('output unreadable')
+
+    monkeypatch.setattr(sims, 'apply_gemini_batch_output', broken)
+    with pytest.raises(RuntimeError):
+        sims.poll_gemini_batch_job(sims.GeminiBatchJob.query.filter_by(job=job_name).one(), owner='a')
+    batch_job = sims.GeminiBatchJob.query.filter_by(job=job_name).one()
+    assert batch_job.claimed_by is None and batch_job.applied_at is None
+    assert sims.claim_gemini_batch_job(job_name, 'b')
@@ -0,0 +1,41 @@
+"""
+Analysis through an explicitly passed LocalGeminiStandIn client, batch size and response
+format (what gemini_standin.analysis_bench does), leaving the module's settings alone
+"""
+from gemini_standin import LocalGeminiStandIn
+
+from conftest import article_rows, sims
+
+
+def standin(**options):
+    return LocalGeminiStandIn(sims.standin_analysis, sims.estimate_tokens, request_ms=0, output_ms=0,
+                              time_scale=0, seed=0, **options)
+
+
+def articles(count):
+    return [(n, row['title'], row['full_text'], 'standard') for n, row in enumerate(article_rows(count))]
+
+
+def test_batch_size_and_client_are_parameters():
+    settings = sims.gemini_client, sims.GEMINI_BATCH_SIZE, sims.GEMINI_RESPONSE_FORMAT
+    client = standin()
+    results = sims.call_gemma_api_batch(articles(8), client=client, batch_size=4, response_format='json')
+    assert all(results.values()) and len(results) == 8
+    assert client.stats['requests'] == 2
+    assert (sims.gemini_client, sims.GEMINI_BATCH_SIZE, sims.GEMINI_RESPONSE_FORMAT) == settings
+
+
+def test_unbatched_text_format():
+    client = standin()
+    results = sims.call_gemma_api_batch(articles(3), client=client, batch_size=1, response_format='text')
+    assert all(r['summary'] for r in results.values())
+    assert client.stats['requests'] == 3
+
+
+def test_malformed_batch_falls_back_to_single_requests():
+    client = standin(malformed_rate=1.0)
+    with sims.counting_run():
+        results = sims.call_gemma_api_batch(articles(4), client=client, batch_size=4, response_format='json')
+        assert sims.run_counters()['gemini.batch.retried_individually'] == 4
+    assert client.stats['requests'] == 5
+    assert len(results) == 4
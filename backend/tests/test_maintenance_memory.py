@@ -0,0 +1,49 @@
+"""
+Chunked maintenance passes (iter_article_chunks) keep peak memory flat as the table grows:
+each size runs in a fresh process seeded with `flask seed-synthetic`, and the growth of
+ru_maxrss over the patch pass must not follow the row count. SQLite's own page cache and
+memory map are kept small so the figure is the app's memory, not the database file's.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from conftest import BACKEND_DIR, TEST_DIR
+
+BASE_ROWS = 2000
+MAX_GROWTH_MB = 6         # holding every row adds ~12 MB at BASE_ROWS and ~25 MB at twice that
+MAX_GROWTH_DELTA_MB = 4
+
+PATCH_PASS = """
+import json, resource
+import app as sims
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+sims.patch_old_fact_check_data()
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'growth_mb': (after - before) / 1024}))
+"""
+
+
+def run(args, env):
+    proc = subprocess.run(args, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=600)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return proc.stdout
+
+
+def patch_pass_growth(rows):
+    path = os.path.join(TEST_DIR, f'memory-{rows}.db')
+    if os.path.exists(path):
+        os.remove(path)
+    env = dict(os.environ, FLASK_APP='app.py', DATABASE_URL=f"sqlite:///{path}",
+               SQLITE_CACHE_SIZE_KB='2048', SQLITE_MMAP_SIZE='0')
+    run([sys.executable, '-c', 'import app as sims\nwith sims.app.app_context(): sims.db.create_all()'], env)
+    run([sys.executable, '-m', 'flask', 'seed-synthetic', '--n', str(rows)], env)
+    return json.loads(run([sys.executable, '-c', PATCH_PASS], env).strip().splitlines()[-1])['growth_mb']
+
+
+def test_patch_pass_memory_stays_flat_as_rows_double():
+    small = patch_pass_growth(BASE_ROWS)
+    large = patch_pass_growth(2 * BASE_ROWS)
+    assert large < MAX_GROWTH_MB
+    assert large - small < MAX_GROWTH_DELTA_MB, (small, large)
@@ -0,0 +1,46 @@
+"""
+Event counters are scoped per run (counting_run), so concurrent runs neither mix nor reset
+each other's counts
+"""
+import threading
+
+from conftest import sims
+
+
+def test_runs_in_other_threads_keep_their_own_counts():
+    gate = threading.Barrier(2)
+    seen = {}
+
+    @sims.counting_run()
+    def run(name, events):
+        for i in range(events):
+            sims.count_event('test.event')
+            if i == 0:
+                gate.wait(timeout=5)
+        seen[name] = sims.run_counters()['test.event']
+        sims.log_run_summary('test.summary', name=name)
+        seen[name + '.after_summary'] = sims.run_counters()['test.event']
+
+    threads = [threading.Thread(target=run, args=('a', 3)), threading.Thread(target=run, args=('b', 5))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert seen == {'a': 3, 'b': 5, 'a.after_summary': 0, 'b.after_summary': 0}
+
+
+def test_nested_run_does_not_touch_the_outer_one():
+    with sims.counting_run() as outer:
+        sims.count_event('test.event')
+        with sims.counting_run() as inner:
+            sims.count_event('test.event', 2)
+            sims.log_run_summary('test.inner')
+        sims.count_event('test.event')
+    assert outer['test.event'] == 2
+    assert not inner
+
+
+def test_counts_outside_a_run_are_not_kept():
+    sims.count_event('test.event')
+    assert sims.run_counters() == {}
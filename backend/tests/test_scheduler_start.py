@@ -0,0 +1,66 @@
+"""
+SCHEDULER_MODE=embedded starts the periodic jobs in the server only, never in CLI commands;
+the scheduler holding the scheduler lock also retries incomplete articles
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BACKEND_DIR, sims
+
+
+def test_cli_commands_do_not_start_the_embedded_scheduler(sims_app):
+    env = dict(os.environ, SCHEDULER_MODE='embedded', LOG_LEVEL='INFO', FLASK_APP='app.py')
+    proc = subprocess.run([sys.executable, '-m', 'flask', 'queue-stats'], cwd=BACKEND_DIR, env=env,
+                          capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert 'Scheduler started' not in proc.stderr
+
+
+@pytest.fixture
+def embedded_scheduler(sims_app, monkeypatch, tmp_path):
+    """
+    A fresh, not yet started embedded scheduler, with the scheduler lock file under tmp_path
+    """
+    monkeypatch.setattr(sims, 'SCHEDULER_MODE', 'embedded')
+    monkeypatch.setattr(sims, 'ANALYSIS_QUEUE_ENABLED', False)
+    monkeypatch.setattr(sims, 'instance_path', str(tmp_path))
+    monkeypatch.setattr(sims, 'scheduler', sims.register_scheduled_jobs(sims.BackgroundScheduler()))
+    monkeypatch.setattr(sims, '_embedded_scheduler_lock', None)
+    yield sims.scheduler
+    if sims.scheduler.running:
+        sims.scheduler.shutdown(wait=False)
+    if sims._embedded_scheduler_lock is not None:
+        sims._embedded_scheduler_lock.close()
+
+
+def test_first_request_starts_the_embedded_scheduler(embedded_scheduler):
+    assert not embedded_scheduler.running
+    sims.app.test_client().get('/metrics')
+    assert embedded_scheduler.running
+    # It took the scheduler lock, so it also retries articles stored past their deadline
+    assert sims._embedded_scheduler_lock is not None
+    assert {'gemini_batch_poll', 'incomplete_retry'} <= {job.id for job in embedded_scheduler.get_jobs()}
+
+
+def test_only_the_lock_holder_retries_incomplete_articles(embedded_scheduler):
+    other = sims.acquire_scheduler_lock()   # e.g. `flask run-scheduler` or another dev server
+    try:
+        sims.app.test_client().get('/metrics')
+        assert embedded_scheduler.running and sims._embedded_scheduler_lock is None
+        jobs = {job.id for job in embedded_scheduler.get_jobs()}
+        assert 'gemini_batch_poll' in jobs and 'incomplete_retry' not in jobs
+    finally:
+        other.close()
+
+
+def test_locked_jobs(monkeypatch):
+    monkeypatch.setattr(sims, 'ANALYSIS_QUEUE_ENABLED', False)
+    unlocked = {job.id for job in sims.register_scheduled_jobs(sims.BackgroundScheduler()).get_jobs()}
+    locked = {job.id for job in sims.register_scheduled_jobs(sims.BackgroundScheduler(), holds_lock=True).get_jobs()}
+    # A finished batch job is claimed before it is applied, so every scheduler may poll
+    assert 'gemini_batch_poll' in unlocked and 'gemini_batch_poll' in locked
+    assert 'incomplete_retry' not in unlocked
+    assert 'incomplete_retry' in locked
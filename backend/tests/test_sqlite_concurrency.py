@@ -0,0 +1,57 @@
+"""
+Reads keep being served while ingestion-style bulk upserts commit against the same SQLite
+file (WAL mode, busy timeout; see configure_sqlite_connection)
+"""
+import threading
+import time
+
+from conftest import article_rows, sims
+
+WRITE_BATCHES = 20
+BATCH_SIZE = 100
+READERS = 4
+MAX_READ_SECONDS = 2.0   # far below SQLITE_BUSY_TIMEOUT_MS: a reader that waited on the writer would show
+
+
+def test_wal_mode_is_on(db):
+    assert db.session.execute(sims.text('PRAGMA journal_mode')).scalar() == 'wal'
+    assert db.session.execute(sims.text('PRAGMA busy_timeout')).scalar() == sims.SQLITE_BUSY_TIMEOUT_MS
+
+
+def test_reads_during_write_heavy_ingestion(db):
+    sims.bulk_upsert_articles(article_rows(BATCH_SIZE))
+    errors = []
+    latencies = []
+    writing = threading.Event()
+    writing.set()
+
+    def writer():
+        try:
+            with sims.app.app_context():
+                for batch in range(1, WRITE_BATCHES + 1):
+                    sims.bulk_upsert_articles(article_rows(BATCH_SIZE, start=batch * BATCH_SIZE))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            writing.clear()
+
+    def reader():
+        client = sims.app.test_client()
+        while writing.is_set():
+            started = time.perf_counter()
+            response = client.get('/api/articles?limit=20')
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors.append(response.get_data(as_text=True))
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(READERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=120)
+
+    assert not [e for e in errors if 'database is locked' in str(e)]
+    assert not errors
+    assert latencies, 'no reads completed while the writer ran'
+    assert max(latencies) < MAX_READ_SECONDS
+    assert db.session.query(sims.Article).count() == BATCH_SIZE * (WRITE_BATCHES + 1)
@@ -0,0 +1,43 @@
+"""
+TRIAGE_MODE: 'shadow' (default) only logs and counts decisions, 'on' applies them, 'off'
+skips triage
+"""
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import sims
+
+OFF_TOPIC = SimpleNamespace(
+    url='https://www.ndtv.com/world-news/storm-closes-airport-1',
+    title='Storm closes airport as flights are diverted',
+    text='Flights were diverted and passengers waited for hours as the storm moved through. ' * 20,
+    published_date=None,
+)
+ON_TOPIC = SimpleNamespace(
+    url='https://www.thehindu.com/news/dhaka-delhi-talks-1',
+    title='Bangladesh and India resume border talks',
+    text='Officials from Dhaka and Delhi met to discuss the Bangladesh border and trade. ' * 20,
+    published_date=None,
+)
+
+
+def test_shadow_is_the_default():
+    assert sims.TRIAGE_MODE == os.environ.get('TRIAGE_MODE', 'shadow').lower()
+
+
+@pytest.mark.parametrize('mode, off_topic, on_topic, triaged', [
+    ('shadow', 'full', 'full', True),
+    ('on', 'drop', 'full', True),
+    ('off', 'full', 'full', False),
+])
+def test_triage_modes(db, monkeypatch, mode, off_topic, on_topic, triaged):
+    monkeypatch.setattr(sims, 'TRIAGE_MODE', mode)
+    with sims.counting_run() as counters:
+        assert sims.plan_exa_item(OFF_TOPIC) == off_topic
+        assert sims.plan_exa_item(ON_TOPIC) == on_topic
+    # The decision is logged and counted whenever triage runs, applied or not
+    assert counters['triage.drop'] == (1 if triaged else 0)
+    assert counters['triage.reason.irrelevant'] == (1 if triaged else 0)
+    assert counters['triage.full'] == (1 if triaged else 0)